@@ -0,0 +1,115 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Allow `python benchmarks/bench_x.py` as well as `python -m benchmarks.bench_x`
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from claims.db import init_db, close_pool, get_db_path
+from claims.writer import close_writer
+from claims.cache import claim_cache
+from claims.models import ClaimType, Severity, Status, ResolutionOutcome
+
+WORDS = (
+    "pallet damaged forklift shrink wrap torn carton crushed missing bolts kit short pick "
+    "aisle blocked spill leaking supplier label wrong bay rack bent scanner dock door late "
+    "delivery returned customer complaint fragile glass broken seal moisture"
+).split()
+
+@contextmanager
+def temp_data_dir():
+    previous = os.environ.get("CLAIMS_DATA_DIR")
+    with tempfile.TemporaryDirectory(prefix="claims_bench_") as tmp:
+        os.environ["CLAIMS_DATA_DIR"] = tmp
+        close_pool()
+        claim_cache.clear()
+        try:
+            init_db()
+            yield Path(tmp)
+        finally:
+            close_writer()
+            close_pool()
+            claim_cache.clear()
+            if previous is None:
+                os.environ.pop("CLAIMS_DATA_DIR", None)
+            else:
+                os.environ["CLAIMS_DATA_DIR"] = previous
+
+def seed_claims(count: int, days: int = 365, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.now()
+    start = now - timedelta(days=days)
+    types = list(ClaimType)
+    severities = list(Severity)
+    statuses = list(Status)
+
+    def rows():
+        for i in range(count):
+            created = start + timedelta(seconds=i * days * 86400 / max(count, 1))
+            status = rng.choices(statuses, weights=(3, 1, 6))[0]
+            # Never in the future: a later write must move max(updated_at)
+            resolved = min(created + timedelta(hours=rng.randint(1, 240)), now) if status == Status.RESOLVED else None
+            yield (
+                str(uuid.UUID(int=rng.getrandbits(128))),
+                created,
+                resolved or created,
+                resolved,
+                rng.choices(types, weights=(5, 3, 2, 1, 1))[0].value,
+                rng.choices(severities, weights=(5, 3, 1))[0].value,
+                status.value,
+                " ".join(rng.choices(WORDS, k=rng.randint(4, 30))) + f" SKU-{rng.randint(10000, 99999)}",
+                "Checked on floor" if resolved else None,
+                rng.choice(list(ResolutionOutcome)).value if resolved else None,
+            )
+
+    conn = sqlite3.connect(get_db_path())
+    conn.executemany("""
+        INSERT INTO claims (
+            claim_uuid, created_at, updated_at, resolved_at, type, severity, status,
+            description, resolved_note, resolution_outcome
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows())
+    conn.commit()
+    conn.close()
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(samples) -> dict:
+    # Samples are seconds; report milliseconds
+    return {
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 95) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4) if samples else 0.0,
+        "min_ms": round(min(samples) * 1000, 4) if samples else 0.0,
+    }
+
+def measure(fn, iterations: int) -> dict:
+    # Times `iterations` calls of fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def print_table(title: str, results: dict):
+    print(f"\n== {title} ==")
+    print(f"{'case':<28} {'n':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<28} {stats['n']:>8} {stats['p50_ms']:>10.4f} {stats['p95_ms']:>10.4f} {stats['p99_ms']:>10.4f}")
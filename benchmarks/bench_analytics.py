@@ -0,0 +1,81 @@
+"""Claim trends: Python loop over hydrated claims vs the columnar numpy path (cold and cached).
+
+Usage: python -m benchmarks.bench_analytics [--rows 100000] [--days 90] [--iterations 10]
+"""
+import argparse
+import statistics
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks._common import temp_data_dir, seed_claims, measure, print_table
+from claims import analytics, repo
+from claims.db import get_connection
+from claims.models import ClaimStatusUpdate, Status
+
+def trends_in_python(days: int, window: int) -> dict:
+    # Same numbers as analytics.compute_trends, one Claim at a time
+    end = datetime.now().date()
+    first = end - timedelta(days=days - 1)
+    low = first - timedelta(days=window - 1)
+    created = Counter()
+    created_resolved = Counter()
+    by_type = Counter()
+    resolved = Counter()
+    hours = {}
+    for claim in repo.list_claims():
+        day = claim.created_at.date()
+        if low <= day <= end:
+            created[day] += 1
+            by_type[day, claim.type] += 1
+            created_resolved[day] += claim.status == Status.RESOLVED
+        if claim.resolved_at is not None:
+            closed = claim.resolved_at.date()
+            if low <= closed <= end:
+                resolved[closed] += 1
+            if first <= closed <= end and claim.status == Status.RESOLVED:
+                hours.setdefault(claim.severity, []).append((claim.resolved_at - claim.created_at).total_seconds() / 3600)
+    rate = []
+    for i in range(days):
+        window_days = [first + timedelta(days=i - k) for k in range(window)]
+        total = sum(created[d] for d in window_days)
+        rate.append(sum(created_resolved[d] for d in window_days) / total if total else None)
+    percentiles = {s: statistics.quantiles(h, n=100)[49::40] for s, h in hours.items() if len(h) > 1}
+    return {"created": created, "by_type": by_type, "resolved": resolved, "rate": rate, "percentiles": percentiles}
+
+def cold(days: int, window: int):
+    with get_connection() as conn:
+        columns = analytics.load_columns(conn)
+    return analytics.compute_trends(columns, datetime.now().date(), days, window)
+
+def after_write(days: int, window: int, claim_id: int):
+    # One status change moves the data version: the next call merges just that row
+    claim = repo.get_claim(claim_id)
+    status = Status.OPEN if claim.status == Status.IN_REVIEW else Status.IN_REVIEW
+    repo.update_claim_status(claim_id, ClaimStatusUpdate(status=status))
+    return analytics.claim_trends(days, window)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--window", type=int, default=analytics.DEFAULT_WINDOW)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    with temp_data_dir():
+        seed_claims(args.rows)
+        with get_connection() as conn:
+            columns = analytics.load_columns(conn)
+        end = datetime.now().date()
+        analytics.trends_cache.clear()
+
+        print_table(f"{args.days}-day trends over {args.rows} claims", {
+            "python loop": measure(lambda: trends_in_python(args.days, args.window), max(1, args.iterations // 5)),
+            "numpy, load + compute": measure(lambda: cold(args.days, args.window), args.iterations),
+            "numpy, compute only": measure(lambda: analytics.compute_trends(columns, end, args.days, args.window), args.iterations),
+            "claim_trends, cached": measure(lambda: analytics.claim_trends(args.days, args.window), args.iterations),
+            "claim_trends, after a write": measure(lambda: after_write(args.days, args.window, args.rows // 2), args.iterations),
+        })
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Requests/sec at N concurrent clients: blocking repo calls vs the claims.aio layer.
+
+Both variants run in the same uvicorn process (one worker), so the only
+difference is whether DB work runs on the event loop or on the DB executor.
+
+Usage: python -m benchmarks.bench_async [--clients 50] [--seconds 5] [--rows 20000]
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from fastapi import FastAPI
+
+from benchmarks._common import temp_data_dir, seed_claims, summarize
+from benchmarks._http import HttpClient, Server
+from claims import aio, repo
+from claims.db import init_db
+from claims.models import ClaimCreate, ClaimType, Severity, Status
+
+# A dashboard filter SQLite has to scan for: time spent in C, off the GIL
+DASHBOARD_FILTER = {"status": Status.OPEN, "severity": Severity.HIGH, "claim_type": ClaimType.SAFETY}
+
+bench_app = FastAPI()
+
+@bench_app.on_event("startup")
+def startup():
+    init_db()
+
+@bench_app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+@bench_app.get("/blocking/claims/{claim_id}")
+async def blocking_claim(claim_id: int):
+    return repo.get_claim(claim_id)
+
+@bench_app.get("/blocking/page")
+async def blocking_page():
+    return repo.list_claims_page(**DASHBOARD_FILTER)
+
+@bench_app.post("/blocking/claims")
+async def blocking_create():
+    return repo.create_claim(_new_claim())
+
+@bench_app.get("/async/claims/{claim_id}")
+async def async_claim(claim_id: int):
+    return await aio.get_claim(claim_id)
+
+@bench_app.get("/async/page")
+async def async_page():
+    return await aio.list_claims_page(**DASHBOARD_FILTER)
+
+@bench_app.post("/async/claims")
+async def async_create():
+    return await aio.create_claim(_new_claim())
+
+def _new_claim() -> ClaimCreate:
+    return ClaimCreate(
+        claim_uuid=str(uuid.uuid4()),
+        type=ClaimType.DAMAGE,
+        severity=Severity.LOW,
+        description="bench capture"
+    )
+
+async def drive(port: int, prefix: str, clients: int, seconds: float, rows: int):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def client(n: int):
+        rng = random.Random(n)
+        http = HttpClient("127.0.0.1", port)
+        try:
+            while time.perf_counter() < deadline:
+                # 70% detail lookups, 20% filtered dashboard pages, 10% captures
+                roll = rng.random()
+                method = "GET"
+                if roll < 0.7:
+                    path = f"{prefix}/claims/{rng.randint(1, rows)}"
+                elif roll < 0.9:
+                    path = f"{prefix}/page"
+                else:
+                    method, path = "POST", f"{prefix}/claims"
+                start = time.perf_counter()
+                status, _, _ = await http.request(method, path)
+                latencies.append(time.perf_counter() - start)
+                assert status == 200, (path, status)
+        finally:
+            await http.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    elapsed = time.perf_counter() - started
+    return round(len(latencies) / elapsed, 1), summarize(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--profile", default="safe", help="CLAIMS_DB_PROFILE for the server (safe = fsync per commit)")
+    args = parser.parse_args()
+
+    with temp_data_dir() as data_dir:
+        seed_claims(args.rows)
+        env = {"CLAIMS_DB_PROFILE": args.profile}
+        with Server("benchmarks.bench_async:bench_app", data_dir, env=env, ready_path="/ping") as server:
+            print(f"\n== {args.clients} concurrent clients, {args.seconds}s per variant, profile {args.profile} ==")
+            print(f"{'variant':<26} {'req/s':>8} {'p50 ms':>10} {'p99 ms':>10}")
+            for name, prefix in (("blocking repo (before)", "/blocking"), ("claims.aio (after)", "/async")):
+                rps, stats = asyncio.run(drive(server.port, prefix, args.clients, args.seconds, args.rows))
+                print(f"{name:<26} {rps:>8} {stats['p50_ms']:>10.2f} {stats['p99_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
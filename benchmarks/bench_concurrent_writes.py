@@ -0,0 +1,113 @@
+"""Load test: claim capture throughput and dashboard read latency while writes run.
+
+Compares the 1.x setup (rollback journal, every request writing on its own
+connection) with the WAL "balanced" profile plus the single-writer queue.
+
+Usage: python -m benchmarks.bench_concurrent_writes [--writers 16] [--readers 4] [--seconds 5]
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks._common import temp_data_dir, seed_claims, summarize
+from claims import repo
+from claims.db import get_connection
+from claims.models import ClaimCreate, ClaimType, Severity, Status
+
+def create_claim_direct(claim: ClaimCreate) -> int:
+    # Pre-queue behaviour: each request thread writes on its own connection
+    now = datetime.now()
+    with get_connection() as conn:
+        cursor = conn.execute("""
+            INSERT INTO claims (claim_uuid, created_at, updated_at, type, severity, status, description)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (claim.claim_uuid, now, now, claim.type.value, claim.severity.value, Status.OPEN.value, claim.description))
+        return cursor.lastrowid
+
+def run_case(profile: str, create, args) -> dict:
+    os.environ["CLAIMS_DB_PROFILE"] = profile
+    with temp_data_dir():
+        seed_claims(args.rows, days=30)
+        stop = threading.Event()
+        lock = threading.Lock()
+        writes = []
+        write_errors = []
+        reads = []
+
+        def writer():
+            while not stop.is_set():
+                claim = ClaimCreate(
+                    claim_uuid=str(uuid.uuid4()),
+                    type=ClaimType.DAMAGE,
+                    severity=Severity.MED,
+                    description="load test claim"
+                )
+                start = time.perf_counter()
+                try:
+                    create(claim)
+                except sqlite3.OperationalError as e:
+                    with lock:
+                        write_errors.append(str(e))
+                    continue
+                with lock:
+                    writes.append(time.perf_counter() - start)
+
+        def reader():
+            since = datetime.now() - timedelta(days=1)
+            while not stop.is_set():
+                start = time.perf_counter()
+                repo.list_claims(status=Status.OPEN, date_from=since)
+                with lock:
+                    reads.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=writer) for _ in range(args.writers)]
+        threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+    return {
+        "writes_per_sec": round(len(writes) / elapsed, 1),
+        "write_errors": len(write_errors),
+        "write": summarize(writes),
+        "read": summarize(reads),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    previous = os.environ.get("CLAIMS_DB_PROFILE")
+    try:
+        results = {
+            "legacy journal, direct writes (before)": run_case("legacy", create_claim_direct, args),
+            "WAL balanced, writer queue (after)": run_case("balanced", repo.create_claim, args),
+        }
+    finally:
+        if previous is None:
+            os.environ.pop("CLAIMS_DB_PROFILE", None)
+        else:
+            os.environ["CLAIMS_DB_PROFILE"] = previous
+
+    print(f"\n== {args.writers} writers / {args.readers} readers for {args.seconds}s ==")
+    for name, r in results.items():
+        print(f"\n{name}")
+        print(f"  writes/sec: {r['writes_per_sec']}  locked errors: {r['write_errors']}")
+        print(f"  write latency p50/p99 ms: {r['write']['p50_ms']} / {r['write']['p99_ms']}")
+        print(f"  read latency  p50/p99 ms: {r['read']['p50_ms']} / {r['read']['p99_ms']}  (n={r['read']['n']})")
+
+if __name__ == "__main__":
+    main()
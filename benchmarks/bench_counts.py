@@ -0,0 +1,39 @@
+"""Digest summary counts: Python loop over hydrated claims vs repo.claim_counts.
+
+Usage: python -m benchmarks.bench_counts [--rows 100000] [--iterations 10]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks._common import temp_data_dir, seed_claims, measure, print_table
+from claims import repo
+from claims.models import ClaimCounts
+
+def counts_in_python(date_from=None, date_to=None) -> ClaimCounts:
+    claims = repo.list_claims(date_from=date_from, date_to=date_to)
+    counts = ClaimCounts(total=len(claims))
+    for c in claims:
+        counts.by_status[c.status] += 1
+        counts.by_severity[c.severity] += 1
+        counts.by_type[c.type] += 1
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    with temp_data_dir():
+        seed_claims(args.rows)
+        week = (datetime.now() - timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        print_table(f"summary counts over {args.rows} claims", {
+            "python loop, all": measure(counts_in_python, max(1, args.iterations // 5)),
+            "claim_counts, all": measure(repo.claim_counts, args.iterations),
+            "python loop, last week": measure(lambda: counts_in_python(week), args.iterations),
+            "claim_counts, last week": measure(lambda: repo.claim_counts(week), args.iterations),
+        })
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Digest export: time to first byte, total time and peak Python memory.
+
+Compares the buffered path (list_claims + generate_digest) with stream_digest.
+
+Usage: python -m benchmarks.bench_export [--rows 200000]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks._common import temp_data_dir, seed_claims
+from claims import export, repo
+
+def run(make_chunks):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in make_chunks():
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, total, peak, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with temp_data_dir():
+        seed_claims(args.rows, days=90)
+        d_from = (datetime.now() - timedelta(days=91)).replace(hour=0, minute=0, second=0, microsecond=0)
+        d_to = datetime.now().replace(hour=23, minute=59, second=59, microsecond=0)
+
+        def buffered():
+            claims = repo.list_claims(date_from=d_from, date_to=d_to)
+            yield export.generate_digest(claims, d_from, d_to)
+
+        cases = {
+            "buffered (before)": buffered,
+            "streamed (after)": lambda: export.stream_digest(d_from, d_to),
+        }
+        print(f"\n== digest of {args.rows} claims ==")
+        print(f"{'case':<20} {'first byte s':>13} {'total s':>9} {'peak MiB':>10} {'bytes':>12}")
+        for name, fn in cases.items():
+            first, total, peak, size = run(fn)
+            print(f"{name:<20} {first:>13.3f} {total:>9.3f} {peak / 2**20:>10.1f} {size:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Claim list pages per filter combination: the single-column indexes vs the composite ones.
+
+Runs every combination from claims.query_plans (first and deep pages) against the
+version 6 index set, then with the query indexes installed, and prints both
+timings with the plan each one used.
+
+Usage: python -m benchmarks.bench_filters [--rows 100000] [--iterations 3] [--all]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks._common import temp_data_dir, seed_claims, measure
+from claims import db, query_plans, repo
+from claims.db import get_connection
+
+def restore_previous_indexes(conn):
+    # The index set before the query-index migration: its indexes gone, the base ones back
+    for name, _ in db.QUERY_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    db.create_base_schema(conn.cursor())
+    conn.commit()
+
+def install_query_indexes(conn):
+    db._migrate_query_indexes(conn.cursor())
+    conn.commit()
+
+def benchmark_cases(conn, show_all: bool):
+    # Real values for the combinations: a term in about half the claims, one in a handful
+    newest = conn.execute("SELECT created_at FROM claims ORDER BY created_at DESC, id DESC LIMIT 1").fetchone()[0]
+    middle = conn.execute(
+        "SELECT created_at, id FROM claims ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET (SELECT count(*) / 2 FROM claims)"
+    ).fetchone()
+    cursor = repo.encode_cursor(middle[0], middle[1])
+    date_to = datetime.fromisoformat(newest)
+    date_range = (date_to - timedelta(days=60), date_to)
+    rare = conn.execute("SELECT substr(description, -5) FROM claims WHERE id = 1").fetchone()[0]
+
+    for filters in query_plans.combinations():
+        if not show_all and (filters["page"] == "before" or filters["sla"] == query_plans.SlaState.AT_RISK):
+            continue
+        search = rare if filters["search"] == "rare" else query_plans.AUDIT_SEARCH
+        yield filters, query_plans.page_query_for(filters, search, date_range, cursor)
+
+def run(conn, cases, iterations: int) -> dict:
+    results = {}
+    for filters, (sql, params) in cases:
+        plan = query_plans.classify(query_plans.explain(conn, sql, params))
+        p50 = measure(lambda: conn.execute(sql, params).fetchall(), iterations)["p50_ms"]
+        results[query_plans.describe(filters)] = (p50, plan)
+    return results
+
+def plan_label(plan: dict) -> str:
+    return f"{plan['index'] or 'no index'}{' +sort' if plan['sorts'] else ''}{' SCAN' if plan['full_scan'] else ''}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--all", action="store_true", help="Also time `before` pages and at-risk filters")
+    args = parser.parse_args()
+
+    with temp_data_dir():
+        seed_claims(args.rows)
+        with get_connection() as conn:
+            cases = list(benchmark_cases(conn, args.all))
+            restore_previous_indexes(conn)
+            before = run(conn, cases, args.iterations)
+            install_query_indexes(conn)
+            after = run(conn, cases, args.iterations)
+
+    print(f"\n== list page p50 per filter combination, {args.rows} claims ==")
+    print(f"{'filters':<52} {'before ms':>10} {'after ms':>9} {'speedup':>8}  plan before -> after")
+    slower = 0
+    for label, (old_ms, old_plan) in before.items():
+        new_ms, new_plan = after[label]
+        slower += new_ms > old_ms * 1.2 and new_ms - old_ms > 1
+        print(
+            f"{label:<52} {old_ms:>10.2f} {new_ms:>9.2f} {old_ms / max(new_ms, 1e-6):>7.1f}x  "
+            f"{plan_label(old_plan)} -> {plan_label(new_plan)}"
+        )
+    total_before = sum(ms for ms, _ in before.values())
+    total_after = sum(ms for ms, _ in after.values())
+    worst_before = max(ms for ms, _ in before.values())
+    worst_after = max(ms for ms, _ in after.values())
+    print(
+        f"\n{len(before)} combinations: total {total_before:.0f} -> {total_after:.0f} ms, "
+        f"worst {worst_before:.1f} -> {worst_after:.1f} ms, {slower} slower by more than 20%"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Dashboard latency with the rendered-fragment cache off and on.
+
+Each variant starts its own uvicorn (CLAIMS_FRAGMENT_CACHE=off / on) on the same
+seeded data dir and drives GET / and filtered dashboard pages from concurrent
+clients. A second round mixes in captures (--write-share of requests), so every
+write moves the data version: pages are rendered again, but unchanged rows come
+from the row cache.
+
+Usage: python -m benchmarks.bench_fragments [--clients 10] [--seconds 10] [--rows 50000] [--write-share 0.05]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks._common import temp_data_dir, seed_claims, summarize
+from benchmarks._http import HttpClient, Server
+from benchmarks.loadgen import Workload
+
+VARIANTS = (("render every request (before)", "off"), ("fragment cache (after)", "on"))
+
+async def drive(port: int, workload: Workload, clients: int, seconds: float, write_share: float):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def client(n: int):
+        rng = random.Random(n)
+        http = HttpClient("127.0.0.1", port)
+        try:
+            while time.perf_counter() < deadline:
+                if rng.random() < write_share:
+                    method, path, body, headers, expected = workload.capture(rng)
+                    status, _, _ = await http.request(method, path, body, headers)
+                    assert status in expected, (path, status)
+                    continue
+                # Mostly the default page, as after a capture's redirect
+                op = workload.dashboard if rng.random() < 0.5 else workload.filter
+                method, path, body, headers, expected = op(rng)
+                start = time.perf_counter()
+                status, _, _ = await http.request(method, path, body, headers)
+                latencies.append(time.perf_counter() - start)
+                assert status in expected, (path, status)
+        finally:
+            await http.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    http = HttpClient("127.0.0.1", port)
+    try:
+        _, _, body = await http.request("GET", "/api/cache/fragments", b"", {})
+    finally:
+        await http.close()
+    return round(len(latencies) / elapsed, 1), summarize(latencies), json.loads(body)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--write-share", type=float, default=0.05, help="Share of requests that are captures in the second round (0 skips it)")
+    args = parser.parse_args()
+
+    with temp_data_dir() as data_dir:
+        seed_claims(args.rows)
+        workload = Workload(data_dir, photos=[])
+        for share in (0, args.write_share) if args.write_share else (0,):
+            print(f"\n== dashboard pages, {args.clients} clients, {args.seconds}s per variant, {share:.0%} captures ==")
+            print(f"{'variant':<32} {'pages/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'page hits':>10} {'row hits':>9}")
+            for name, mode in VARIANTS:
+                with Server("main:app", data_dir, env={"CLAIMS_FRAGMENT_CACHE": mode}) as server:
+                    rps, stats, cache = asyncio.run(drive(server.port, workload, args.clients, args.seconds, share))
+                print(
+                    f"{name:<32} {rps:>8} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+                    f"{cache['pages']['hit_ratio']:>10.0%} {cache['rows']['hit_ratio']:>9.0%}"
+                )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""p50/p99 latency of repo.get_claim: connect-per-call (pre-pool) vs pooled connections vs the LRU claim cache.
+
+Usage: python -m benchmarks.bench_get_claim [--rows 10000] [--iterations 5000]
+"""
+import argparse
+import random
+import sqlite3
+
+from benchmarks._common import temp_data_dir, seed_claims, measure, print_table
+from claims import repo
+from claims.cache import claim_cache
+from claims.db import get_db_path
+from claims.models import Claim
+
+def get_claim_connect_per_call(claim_id: int):
+    # Mirrors the original implementation: resolve path, open, query, close
+    conn = sqlite3.connect(get_db_path())
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM claims WHERE id = ?", (claim_id,))
+    row = cursor.fetchone()
+    conn.close()
+    if row:
+        return Claim(**dict(row))
+    return None
+
+def lookups(fn, ids):
+    # One call per id, in order
+    remaining = iter(ids)
+    return lambda: fn(next(remaining))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with temp_data_dir():
+        seed_claims(args.rows)
+        rng = random.Random(7)
+        # Traffic concentrates on recent claims: 80% of lookups hit the newest 10%
+        hot_start = max(1, args.rows - args.rows // 10)
+        ids = [
+            rng.randint(hot_start, args.rows) if rng.random() < 0.8 else rng.randint(1, args.rows)
+            for _ in range(args.iterations)
+        ]
+
+        # Warm both paths (page cache, pool fill)
+        measure(lookups(get_claim_connect_per_call, ids), 100)
+        measure(lookups(repo.get_claim, ids), 100)
+
+        uncached = lambda claim_id: repo.get_claim(claim_id, use_cache=False)
+        results = {
+            "connect-per-call (before)": measure(lookups(get_claim_connect_per_call, ids), len(ids)),
+            "pooled, cache bypassed": measure(lookups(uncached, ids), len(ids)),
+        }
+        claim_cache.clear()
+        results["pooled + claim cache"] = measure(lookups(repo.get_claim, ids), len(ids))
+        print_table(f"get_claim over {args.rows} rows", results)
+        print(f"cache: {claim_cache.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Row -> Claim hydration cost: pydantic validation vs the trusted fast path vs lighter row views.
+
+Usage: python -m benchmarks.bench_hydration [--sizes 10000 100000] [--repeat 3]
+"""
+import argparse
+import time
+from datetime import datetime
+
+from benchmarks._common import temp_data_dir, seed_claims, measure
+from claims import repo
+from claims.db import get_connection
+from claims.models import Claim, ClaimType, Severity, Status, ResolutionOutcome
+
+class ClaimRow:
+    """Tuple-backed view with lazy conversion: only the fields a caller touches are parsed."""
+
+    __slots__ = ("_row",)
+
+    def __init__(self, row):
+        self._row = row
+
+    id = property(lambda self: self._row["id"])
+    claim_uuid = property(lambda self: self._row["claim_uuid"])
+    description = property(lambda self: self._row["description"])
+    photo_path = property(lambda self: self._row["photo_path"])
+    type = property(lambda self: ClaimType(self._row["type"]))
+    severity = property(lambda self: Severity(self._row["severity"]))
+    status = property(lambda self: Status(self._row["status"]))
+    created_at = property(lambda self: datetime.fromisoformat(self._row["created_at"]))
+
+def validate(row):
+    return Claim(**dict(row))
+
+def model_validate(row):
+    return Claim.model_validate(dict(row))
+
+def construct_unconverted(row):
+    # Lower bound for model_construct: no enum/datetime conversion at all (not type-correct)
+    return Claim.model_construct(**dict(row))
+
+def trusted(row):
+    return repo.claim_from_row(row)
+
+def slots_view(row):
+    return ClaimRow(row)
+
+def touch(claim):
+    # What the dashboard template reads per row
+    return (claim.id, claim.created_at, claim.type, claim.severity, claim.status, claim.description)
+
+def hydrate_all(fn, rows, touch_fields: bool):
+    def run():
+        if touch_fields:
+            for row in rows:
+                touch(fn(row))
+        else:
+            for row in rows:
+                fn(row)
+    return run
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = {
+        "Claim(**dict(row))": validate,
+        "model_validate": model_validate,
+        "model_construct, raw": construct_unconverted,
+        "claim_from_row (trusted)": trusted,
+        "__slots__ lazy view": slots_view,
+    }
+    with temp_data_dir():
+        seed_claims(max(args.sizes))
+        with get_connection() as conn:
+            all_rows = conn.execute("SELECT * FROM claims ORDER BY id").fetchall()
+
+        for size in args.sizes:
+            rows = all_rows[:size]
+            baseline = None
+            print(f"\n== hydrate {size} rows (best of {args.repeat}) ==")
+            print(f"{'case':<28} {'build ms':>10} {'+render fields ms':>18} {'us/row':>8} {'speedup':>8}")
+            for name, fn in cases.items():
+                build = measure(hydrate_all(fn, rows, touch_fields=False), args.repeat)["min_ms"]
+                used = measure(hydrate_all(fn, rows, touch_fields=True), args.repeat)["min_ms"]
+                baseline = baseline or used
+                print(f"{name:<28} {build:>10.1f} {used:>18.1f} {used / size * 1e3:>8.2f} {baseline / used:>7.1f}x")
+
+        for trusted_mode in (False, True):
+            repo.TRUSTED_HYDRATION = trusted_mode
+            start = time.perf_counter()
+            repo.list_claims()
+            label = "trusted" if trusted_mode else "validated"
+            print(f"\nrepo.list_claims() over {len(all_rows)} rows, {label}: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Bulk import throughput (rows/sec) for CSV and JSONL backfills vs repo.create_claim per row.
+
+Usage: python -m benchmarks.bench_import [--rows 200000] [--per-row 2000]
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks._common import temp_data_dir, WORDS
+from claims import importer, repo
+from claims.models import ClaimCreate, ClaimType, Severity, Status, ResolutionOutcome
+
+FIELDS = ["claim_uuid", "created_at", "updated_at", "resolved_at", "type", "severity", "status",
+          "description", "resolved_note", "resolution_outcome"]
+
+def export_rows(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    now = datetime.now()
+    start = now - timedelta(days=3 * 365)
+    for i in range(count):
+        created = start + timedelta(seconds=i * 3 * 365 * 86400 / count)
+        # The importer rejects timestamps after the import starts
+        resolved = min(created + timedelta(hours=rng.randint(1, 240)), now) if rng.random() < 0.6 else None
+        yield {
+            "claim_uuid": str(uuid.UUID(int=rng.getrandbits(128))),
+            "created_at": created.isoformat(),
+            "updated_at": (resolved or created).isoformat(),
+            "resolved_at": resolved.isoformat() if resolved else "",
+            "type": rng.choice(list(ClaimType)).value,
+            "severity": rng.choice(list(Severity)).value,
+            "status": Status.RESOLVED.value if resolved else Status.OPEN.value,
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(4, 30))),
+            "resolved_note": "Checked on floor" if resolved else "",
+            "resolution_outcome": rng.choice(list(ResolutionOutcome)).value if resolved else "",
+        }
+
+def as_csv(count: int) -> bytes:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(export_rows(count))
+    return out.getvalue().encode()
+
+def as_jsonl(count: int) -> bytes:
+    return "".join(
+        json.dumps({k: v for k, v in row.items() if v != ""}) + "\n" for row in export_rows(count)
+    ).encode()
+
+def run_import(data: bytes, fmt: str) -> dict:
+    with temp_data_dir():
+        report = importer.import_file(io.BytesIO(data), fmt)
+        # Second pass: every row is a duplicate (idempotent re-run)
+        rerun = importer.import_file(io.BytesIO(data), fmt)
+    assert report.inserted == report.received and rerun.inserted == 0
+    return {"rows": report.received, "seconds": report.seconds, "rows/s": report.rows_per_second,
+            "rerun rows/s": rerun.rows_per_second}
+
+def run_per_row(count: int) -> dict:
+    with temp_data_dir():
+        rows = list(export_rows(count))
+        start = time.perf_counter()
+        for row in rows:
+            repo.create_claim(ClaimCreate(**row))
+        seconds = time.perf_counter() - start
+    return {"rows": count, "seconds": round(seconds, 3), "rows/s": round(count / seconds, 1), "rerun rows/s": "-"}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--per-row", type=int, default=2_000, help="rows for the create_claim baseline")
+    args = parser.parse_args()
+
+    results = {
+        f"create_claim per row": run_per_row(args.per_row),
+        "import csv": run_import(as_csv(args.rows), "csv"),
+        "import jsonl": run_import(as_jsonl(args.rows), "jsonl"),
+    }
+    print(f"{'case':<24} {'rows':>8} {'seconds':>9} {'rows/s':>11} {'rerun rows/s':>13}")
+    for name, r in results.items():
+        print(f"{name:<24} {r['rows']:>8} {r['seconds']:>9} {r['rows/s']:>11} {r['rerun rows/s']:>13}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Capture latency with app.log written inline, through the log queue, and with logging off.
+
+Each variant starts its own uvicorn (CLAIMS_LOG=direct / queue / off) on the same
+seeded data dir and drives POST /claims from concurrent clients; every capture
+writes one log line. A second round makes every log flush take --stall-ms, the
+way a busy or network disk does.
+
+Usage: python -m benchmarks.bench_logging [--clients 20] [--seconds 10] [--rows 20000] [--stall-ms 5]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+
+from benchmarks._common import temp_data_dir, seed_claims, summarize
+from benchmarks._http import HttpClient, Server
+from benchmarks.loadgen import Workload
+
+VARIANTS = (("direct FileHandler (before)", "direct"), ("queue + writer thread (after)", "queue"), ("logging off", "off"))
+
+def _stalling(flush):
+    def flush_slowly(self):
+        time.sleep(float(os.environ["BENCH_LOG_STALL_MS"]) / 1000)
+        flush(self)
+    return flush_slowly
+
+def __getattr__(name):
+    # `benchmarks.bench_logging:app` for uvicorn: main's app, with slow log flushes if asked
+    if name != "app":
+        raise AttributeError(name)
+    from claims import applog
+    if float(os.getenv("BENCH_LOG_STALL_MS", "0")):
+        logging.StreamHandler.flush = _stalling(logging.StreamHandler.flush)
+        applog.RotatingLogFile.sync = _stalling(applog.RotatingLogFile.sync)
+    from main import app
+    return app
+
+async def drive(port: int, workload: Workload, clients: int, seconds: float):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def client(n: int):
+        rng = random.Random(n)
+        http = HttpClient("127.0.0.1", port)
+        try:
+            while time.perf_counter() < deadline:
+                method, path, body, headers, expected = workload.capture(rng)
+                start = time.perf_counter()
+                status, _, _ = await http.request(method, path, body, headers)
+                latencies.append(time.perf_counter() - start)
+                assert status in expected, (path, status)
+        finally:
+            await http.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    return round(len(latencies) / (time.perf_counter() - started), 1), summarize(latencies), max(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--format", default="json", choices=("json", "text"), help="CLAIMS_LOG_FORMAT")
+    parser.add_argument("--stall-ms", type=float, default=5, help="Delay per log flush in the second round (0 skips it)")
+    args = parser.parse_args()
+
+    with temp_data_dir() as data_dir:
+        seed_claims(args.rows)
+        # No photos: the request is the insert, the log line and the redirect
+        workload = Workload(data_dir, photos=[])
+        for stall in (0, args.stall_ms) if args.stall_ms else (0,):
+            print(f"\n== POST /claims, {args.clients} clients, {args.seconds}s per variant, {stall:g} ms per log flush ==")
+            print(f"{'variant':<32} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+            for name, mode in VARIANTS:
+                env = {"CLAIMS_LOG": mode, "CLAIMS_LOG_FORMAT": args.format, "BENCH_LOG_STALL_MS": str(stall)}
+                with Server("benchmarks.bench_logging:app", data_dir, env=env) as server:
+                    rps, stats, longest = asyncio.run(drive(server.port, workload, args.clients, args.seconds))
+                print(
+                    f"{name:<32} {rps:>8} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                    f"{stats['p99_ms']:>9.2f} {longest * 1000:>9.2f}"
+                )
+
+if __name__ == "__main__":
+    main()
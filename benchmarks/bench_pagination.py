@@ -0,0 +1,32 @@
+"""Dashboard list latency vs table size: full list_claims vs keyset pages.
+
+Usage: python -m benchmarks.bench_pagination [--sizes 10000,100000] [--iterations 50]
+"""
+import argparse
+
+from benchmarks._common import temp_data_dir, seed_claims, measure, print_table
+from claims import repo
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in [int(s) for s in args.sizes.split(",")]:
+        with temp_data_dir():
+            seed_claims(size)
+            # Cursor roughly in the middle of the table
+            page = repo.list_claims_page(limit=repo.DEFAULT_PAGE_SIZE)
+            for _ in range(min(size // repo.DEFAULT_PAGE_SIZE // 2, 200)):
+                page = repo.list_claims_page(after=page.next_cursor)
+            deep_cursor = page.next_cursor
+
+            print_table(f"{size} claims", {
+                "list_claims (unpaged)": measure(repo.list_claims, max(1, args.iterations // 10)),
+                "first page": measure(lambda: repo.list_claims_page(), args.iterations),
+                "deep page (after cursor)": measure(lambda: repo.list_claims_page(after=deep_cursor), args.iterations),
+            })
+
+if __name__ == "__main__":
+    main()
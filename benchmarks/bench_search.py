@@ -0,0 +1,43 @@
+"""Search latency: the original LIKE '%term%' scan vs the FTS5 index.
+
+Usage: python -m benchmarks.bench_search [--rows 1000000] [--iterations 20]
+"""
+import argparse
+
+from benchmarks._common import temp_data_dir, seed_claims, measure, print_table
+from claims import repo
+from claims.db import get_connection
+
+# Common words, a prefix, and a rare SKU number (the LIKE worst case: no early exit)
+TERMS = ("forklift", "pallet damaged", "supp", "48213")
+
+def search_like(term: str):
+    # The pre-FTS filter: leading wildcard LIKE on both text columns, newest first
+    like = f"%{term}%"
+    with get_connection() as conn:
+        return conn.execute("""
+            SELECT * FROM claims
+            WHERE (description LIKE ? OR resolved_note LIKE ?)
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, (like, like, repo.DEFAULT_PAGE_SIZE)).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    with temp_data_dir():
+        print(f"Seeding {args.rows} claims...")
+        seed_claims(args.rows)
+
+        results = {}
+        for term in TERMS:
+            results[f"LIKE  '{term}'"] = measure(lambda: search_like(term), args.iterations)
+            results[f"FTS page '{term}'"] = measure(lambda: repo.list_claims_page(search=term), args.iterations)
+            results[f"FTS ranked '{term}'"] = measure(lambda: repo.search_claims(term), args.iterations)
+        print_table(f"search over {args.rows} claims (first page of {repo.DEFAULT_PAGE_SIZE})", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Realistic claim datasets for load tests, seeded through the bulk import path.
+
+Types and severities are skewed, older claims are more likely resolved, descriptions
+run from a few words to a couple of paragraphs, and about a third of claims carry
+a photo from a shared pool (stored in the blob store, optionally with derivatives).
+
+Usage: python -m benchmarks.datasets --data-dir DIR [--rows 1000000] [--photos 500] [--derivatives]
+"""
+import argparse
+import hashlib
+import io
+import math
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks._common import WORDS
+from claims import db, derivatives, importer, storage
+from claims.db import init_db, close_pool
+from claims.models import ClaimType, ResolutionOutcome, Severity, Status
+from claims.writer import close_writer, run_write
+
+try:
+    from PIL import Image
+except ImportError:  # photos fall back to random bytes behind a JPEG header
+    Image = None
+
+# Share of claims per type / severity (most damage, few safety; mostly low severity)
+TYPE_WEIGHTS = {
+    ClaimType.DAMAGE: 45, ClaimType.SHORTAGE: 25, ClaimType.MISSING_KIT: 15,
+    ClaimType.SAFETY: 5, ClaimType.OTHER: 10,
+}
+SEVERITY_WEIGHTS = {Severity.LOW: 60, Severity.MED: 30, Severity.HIGH: 10}
+PHOTO_SHARE = 0.35
+NOTES = ["Checked on floor", "Supplier credited", "Replaced from stock", "Customer informed", "Write-off approved"]
+
+SEED_SQL = f"""
+    INSERT OR IGNORE INTO claims (
+        claim_uuid, created_at, updated_at, resolved_at, type, severity, status,
+        description, resolved_note, resolution_outcome, photo_path, due_at
+    ) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, {db.due_at_sql('?2', '?6')})
+"""
+
+def _photo_bytes(rng: random.Random, index: int) -> bytes:
+    if Image is None:
+        return b"\xff\xd8\xff\xe0" + rng.randbytes(rng.randint(40_000, 160_000)) + b"\xff\xd9"
+    # Noise over a random base colour: compresses like a real photo, unlike a flat fill
+    size = rng.choice([(1600, 1200), (1280, 960), (1024, 768)])
+    base = Image.new("RGB", size, tuple(rng.randint(40, 220) for _ in range(3)))
+    noise = Image.effect_noise(size, 40 + index % 20).convert("RGB")
+    out = io.BytesIO()
+    Image.blend(base, noise, 0.35).save(out, "JPEG", quality=80)
+    return out.getvalue()
+
+def create_photos(count: int, rng: random.Random) -> list:
+    # Write `count` distinct photos into the blob store; returns their photo_path values
+    uploads = storage.get_data_dir() / "uploads"
+    paths = []
+    for index in range(count):
+        data = _photo_bytes(rng, index)
+        path = storage.blob_path(hashlib.sha256(data).hexdigest(), ".jpg")
+        target = uploads / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        paths.append(path)
+    return paths
+
+def _description(rng: random.Random) -> str:
+    # Log-normal length: median ~15 words, a long tail of multi-paragraph reports
+    words = max(3, min(400, int(rng.lognormvariate(2.7, 0.9))))
+    text = " ".join(rng.choices(WORDS, k=words))
+    return f"{text} SKU-{rng.randint(10000, 99999)}"
+
+def claim_rows(count: int, photos: list, days: int = 730, seed: int = 42):
+    # Parameter tuples for SEED_SQL, oldest claim first
+    rng = random.Random(seed)
+    now = datetime.now()
+    start = now - timedelta(days=days)
+    types, type_weights = list(TYPE_WEIGHTS), list(TYPE_WEIGHTS.values())
+    severities, severity_weights = list(SEVERITY_WEIGHTS), list(SEVERITY_WEIGHTS.values())
+    outcomes = list(ResolutionOutcome)
+
+    for i in range(count):
+        # Captures cluster in working hours
+        day = start + timedelta(days=i * days / max(count, 1))
+        created = day.replace(hour=rng.choice((7, 8, 9, 10, 11, 13, 14, 15, 16, 19)), minute=rng.randint(0, 59),
+                              second=rng.randint(0, 59), microsecond=rng.randint(0, 999_999))
+        created = min(created, now)
+        severity = rng.choices(severities, severity_weights)[0]
+        age_days = (now - created).total_seconds() / 86400
+        # Backlog: almost everything older than a month is resolved, recent claims mostly open
+        roll = rng.random()
+        if roll < 1 - math.exp(-age_days / 10):
+            status = Status.RESOLVED
+        else:
+            status = Status.IN_REVIEW if roll > 0.97 else Status.OPEN
+        resolved = None
+        if status == Status.RESOLVED:
+            hours = rng.expovariate(1 / {Severity.HIGH: 12, Severity.MED: 48, Severity.LOW: 120}[severity])
+            resolved = min(created + timedelta(hours=hours), now)
+        photo = None
+        if photos and rng.random() < PHOTO_SHARE:
+            # Zipf-like reuse: a few photos (labels, templates) appear on many claims
+            photo = photos[min(len(photos) - 1, int(rng.paretovariate(1.2)) - 1)]
+        yield (
+            str(uuid.UUID(int=rng.getrandbits(128))),
+            created.isoformat(" "),
+            (resolved or created).isoformat(" "),
+            resolved.isoformat(" ") if resolved else None,
+            rng.choices(types, type_weights)[0].value,
+            severity.value,
+            status.value,
+            _description(rng),
+            rng.choice(NOTES) if resolved else None,
+            rng.choice(outcomes).value if resolved else None,
+            photo,
+        )
+
+def seed_dataset(
+    rows: int,
+    photos: int = 500,
+    days: int = 730,
+    seed: int = 42,
+    batch_size: int = importer.IMPORT_BATCH_SIZE,
+    with_derivatives: bool = False,
+    progress=None
+) -> dict:
+    # Into the current CLAIMS_DATA_DIR, through importer.insert_batch on the writer thread
+    init_db()
+    photo_paths = create_photos(photos, random.Random(seed))
+    started = time.perf_counter()
+    batch = []
+    inserted = 0
+    for row in claim_rows(rows, photo_paths, days, seed):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            inserted += run_write(lambda conn, b=batch: importer.insert_batch(conn, b, SEED_SQL))
+            batch = []
+            if progress:
+                progress(inserted, rows)
+    if batch:
+        inserted += run_write(lambda conn, b=batch: importer.insert_batch(conn, b, SEED_SQL))
+    seconds = time.perf_counter() - started
+
+    rendered = None
+    if with_derivatives and derivatives.available():
+        try:
+            rendered = derivatives.backfill()["generated"]
+        finally:
+            derivatives.shutdown_pool()
+    return {
+        "rows": inserted,
+        "photos": len(photo_paths),
+        "seconds": round(seconds, 1),
+        "rows_per_second": round(inserted / seconds) if seconds else 0,
+        "derivatives": rendered,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data-dir", required=True, help="Created if missing; claims are added to any existing data")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--photos", type=int, default=500, help="Distinct photos shared by about a third of claims")
+    parser.add_argument("--days", type=int, default=730, help="History the claims are spread over")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--derivatives", action="store_true", help="Also render thumbnails/web copies (needs Pillow)")
+    args = parser.parse_args()
+
+    os.environ["CLAIMS_DATA_DIR"] = str(Path(args.data_dir).resolve())
+
+    def progress(done, total):
+        print(f"  {done}/{total}", flush=True)
+
+    try:
+        result = seed_dataset(args.rows, args.photos, args.days, args.seed,
+                              with_derivatives=args.derivatives, progress=progress)
+    finally:
+        close_writer()
+        close_pool()
+    print(
+        f"Seeded {result['rows']} claims and {result['photos']} photos in {result['seconds']}s "
+        f"({result['rows_per_second']} rows/s) into {args.data_dir}"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Mixed-workload load test against a local uvicorn, with a JSON report per run.
+
+Closed-loop clients pick an operation by weight (capture, dashboard, filter, search,
+detail, export) and issue it over keep-alive connections. Per operation it reports
+requests, errors, req/s and p50/p95/p99 latency; --output writes the report as JSON
+and --compare prints the change against an earlier report.
+
+Runs against an existing data dir (e.g. one built by benchmarks.datasets; captures
+add claims to it) or seeds a temporary one with --rows.
+
+Usage: python -m benchmarks.loadgen [--data-dir DIR | --rows 100000] [--clients 20] [--seconds 30]
+           [--mix capture=10,dashboard=20,...] [--output run.json] [--compare previous.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import time
+import uuid
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks._common import ROOT, WORDS, temp_data_dir, summarize
+from benchmarks._http import HttpClient, Server
+from benchmarks import datasets
+from claims.db import DB_NAME
+from claims.models import ClaimType, Severity, SlaState, Status
+
+DEFAULT_MIX = {"capture": 10, "dashboard": 20, "filter": 25, "search": 15, "detail": 25, "export": 5}
+# Share of captures that attach a photo (each one also renders derivatives)
+CAPTURE_PHOTO_SHARE = 0.3
+# Detail views mostly hit recent claims, like people following up on the open queue
+RECENT_SHARE = 0.8
+RECENT_WINDOW = 1000
+
+class Workload:
+    """Builds requests for each operation from what the dataset contains."""
+
+    def __init__(self, data_dir: Path, photos: list):
+        conn = sqlite3.connect(Path(data_dir) / DB_NAME)
+        try:
+            self.max_id, first, last, self.rows = conn.execute(
+                "SELECT max(id), min(created_at), max(created_at), count(*) FROM claims"
+            ).fetchone()
+        finally:
+            conn.close()
+        if not self.rows:
+            raise SystemExit(f"No claims in {data_dir}; seed it with benchmarks.datasets first")
+        self.first = datetime.fromisoformat(first)
+        self.last = datetime.fromisoformat(last)
+        self.photos = photos
+
+    def _day(self, rng: random.Random) -> datetime:
+        span = max((self.last - self.first).days, 1)
+        return self.first + timedelta(days=rng.randint(0, span))
+
+    def capture(self, rng):
+        boundary = uuid.uuid4().hex
+        fields = {
+            "claim_uuid": str(uuid.uuid4()),
+            "type": rng.choice(list(ClaimType)).value,
+            "severity": rng.choice(list(Severity)).value,
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(5, 60))),
+        }
+        parts = [
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            for name, value in fields.items()
+        ]
+        if self.photos and rng.random() < CAPTURE_PHOTO_SHARE:
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="photo"; filename="photo.jpg"\r\n'
+                f"Content-Type: image/jpeg\r\n\r\n".encode() + rng.choice(self.photos) + b"\r\n"
+            )
+        body = b"".join(parts) + f"--{boundary}--\r\n".encode()
+        return "POST", "/claims", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}, (303,)
+
+    def dashboard(self, rng):
+        return "GET", "/", b"", {}, (200,)
+
+    def filter(self, rng):
+        params = {}
+        if rng.random() < 0.6:
+            params["status"] = rng.choice(list(Status)).value
+        if rng.random() < 0.4:
+            params["severity"] = rng.choice(list(Severity)).value
+        if rng.random() < 0.4:
+            params["type"] = rng.choice(list(ClaimType)).value
+        if rng.random() < 0.15:
+            params["sla"] = rng.choice(list(SlaState)).value
+        if rng.random() < 0.3:
+            start = self._day(rng)
+            params["date_from"] = start.date().isoformat()
+            params["date_to"] = (start + timedelta(days=rng.choice((7, 30, 90)))).date().isoformat()
+        return "GET", f"/?{urlencode(params)}", b"", {}, (200,)
+
+    def search(self, rng):
+        terms = " ".join(rng.sample(WORDS, rng.choice((1, 1, 2))))
+        if rng.random() < 0.5:
+            return "GET", f"/api/search?{urlencode({'q': terms})}", b"", {}, (200,)
+        return "GET", f"/?{urlencode({'search': terms})}", b"", {}, (200,)
+
+    def detail(self, rng):
+        if rng.random() < RECENT_SHARE:
+            claim_id = rng.randint(max(1, self.max_id - RECENT_WINDOW), self.max_id)
+        else:
+            claim_id = rng.randint(1, self.max_id)
+        # Ids left by INSERT OR IGNORE duplicates are gaps, so 404 is an expected answer
+        return "GET", f"/claims/{claim_id}", b"", {}, (200, 404)
+
+    def export(self, rng):
+        start = self._day(rng)
+        form = {"date_from": start.date().isoformat(), "date_to": (start + timedelta(days=7)).date().isoformat()}
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        return "POST", "/export", urlencode(form).encode(), headers, (200,)
+
+async def drive(port: int, workload: Workload, mix: dict, clients: int, seconds: float, warmup: float, seed: int):
+    names, weights = list(mix), list(mix.values())
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + seconds
+
+    async def client(n: int):
+        rng = random.Random(seed * 1000 + n)
+        http = HttpClient("127.0.0.1", port)
+        try:
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                method, path, body, headers, expected = getattr(workload, name)(rng)
+                start = time.perf_counter()
+                try:
+                    status, _, _ = await http.request(method, path, body, headers)
+                    ok = status in expected
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    await http.close()
+                    ok = False
+                end = time.perf_counter()
+                if start < measure_from:
+                    continue
+                samples[name].append(end - start)
+                errors[name] += not ok
+        finally:
+            await http.close()
+
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    return samples, errors
+
+def build_report(samples: dict, errors: dict, seconds: float, meta: dict) -> dict:
+    operations = {}
+    for name, latencies in samples.items():
+        operations[name] = {
+            "requests": len(latencies),
+            "errors": errors[name],
+            "rps": round(len(latencies) / seconds, 1),
+            **(summarize(latencies) if latencies else {}),
+        }
+    everything = [s for latencies in samples.values() for s in latencies]
+    operations["total"] = {
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "rps": round(len(everything) / seconds, 1),
+        **(summarize(everything) if everything else {}),
+    }
+    return {"meta": meta, "operations": operations}
+
+def git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+def print_report(report: dict):
+    print(f"\n{'operation':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in report["operations"].items():
+        print(
+            f"{name:<10} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>8} "
+            f"{stats.get('p50_ms', 0):>9.2f} {stats.get('p95_ms', 0):>9.2f} {stats.get('p99_ms', 0):>9.2f}"
+        )
+
+def print_comparison(previous: dict, report: dict):
+    def change(old, new):
+        return f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+
+    print(f"\n== vs {previous['meta'].get('git', {}).get('commit')} ({previous['meta'].get('started_at')}) ==")
+    differs = [key for key in ("rows", "clients", "mix", "workers", "env") if previous["meta"].get(key) != report["meta"][key]]
+    if differs:
+        print(f"Note: the runs also differ in {', '.join(differs)}")
+    print(f"{'operation':<10} {'req/s':>18} {'p50 ms':>22} {'p95 ms':>22} {'p99 ms':>22}")
+    for name, new in report["operations"].items():
+        old = previous["operations"].get(name)
+        if not old or not old.get("requests") or not new.get("requests"):
+            continue
+        cells = [f"{old['rps']:>7}->{new['rps']:<7} {change(old['rps'], new['rps']):>5}"]
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            cells.append(f"{old[key]:>7.1f}->{new[key]:<7.1f} {change(old[key], new[key]):>5}")
+        print(f"{name:<10} " + " ".join(cells))
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in filter(None, text.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r} (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="Existing data dir to serve (default: seed a temporary one)")
+    parser.add_argument("--rows", type=int, default=100_000, help="Claims to seed when no --data-dir is given")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds of load before measuring starts")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="Operation weights, e.g. capture=10,search=5")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="Extra server environment, repeatable")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    env = dict(item.split("=", 1) for item in args.env)
+    previous = json.loads(Path(args.compare).read_text()) if args.compare else None
+    photo_rng = random.Random(args.seed)
+    photos = [datasets._photo_bytes(photo_rng, i) for i in range(3)]
+
+    with (nullcontext(Path(args.data_dir)) if args.data_dir else temp_data_dir()) as data_dir:
+        if not args.data_dir:
+            print(f"Seeding {args.rows} claims...")
+            datasets.seed_dataset(args.rows, photos=20)
+        workload = Workload(data_dir, photos)
+        meta = {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "rows": workload.rows,
+            "data_dir": str(args.data_dir) if args.data_dir else None,
+            "clients": args.clients,
+            "seconds": args.seconds,
+            "warmup": args.warmup,
+            "workers": args.workers,
+            "mix": args.mix,
+            "env": env,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        }
+        with Server("main:app", data_dir, env=env, workers=args.workers) as server:
+            print(f"Driving {args.clients} clients for {args.seconds}s (+{args.warmup}s warmup) against {workload.rows} claims")
+            samples, errors = asyncio.run(
+                drive(server.port, workload, args.mix, args.clients, args.seconds, args.warmup, args.seed)
+            )
+
+    report = build_report(samples, errors, args.seconds, meta)
+    print_report(report)
+    if previous:
+        print_comparison(previous, report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, TypeVar
+from . import analytics, derivatives, repo, storage
+from .db import POOL_SIZE
+
+T = TypeVar("T")
+
+# One thread per pooled connection: DB threads never queue on the pool itself
+DB_THREADS = int(os.getenv("CLAIMS_DB_THREADS", str(POOL_SIZE)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="claims-db")
+    return _executor
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+async def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    # Run a blocking call on the DB executor, carrying over the caller's contextvars
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+def _awaitable(fn: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(fn, *args, **kwargs)
+    return wrapper
+
+# Same API as claims.repo, as coroutines
+create_claim = _awaitable(repo.create_claim)
+get_claim = _awaitable(repo.get_claim)
+get_claim_by_uuid = _awaitable(repo.get_claim_by_uuid)
+list_claims = _awaitable(repo.list_claims)
+list_claims_page = _awaitable(repo.list_claims_page)
+search_claims = _awaitable(repo.search_claims)
+claim_counts = _awaitable(repo.claim_counts)
+update_claim = _awaitable(repo.update_claim)
+update_claim_status = _awaitable(repo.update_claim_status)
+update_claims_status = _awaitable(repo.update_claims_status)
+update_claim_photo = _awaitable(repo.update_claim_photo)
+rebuild_rollup = _awaitable(repo.rebuild_rollup)
+data_version = _awaitable(repo.data_version)
+sla_summary = _awaitable(repo.sla_summary)
+claim_trends = _awaitable(analytics.claim_trends)
+rendered_photos = _awaitable(derivatives.rendered)
+
+# File operations from claims.storage (save_upload is natively async)
+save_upload = storage.save_upload
@@ -0,0 +1,222 @@
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+from . import repo
+from .models import ClaimTrends, ClaimType, ResolutionOutcome, ResolutionTimes, Severity, Status
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the analytics endpoint answers 503 without it
+    np = None
+
+DEFAULT_DAYS = 90
+MAX_DAYS = 3650
+DEFAULT_WINDOW = 7
+MAX_WINDOW = 90
+PERCENTILES = (50, 90, 95, 99)
+# Reports kept per data version (one per distinct days/window/end combination)
+REPORT_CACHE_SIZE = 32
+
+EPOCH = date(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+_TYPES = list(ClaimType)
+_SEVERITIES = list(Severity)
+_OUTCOMES = list(ResolutionOutcome)
+
+def available() -> bool:
+    return np is not None
+
+def _codes(column: str, members) -> Tuple[str, list]:
+    # Enum column -> its index in the model enum (-1 for NULL), computed in SQL
+    cases = " ".join("WHEN ? THEN ?" for _ in members)
+    params = [v for i, m in enumerate(members) for v in (m.value, i)]
+    return f"CASE {column} {cases} ELSE -1 END", params
+
+def _select() -> Tuple[str, list]:
+    type_sql, type_params = _codes("type", _TYPES)
+    severity_sql, severity_params = _codes("severity", _SEVERITIES)
+    outcome_sql, outcome_params = _codes("resolution_outcome", _OUTCOMES)
+    # Enums and the resolved flag share one integer (4 bits each) so a row is four ints
+    sql = f"""
+        SELECT
+            id,
+            CAST(strftime('%s', created_at) AS INTEGER),
+            coalesce(CAST(strftime('%s', resolved_at) AS INTEGER), -1),
+            ({type_sql}) | (({severity_sql}) << 4) | ((({outcome_sql}) + 1) << 8) | ((status = ?) << 12)
+        FROM claims
+    """
+    return sql, type_params + severity_params + outcome_params + [Status.RESOLVED.value]
+
+def _fetch(conn, where: str = "", params: tuple = ()):
+    sql, select_params = _select()
+    cursor = conn.cursor()
+    # Plain tuples: numpy converts them several times faster than sqlite3.Row
+    cursor.row_factory = None
+    rows = cursor.execute(f"{sql} {where}", select_params + list(params)).fetchall()
+    data = np.array(rows, dtype=np.int64).reshape(-1, 4)
+    # Sorted here, not in SQL: changed rows come off the change_seq index in change order
+    return data[np.argsort(data[:, 0], kind="stable")]
+
+class ClaimColumns:
+    """Claim columns as parallel arrays, one entry per claim, ordered by id.
+
+    Timestamps are whole epoch seconds of the stored naive local time, so
+    `// 86400` is the local calendar day. Enums are indexes into the model enum
+    order; -1 marks NULL (unresolved, no outcome).
+    """
+
+    __slots__ = ("version", "data", "ids", "created", "resolved", "type", "severity", "is_resolved", "outcome")
+
+    def __init__(self, data, version=None):
+        self.version = version
+        self.data = data
+        self.ids = data[:, 0]
+        self.created = data[:, 1]
+        self.resolved = data[:, 2]
+        codes = data[:, 3]
+        self.type = (codes & 0xF).astype(np.int8)
+        self.severity = ((codes >> 4) & 0xF).astype(np.int8)
+        self.outcome = ((codes >> 8) & 0xF).astype(np.int8) - 1
+        self.is_resolved = ((codes >> 12) & 1).astype(bool)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+def _data_version(conn) -> Tuple[int, int]:
+    # (change counter, deletes so far): see db._migrate_change_tracking
+    version, deletes = conn.execute("SELECT version, deletes FROM data_version WHERE id = 1").fetchone()
+    return version, deletes
+
+def load_columns(conn, version=None, previous: Optional[ClaimColumns] = None) -> ClaimColumns:
+    # With `previous`, only claims changed since its version (change_seq above it) are
+    # read, via the change_seq index, and merged in. Deleted rows leave no change_seq
+    # behind, so a delete since `previous` means a full reload.
+    if previous is None or previous.version is None or version is None or previous.version[1] != version[1]:
+        return ClaimColumns(_fetch(conn), version)
+
+    max_id = previous.ids[-1] if len(previous) else 0
+    changed = _fetch(conn, "WHERE change_seq > ?", (previous.version[0],))
+    existing = changed[:, 0] <= max_id
+    # Never modify previous.data in place: another request may be computing from it
+    data = previous.data.copy()
+    data[np.searchsorted(data[:, 0], changed[existing, 0])] = changed[existing]
+    return ClaimColumns(np.concatenate((data, changed[~existing])), version)
+
+def _rolling_sum(values, window: int):
+    # Sums of each trailing window; the input carries window - 1 leading days of padding
+    totals = np.concatenate(([0], np.cumsum(values)))
+    return totals[window:] - totals[:-window]
+
+def compute_trends(columns: ClaimColumns, end: date, days: int = DEFAULT_DAYS, window: int = DEFAULT_WINDOW) -> ClaimTrends:
+    last = (end - EPOCH).days
+    first = last - days + 1
+    # Padding before `first` so the first rolling values cover whole windows
+    low = first - (window - 1)
+    span = last - low + 1
+
+    created_day = columns.created // SECONDS_PER_DAY
+    in_span = (created_day >= low) & (created_day <= last)
+    offsets = created_day[in_span] - low
+
+    by_type = np.bincount(
+        offsets * len(_TYPES) + columns.type[in_span], minlength=span * len(_TYPES)
+    ).reshape(span, len(_TYPES))
+    created = by_type.sum(axis=1)
+    created_resolved = np.bincount(offsets, weights=columns.is_resolved[in_span], minlength=span)
+
+    has_resolved_at = columns.resolved >= 0
+    resolved_day = np.where(has_resolved_at, columns.resolved // SECONDS_PER_DAY, low - 1)
+    resolved_in_span = (resolved_day >= low) & (resolved_day <= last)
+    resolved = np.bincount(resolved_day[resolved_in_span] - low, minlength=span)
+
+    rolling_created = _rolling_sum(created, window)
+    rolling_resolved = _rolling_sum(created_resolved, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.round(rolling_resolved / rolling_created, 4)
+
+    # Resolution times of the claims resolved within [first, last]
+    closed = has_resolved_at & (resolved_day >= first) & (resolved_day <= last) & columns.is_resolved
+    hours = (columns.resolved[closed] - columns.created[closed]) / 3600.0
+    closed_severity = columns.severity[closed]
+    resolution_times = {}
+    for code, severity in enumerate(_SEVERITIES):
+        sample = hours[closed_severity == code]
+        values = np.percentile(sample, PERCENTILES) if len(sample) else [None] * len(PERCENTILES)
+        resolution_times[severity] = ResolutionTimes(
+            count=len(sample),
+            mean_hours=round(float(sample.mean()), 2) if len(sample) else None,
+            hours={f"p{p}": (round(float(v), 2) if v is not None else None) for p, v in zip(PERCENTILES, values)}
+        )
+
+    outcome_codes = columns.outcome[closed]
+    outcome_counts = np.bincount(outcome_codes[outcome_codes >= 0], minlength=len(_OUTCOMES))
+
+    visible = slice(window - 1, None)
+    return ClaimTrends(
+        start=end - timedelta(days=days - 1),
+        end=end,
+        window=window,
+        days=[end - timedelta(days=days - 1 - i) for i in range(days)],
+        created=created[visible].tolist(),
+        created_by_type={t: by_type[visible, i].tolist() for i, t in enumerate(_TYPES)},
+        resolved=resolved[visible].tolist(),
+        created_rolling=np.round(rolling_created / window, 3).tolist(),
+        resolution_rate=[None if np.isnan(r) else r for r in rate.tolist()],
+        resolution_times=resolution_times,
+        outcomes={o: int(n) for o, n in zip(_OUTCOMES, outcome_counts)}
+    )
+
+class TrendsCache:
+    """Column arrays and computed reports, both tied to the change counter.
+
+    Any claim write moves the version; the next request reads just the changed
+    rows into new arrays and drops the old reports. Reports are shared: read-only.
+    """
+
+    def __init__(self, size: int = REPORT_CACHE_SIZE):
+        self.size = size
+        self._columns: Optional[ClaimColumns] = None
+        self._reports: "OrderedDict[tuple, ClaimTrends]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, days: int = DEFAULT_DAYS, window: int = DEFAULT_WINDOW, end: Optional[date] = None) -> ClaimTrends:
+        end = end or datetime.now().date()
+        with repo.read_snapshot() as conn:
+            version = _data_version(conn)
+            # One loader at a time: concurrent requests wait for its arrays instead of each scanning
+            with self._lock:
+                if self._columns is None or self._columns.version != version:
+                    self._columns = load_columns(conn, version, self._columns)
+                    self._reports.clear()
+                    self.loads += 1
+                columns = self._columns
+
+        key = (days, window, end)
+        with self._lock:
+            report = self._reports.get(key)
+            if report is not None and columns is self._columns:
+                self._reports.move_to_end(key)
+                return report
+
+        report = compute_trends(columns, end, days, window)
+        with self._lock:
+            if columns is self._columns:
+                self._reports[key] = report
+                while len(self._reports) > self.size:
+                    self._reports.popitem(last=False)
+        return report
+
+    def clear(self):
+        with self._lock:
+            self._columns = None
+            self._reports.clear()
+
+trends_cache = TrendsCache()
+
+def claim_trends(days: int = DEFAULT_DAYS, window: int = DEFAULT_WINDOW, end: Optional[date] = None) -> ClaimTrends:
+    days = max(1, min(days, MAX_DAYS))
+    window = max(1, min(window, MAX_WINDOW))
+    return trends_cache.get(days, window, end)
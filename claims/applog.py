@@ -0,0 +1,207 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from . import metrics
+
+# "off": no app.log at all; "direct": write on the calling thread (the old behaviour)
+LOG_MODE = os.getenv("CLAIMS_LOG", "queue").lower()
+# "json" (one object per line) or "text" (the old "time - LEVEL - message" lines)
+LOG_FORMAT = os.getenv("CLAIMS_LOG_FORMAT", "json").lower()
+LOG_MAX_BYTES = int(os.getenv("CLAIMS_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATE_HOURS = float(os.getenv("CLAIMS_LOG_ROTATE_HOURS", "24"))
+LOG_BACKUPS = int(os.getenv("CLAIMS_LOG_BACKUPS", "7"))
+# Records waiting for the writer thread; beyond this they are dropped rather than block a request
+LOG_QUEUE_SIZE = int(os.getenv("CLAIMS_LOG_QUEUE_SIZE", "10000"))
+# The writer wakes this often and writes and flushes everything queued since. Waking per
+# record instead costs a thread switch (and a GIL handoff) and a flush for every line.
+LOG_FLUSH_MS = float(os.getenv("CLAIMS_LOG_FLUSH_MS", "100"))
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# LogRecord attributes that are not `extra=` fields
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+LOG_RECORDS_DROPPED = metrics.Counter("claims_log_records_dropped_total", "Log records dropped because the log queue was full.")
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, message, `extra=` fields and any traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_FIELDS:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RotatingLogFile(logging.handlers.RotatingFileHandler):
+    """app.log rotated at `max_bytes`, or after `rotate_hours` in this process (app.log.1 .. .N).
+
+    Records are written to the file's buffer only; the writer calls `sync()` once
+    per wake-up instead of flushing after every record.
+    """
+
+    def __init__(self, path, max_bytes: int = LOG_MAX_BYTES, rotate_hours: float = LOG_ROTATE_HOURS, backups: int = LOG_BACKUPS):
+        super().__init__(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        self.rotate_seconds = rotate_hours * 3600
+        self._opened_at = time.time()
+
+    def shouldRollover(self, record) -> bool:
+        if self.rotate_seconds and time.time() - self._opened_at >= self.rotate_seconds:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._opened_at = time.time()
+
+    def flush(self):
+        # Deferred to sync(); close() still flushes the file
+        pass
+
+    def sync(self):
+        with self.lock:
+            if self.stream:
+                self.stream.flush()
+
+class BufferedHandler(logging.Handler):
+    """Appends records to the writer's buffer; the caller never formats, writes or waits.
+
+    A deque append needs no lock or wake-up; the writer is woken early only once the
+    buffer is half full, so bursts drain before they hit the cap. Messages with %-args
+    and tracebacks are resolved here, on the caller's thread, since the args may change
+    and the frames should not outlive the call; f-string messages are passed as they are.
+    """
+
+    def __init__(self, records: deque, wake: threading.Event, limit: int = LOG_QUEUE_SIZE):
+        super().__init__()
+        self.records = records
+        self.wake = wake
+        self.limit = limit
+
+    def emit(self, record: logging.LogRecord):
+        queued = len(self.records)
+        if queued >= self.limit:
+            LOG_RECORDS_DROPPED.inc()
+            return
+        if queued >= self.limit // 2:
+            self.wake.set()
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # No handler lock: emit only appends, and the deque is thread-safe
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+class LogWriter:
+    """Writes buffered records on one background thread, every LOG_FLUSH_MS.
+
+    Each wake-up formats and writes everything buffered since the last one and
+    flushes once; file writes, rotation and flushes never happen on a request.
+    """
+
+    def __init__(self, handler: RotatingLogFile, records: deque, interval: float = LOG_FLUSH_MS / 1000):
+        self.handler = handler
+        self.records = records
+        self.interval = interval
+        self.wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="claims-log-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _drain(self):
+        written = 0
+        while True:
+            try:
+                record = self.records.popleft()
+            except IndexError:
+                break
+            self.handler.handle(record)
+            written += 1
+        if written:
+            self.handler.sync()
+
+    def _run(self):
+        while not self._stopping:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self._drain()
+        self._drain()
+
+    def stop(self):
+        self._stopping = True
+        self.wake.set()
+        self._thread.join()
+        self.handler.close()
+
+_writer: Optional[LogWriter] = None
+# (logger, handler) added by configure(), removed by shutdown()
+_attached: Optional[tuple] = None
+_path: Optional[Path] = None
+
+def make_formatter() -> logging.Formatter:
+    return JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+
+def log_path() -> Optional[Path]:
+    # The file configure() attached, or None (not configured, or CLAIMS_LOG=off)
+    return _path
+
+def configure(logger: logging.Logger, path: Path):
+    # Attach app.log to `logger` according to CLAIMS_LOG
+    global _writer, _attached, _path
+    if LOG_MODE == "off":
+        handler = logging.NullHandler()
+    elif LOG_MODE == "direct":
+        handler = logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(make_formatter())
+        _path = Path(path)
+    else:
+        file_handler = RotatingLogFile(path)
+        file_handler.setFormatter(make_formatter())
+        records = deque()
+        _writer = LogWriter(file_handler, records)
+        _writer.start()
+        # Also on plain interpreter exit (scripts importing main), not only app shutdown
+        atexit.register(shutdown)
+        handler = BufferedHandler(records, _writer.wake)
+        _path = Path(path)
+    logger.addHandler(handler)
+    _attached = (logger, handler)
+
+def shutdown():
+    # Write out whatever is still buffered and detach the handler configure() added
+    global _writer, _attached, _path
+    if _attached is not None:
+        logger, handler = _attached
+        logger.removeHandler(handler)
+        handler.close()
+        _attached = None
+        _path = None
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+from . import db, derivatives, storage
+from .db import get_connection
+from .writer import run_write
+
+# Unreferenced files younger than this are kept: an upload is saved before its claim row exists
+GC_GRACE_SECONDS = int(os.getenv("CLAIMS_BLOB_GC_GRACE", "3600"))
+
+logger = logging.getLogger("claims_tracker")
+
+def rebuild_refcounts():
+    def job(conn):
+        db.rebuild_blob_refcounts(conn.cursor())
+    run_write(job)
+
+def referenced_paths() -> set:
+    with get_connection() as conn:
+        return {row["path"] for row in conn.execute("SELECT path FROM blobs WHERE refcount > 0")}
+
+def _sweep(root, source_of, referenced: set, cutoff: float, result: Dict[str, int], key: str, dry_run: bool):
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            if source_of(path.relative_to(root).as_posix()) in referenced:
+                continue
+            try:
+                stat = path.stat()
+                if stat.st_mtime > cutoff:
+                    result["kept_recent"] += 1
+                    continue
+                if not dry_run:
+                    os.remove(path)
+            except OSError:
+                continue
+            result[key] += 1
+            result["bytes_freed"] += stat.st_size
+
+def _prune_empty_dirs(root):
+    for dirpath, _, _ in os.walk(root, topdown=False):
+        if dirpath != str(root) and not os.listdir(dirpath):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+
+def _expired_rows(cutoff: float) -> List[str]:
+    # Rows at zero whose upload is gone or past the grace period. derivatives.mark_rendered()
+    # creates the row of a fresh upload before its claim exists: dropping it loses the flag.
+    with get_connection() as conn:
+        paths = [row["path"] for row in conn.execute("SELECT path FROM blobs WHERE refcount <= 0")]
+    expired = []
+    for path in paths:
+        try:
+            if storage.get_upload_path(path).stat().st_mtime > cutoff:
+                continue
+        except OSError:
+            pass
+        expired.append(path)
+    return expired
+
+def collect_garbage(grace_seconds: int = GC_GRACE_SECONDS, dry_run: bool = False) -> Dict[str, int]:
+    result = {"blobs_removed": 0, "derivatives_removed": 0, "kept_recent": 0, "bytes_freed": 0}
+    referenced = referenced_paths()
+    cutoff = time.time() - grace_seconds
+
+    # Unreferenced blobs, legacy flat names and temp files from aborted uploads
+    uploads_dir = storage.get_data_dir() / "uploads"
+    _sweep(uploads_dir, lambda rel: rel, referenced, cutoff, result, "blobs_removed", dry_run)
+    # "<photo_path>.<size>.jpg" -> photo_path
+    derivatives_dir = derivatives.get_derivatives_dir()
+    _sweep(derivatives_dir, lambda rel: rel.rsplit(".", 2)[0], referenced, cutoff, result, "derivatives_removed", dry_run)
+
+    if not dry_run:
+        _prune_empty_dirs(uploads_dir)
+        _prune_empty_dirs(derivatives_dir)
+        # Rows at zero are recreated by the triggers if the content is uploaded again.
+        # refcount is checked again: a claim may have taken a reference since.
+        expired = json.dumps(_expired_rows(cutoff))
+        run_write(lambda conn: conn.execute(
+            "DELETE FROM blobs WHERE refcount <= 0 AND path IN (SELECT value FROM json_each(?))", (expired,)
+        ))
+
+    logger.info(
+        f"Blob GC{' (dry run)' if dry_run else ''}: {result['blobs_removed']} blobs, "
+        f"{result['derivatives_removed']} derivatives, {result['bytes_freed']} bytes"
+    )
+    return result
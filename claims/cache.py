@@ -0,0 +1,110 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from .models import Claim
+
+# Claims kept per process; 0 disables the cache
+CACHE_SIZE = int(os.getenv("CLAIMS_CACHE_SIZE", "2048"))
+# Bypass switch: "off" sends every lookup to SQLite (e.g. several workers writing to one DB)
+CACHE_ENABLED = os.getenv("CLAIMS_CACHE", "on").lower() not in ("off", "0", "false")
+
+class ClaimCache:
+    """Bounded LRU of Claim objects keyed by id, with a uuid -> id index.
+
+    Writers refresh entries with the row they just committed. A put never replaces
+    an entry with a lower change_seq (the trigger-kept data_version of the claim's last
+    write), so a reader that fetched a row just before a write cannot resurrect the stale
+    version. updated_at would not do: it is wall-clock time, and can step back. Changing the SLA policy re-dates claims
+    without touching updated_at: `sync_policy` drops every entry once the policy
+    version read from the database moves, whichever process changed it. Cached claims
+    are shared: treat them as read-only.
+    """
+
+    def __init__(self, capacity: int = CACHE_SIZE, enabled: bool = CACHE_ENABLED):
+        self.capacity = capacity
+        self.enabled = enabled and capacity > 0
+        self._claims: "OrderedDict[int, Claim]" = OrderedDict()
+        self._ids_by_uuid: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # sla_version the cached due_at values were read under; None until first synced
+        self.policy_version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, claim_id: int) -> Optional[Claim]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            claim = self._claims.get(claim_id)
+            if claim is None:
+                self.misses += 1
+                return None
+            self._claims.move_to_end(claim_id)
+            self.hits += 1
+            return claim
+
+    def get_by_uuid(self, claim_uuid: str) -> Optional[Claim]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            claim_id = self._ids_by_uuid.get(claim_uuid)
+            claim = self._claims.get(claim_id) if claim_id is not None else None
+            if claim is None:
+                self.misses += 1
+                return None
+            self._claims.move_to_end(claim_id)
+            self.hits += 1
+            return claim
+
+    def put(self, claim: Claim):
+        if not self.enabled:
+            return
+        with self._lock:
+            current = self._claims.get(claim.id)
+            if current is not None and current.change_seq > claim.change_seq:
+                return
+            self._claims[claim.id] = claim
+            self._claims.move_to_end(claim.id)
+            self._ids_by_uuid[claim.claim_uuid] = claim.id
+            while len(self._claims) > self.capacity:
+                _, evicted = self._claims.popitem(last=False)
+                self._ids_by_uuid.pop(evicted.claim_uuid, None)
+                self.evictions += 1
+
+    def invalidate(self, claim_id: int):
+        with self._lock:
+            claim = self._claims.pop(claim_id, None)
+            if claim is not None:
+                self._ids_by_uuid.pop(claim.claim_uuid, None)
+
+    def clear(self):
+        with self._lock:
+            self._claims.clear()
+            self._ids_by_uuid.clear()
+
+    def sync_policy(self, version: int):
+        if version == self.policy_version:
+            return
+        with self._lock:
+            if version != self.policy_version:
+                self._claims.clear()
+                self._ids_by_uuid.clear()
+                self.policy_version = version
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._claims),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "policy_version": self.policy_version,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+claim_cache = ClaimCache()
@@ -0,0 +1,201 @@
+import argparse
+import sys
+from datetime import datetime, timedelta
+from .db import MIGRATIONS, SCHEMA_VERSION, init_db, get_db_path
+from .writer import close_writer
+from . import blobs, derivatives, importer, migrations, query_plans, repo, slow_queries
+from .db import get_connection
+from .models import Severity
+
+def cmd_rebuild_rollup(args) -> int:
+    rows = repo.rebuild_rollup()
+    print(f"Rebuilt claims_daily_rollup: {rows} rows ({get_db_path()})")
+    return 0
+
+def cmd_backfill_derivatives(args) -> int:
+    if not derivatives.available():
+        print("Pillow is not installed; nothing to do", file=sys.stderr)
+        return 1
+
+    def progress(done, total):
+        if done % 100 == 0 or done == total:
+            print(f"  {done}/{total}", flush=True)
+
+    try:
+        result = derivatives.backfill(force=args.force, progress=progress)
+    finally:
+        derivatives.shutdown_pool()
+    print(f"Derivatives: {result['generated']} generated, {result['skipped']} already present or missing, {result['failed']} failed")
+    return 1 if result["failed"] else 0
+
+def cmd_gc_blobs(args) -> int:
+    if args.recount:
+        blobs.rebuild_refcounts()
+    result = blobs.collect_garbage(grace_seconds=args.grace, dry_run=args.dry_run)
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(
+        f"{verb} {result['blobs_removed']} blobs and {result['derivatives_removed']} derivatives "
+        f"({result['bytes_freed'] / 1024 / 1024:.1f} MB); kept {result['kept_recent']} recent unreferenced files"
+    )
+    return 0
+
+def cmd_import_claims(args) -> int:
+    fmt = args.format or importer.detect_format(args.path)
+
+    def progress(report):
+        print(f"  {report.received} rows read, {report.inserted} inserted ({report.rows_per_second:.0f} rows/s)", flush=True)
+
+    if args.path == "-":
+        report = importer.import_file(sys.stdin.buffer, fmt, batch_size=args.batch_size, progress=progress)
+    else:
+        with open(args.path, "rb") as f:
+            report = importer.import_file(f, fmt, batch_size=args.batch_size, progress=progress)
+
+    for error in report.errors:
+        print(f"  line {error.line}: {error.error}", file=sys.stderr)
+    print(
+        f"Imported {report.inserted} claims ({report.duplicates} already present, {report.invalid} invalid) "
+        f"in {report.seconds:.1f}s, {report.rows_per_second:.0f} rows/s"
+    )
+    return 1 if report.invalid else 0
+
+def _sla_setting(value: str):
+    severity, _, hours = value.partition("=")
+    try:
+        return Severity(severity), int(hours)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected SEVERITY=HOURS (e.g. High=24), got {value!r}")
+
+def cmd_sla(args) -> int:
+    for severity, hours in args.set or []:
+        changed = repo.set_sla_hours(severity, hours)
+        print(f"{severity.value}: {hours}h ({changed} claims re-dated)")
+    summary = repo.sla_summary()
+    for severity in Severity:
+        hours = summary.policy_hours.get(severity)
+        print(
+            f"{severity.value:<5} SLA {f'{hours}h' if hours else 'none':>6}  "
+            f"breached {summary.breached[severity]:>5}  at risk {summary.at_risk[severity]:>5}"
+        )
+    return 0
+
+def _print_migration_report(reports) -> None:
+    for report in reports:
+        print(f"v{report['version']} {report['name']}: schema {report['schema_seconds'] * 1000:.0f} ms")
+        for stats in report["backfills"]:
+            print(
+                f"  {stats['name']:<20} {stats['changes']:>8} rows in {stats['batches']:>4} batches, "
+                f"{stats['seconds']:.2f}s (longest batch {stats['max_batch_seconds'] * 1000:.0f} ms)"
+            )
+
+def cmd_migrate(args) -> int:
+    db_path = get_db_path()
+    if args.dry_run:
+        if not db_path.exists():
+            print(f"No database at {db_path}; the first start creates it at version {SCHEMA_VERSION}")
+            return 0
+        reports = migrations.dry_run(db_path, MIGRATIONS, args.batch_size)
+    else:
+        def progress(name, last_id, high_id):
+            print(f"  {name}: {last_id}/{high_id}", flush=True)
+
+        reports = init_db(batch_size=args.batch_size, progress=progress if args.verbose else None)
+
+    _print_migration_report(reports)
+    verb = "Would apply" if args.dry_run else "Applied"
+    print(f"{verb} {len(reports)} migration steps; schema version {SCHEMA_VERSION} ({db_path})")
+    return 0
+
+def cmd_explain_queries(args) -> int:
+    with get_connection() as conn:
+        results = query_plans.audit(conn)
+
+    for result in results:
+        if args.problems and not (result["full_scan"] or result["sorts"]):
+            continue
+        flags = " FULL SCAN" if result["full_scan"] else ""
+        flags += " +sort" if result["sorts"] else ""
+        print(f"{result['filters']:<60} {result['index'] or '-'}{flags}")
+        if args.verbose:
+            for step in result["plan"]:
+                print(f"    {step}")
+    scans = sum(r["full_scan"] for r in results)
+    sorts = sum(r["sorts"] for r in results)
+    print(f"{len(results)} filter combinations: {scans} full table scans, {sorts} sort their matches")
+    return 1 if scans else 0
+
+def cmd_slow_queries(args) -> int:
+    since = datetime.now() - timedelta(days=args.days) if args.days else None
+    entries = list(slow_queries.read_log(since))
+    if not entries:
+        print(f"No slow queries logged in {slow_queries.log_path()} (threshold {slow_queries.SLOW_QUERY_MS:g} ms)")
+        return 0
+
+    for rank, shape in enumerate(slow_queries.summarize(entries, args.top), start=1):
+        flags = " FULL SCAN" if shape["full_scan"] else ""
+        print(
+            f"{rank}. {shape['tag'] or '(untagged)'}: {shape['count']}x, total {shape['total_ms']:.0f} ms, "
+            f"p50 {shape['p50_ms']:.0f} ms, max {shape['max_ms']:.0f} ms{flags}"
+        )
+        print(f"   routes: {', '.join(shape['routes'])}; last {shape['last_at']}")
+        print(f"   {shape['sql'][:400]}")
+        for step in shape.get("plan", []):
+            print(f"     {step}")
+    print(f"{len(entries)} slow statements logged (threshold {slow_queries.SLOW_QUERY_MS:g} ms)")
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m claims.cli", description="Micro-Claims Tracker maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rebuild-rollup", help="Recompute the daily rollup table from all claims")
+    p.set_defaults(func=cmd_rebuild_rollup)
+
+    p = sub.add_parser("backfill-derivatives", help="Generate thumbnail/web images for photos that lack them")
+    p.add_argument("--force", action="store_true", help="Regenerate even if derivatives already exist")
+    p.set_defaults(func=cmd_backfill_derivatives)
+
+    p = sub.add_parser("import-claims", help="Bulk-load claims from a CSV or JSONL file (idempotent on claim_uuid)")
+    p.add_argument("path", help="Input file, or - for stdin")
+    p.add_argument("--format", choices=importer.FORMATS, help="Defaults to the file extension")
+    p.add_argument("--batch-size", type=int, default=importer.IMPORT_BATCH_SIZE, help="Rows per transaction")
+    p.set_defaults(func=cmd_import_claims)
+
+    p = sub.add_parser("gc-blobs", help="Delete stored photos and derivatives no claim references")
+    p.add_argument("--dry-run", action="store_true", help="Report what would be removed without deleting")
+    p.add_argument("--grace", type=int, default=blobs.GC_GRACE_SECONDS, help="Keep unreferenced files newer than this many seconds")
+    p.add_argument("--recount", action="store_true", help="Recompute reference counts from the claims table first")
+    p.set_defaults(func=cmd_gc_blobs)
+
+    p = sub.add_parser("sla", help="Show or change the hours-to-resolve policy per severity")
+    p.add_argument("--set", action="append", type=_sla_setting, metavar="SEVERITY=HOURS",
+                   help="e.g. --set High=12; re-dates that severity's claims (repeatable)")
+    p.set_defaults(func=cmd_sla)
+
+    p = sub.add_parser("explain-queries", help="Show the query plan of every claim-list filter combination")
+    p.add_argument("--problems", action="store_true", help="Only combinations that scan the table or sort their matches")
+    p.add_argument("--verbose", action="store_true", help="Print each full EXPLAIN QUERY PLAN")
+    p.set_defaults(func=cmd_explain_queries)
+
+    p = sub.add_parser("slow-queries", help="Rank the query shapes in the slow-query log by total time")
+    p.add_argument("--top", type=int, default=10, help="Number of shapes to show")
+    p.add_argument("--days", type=float, help="Only statements logged in the last N days")
+    p.set_defaults(func=cmd_slow_queries)
+
+    p = sub.add_parser("migrate", help="Apply pending schema migrations and backfills, with a timing report")
+    p.add_argument("--dry-run", action="store_true", help="Run them against a temporary copy and leave the database untouched")
+    p.add_argument("--batch-size", type=int, default=migrations.BACKFILL_BATCH_SIZE, help="Claims per backfill transaction")
+    p.add_argument("--verbose", action="store_true", help="Print progress after every batch")
+    p.set_defaults(func=cmd_migrate, migrates=True)
+
+    args = parser.parse_args(argv)
+    # migrate runs the migrations itself (or must not run them, for --dry-run)
+    if not getattr(args, "migrates", False):
+        init_db()
+    try:
+        return args.func(args)
+    finally:
+        close_writer()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,421 @@
+import json
 import sqlite3
 import os
+import queue
+import threading
+import time
+import logging
+from contextlib import contextmanager
 from pathlib import Path
-from .storage import get_data_dir
+from typing import List, Optional
+from . import metrics
+from .storage import get_data_dir, adopt_upload
+from .migrations import BACKFILL_BATCH_SIZE, Backfill, Migration, apply_migrations
 
 DB_NAME = "claims.db"
 
+# Pool sizing (env overridable for cloud deployments)
+POOL_SIZE = int(os.getenv("CLAIMS_DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.getenv("CLAIMS_DB_POOL_TIMEOUT", "10"))
+# Idle connections older than this are pinged before being handed out again
+HEALTHCHECK_INTERVAL = 30.0
+
+# Durability profiles, selected with CLAIMS_DB_PROFILE. Individual values can be
+# overridden with CLAIMS_DB_<SETTING>, e.g. CLAIMS_DB_BUSY_TIMEOUT=10000.
+DURABILITY_PROFILES = {
+    # WAL with fsync on every commit; for hosts with unreliable power
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "mmap_size": 0,
+        "cache_size": -8000,
+    },
+    # WAL with fsync at checkpoints only; readers never wait on writers
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -32000,
+    },
+    # SQLite defaults (rollback journal), as shipped in 1.x
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "mmap_size": 0,
+        "cache_size": -2000,
+    },
+}
+DEFAULT_PROFILE = "balanced"
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA temp_store = MEMORY",
+)
+
+logger = logging.getLogger("claims_tracker")
+
+class PoolTimeoutError(Exception):
+    pass
+
 def get_db_path():
     return get_data_dir() / DB_NAME
 
-def init_db():
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
+def get_durability_profile() -> dict:
+    name = os.getenv("CLAIMS_DB_PROFILE", DEFAULT_PROFILE).lower()
+    if name not in DURABILITY_PROFILES:
+        logger.warning(f"Unknown CLAIMS_DB_PROFILE '{name}', using '{DEFAULT_PROFILE}'.")
+        name = DEFAULT_PROFILE
+    profile = dict(DURABILITY_PROFILES[name])
+    for key in profile:
+        override = os.getenv(f"CLAIMS_DB_{key.upper()}")
+        if override:
+            profile[key] = override if key in ("journal_mode", "synchronous") else int(override)
+    return profile
+
+def _migrate_fts(cursor: sqlite3.Cursor):
+    # External-content FTS5 index over the free-text columns, kept in sync by triggers
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS claims_fts USING fts5(
+        description,
+        resolved_note,
+        content='claims',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_fts_ai AFTER INSERT ON claims BEGIN
+        INSERT INTO claims_fts(rowid, description, resolved_note)
+        VALUES (new.id, new.description, new.resolved_note);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_fts_ad AFTER DELETE ON claims BEGIN
+        INSERT INTO claims_fts(claims_fts, rowid, description, resolved_note)
+        VALUES ('delete', old.id, old.description, old.resolved_note);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_fts_au AFTER UPDATE OF description, resolved_note ON claims BEGIN
+        INSERT INTO claims_fts(claims_fts, rowid, description, resolved_note)
+        VALUES ('delete', old.id, old.description, old.resolved_note);
+        INSERT INTO claims_fts(rowid, description, resolved_note)
+        VALUES (new.id, new.description, new.resolved_note);
+    END
+    """)
+
+def rebuild_rollup(cursor):
+    # Recompute claims_daily_rollup from scratch (backfill or repair)
+    cursor.execute("DELETE FROM claims_daily_rollup")
+    cursor.execute("""
+    INSERT INTO claims_daily_rollup (day, type, severity, status, count)
+    SELECT date(created_at), type, severity, status, count(*)
+    FROM claims
+    GROUP BY date(created_at), type, severity, status
+    """)
+
+def _migrate_rollup(cursor: sqlite3.Cursor):
+    # Claim counts per created day x type x severity x status, maintained by triggers
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS claims_daily_rollup (
+        day TEXT NOT NULL,
+        type TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        status TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (day, type, severity, status)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_rollup_ai AFTER INSERT ON claims BEGIN
+        INSERT INTO claims_daily_rollup (day, type, severity, status, count)
+        VALUES (date(new.created_at), new.type, new.severity, new.status, 1)
+        ON CONFLICT (day, type, severity, status) DO UPDATE SET count = count + 1;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_rollup_ad AFTER DELETE ON claims BEGIN
+        UPDATE claims_daily_rollup SET count = count - 1
+        WHERE day = date(old.created_at) AND type = old.type AND severity = old.severity AND status = old.status;
+        DELETE FROM claims_daily_rollup
+        WHERE day = date(old.created_at) AND type = old.type AND severity = old.severity AND status = old.status
+          AND count <= 0;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_rollup_au AFTER UPDATE OF created_at, type, severity, status ON claims
+    WHEN date(old.created_at) IS NOT date(new.created_at) OR old.type IS NOT new.type
+      OR old.severity IS NOT new.severity OR old.status IS NOT new.status
+    BEGIN
+        UPDATE claims_daily_rollup SET count = count - 1
+        WHERE day = date(old.created_at) AND type = old.type AND severity = old.severity AND status = old.status;
+        DELETE FROM claims_daily_rollup
+        WHERE day = date(old.created_at) AND type = old.type AND severity = old.severity AND status = old.status
+          AND count <= 0;
+        INSERT INTO claims_daily_rollup (day, type, severity, status, count)
+        VALUES (date(new.created_at), new.type, new.severity, new.status, 1)
+        ON CONFLICT (day, type, severity, status) DO UPDATE SET count = count + 1;
+    END
+    """)
+
+def rebuild_blob_refcounts(cursor):
+    cursor.execute("UPDATE blobs SET refcount = 0")
+    cursor.execute("""
+    INSERT INTO blobs (path, refcount)
+    SELECT photo_path, count(*) FROM claims WHERE photo_path IS NOT NULL GROUP BY photo_path
+    ON CONFLICT (path) DO UPDATE SET refcount = excluded.refcount
+    """)
+
+def _adopt_legacy_uploads(cursor: sqlite3.Cursor):
+    # Move flat uploads/{uuid}.ext photos into the content-addressed store
+    legacy = cursor.execute(
+        "SELECT DISTINCT photo_path FROM claims WHERE photo_path IS NOT NULL AND instr(photo_path, '/') = 0"
+    ).fetchall()
+    moved = 0
+    for (old_path,) in legacy:
+        new_path = adopt_upload(old_path)
+        if new_path:
+            cursor.execute("UPDATE claims SET photo_path = ? WHERE photo_path = ?", (new_path, old_path))
+            moved += 1
+    if moved:
+        logger.info(f"Moved {moved} uploads into the blob store; run `python -m claims.cli gc-blobs` to drop the old names")
+
+def _migrate_blobs(cursor: sqlite3.Cursor):
+    # Number of claims referencing each stored photo, maintained by triggers
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS blobs (
+        path TEXT PRIMARY KEY,
+        refcount INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_blobs_ai AFTER INSERT ON claims WHEN new.photo_path IS NOT NULL BEGIN
+        INSERT INTO blobs (path, refcount) VALUES (new.photo_path, 1)
+        ON CONFLICT (path) DO UPDATE SET refcount = refcount + 1;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_blobs_ad AFTER DELETE ON claims WHEN old.photo_path IS NOT NULL BEGIN
+        UPDATE blobs SET refcount = refcount - 1 WHERE path = old.photo_path;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_blobs_au AFTER UPDATE OF photo_path ON claims
+    WHEN old.photo_path IS NOT new.photo_path
+    BEGIN
+        UPDATE blobs SET refcount = refcount - 1 WHERE path = old.photo_path;
+        INSERT INTO blobs (path, refcount) SELECT new.photo_path, 1 WHERE new.photo_path IS NOT NULL
+        ON CONFLICT (path) DO UPDATE SET refcount = refcount + 1;
+    END
+    """)
+
+def _migrate_updated_at_index(cursor: sqlite3.Cursor):
+    # max(updated_at) is the dashboard's HTTP cache validator; the index makes it one probe
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_claims_updated_at ON claims(updated_at)")
+
+# Hours to resolve per severity, seeded by migration 6; edit with `python -m claims.cli sla`
+DEFAULT_SLA_HOURS = {"High": 24, "Med": 72, "Low": 168}
+
+def due_at_sql(created_at: str, severity: str) -> str:
+    # SLA deadline of a claim: created_at plus its severity's hours (NULL without a policy)
+    return (
+        f"(SELECT datetime({created_at}, '+' || hours || ' hours') "
+        f"FROM sla_policy WHERE sla_policy.severity = {severity})"
+    )
+
+def rebuild_due_dates(cursor, severity: Optional[str] = None):
+    where = "WHERE severity = ?" if severity else ""
+    cursor.execute(
+        f"UPDATE claims SET due_at = {due_at_sql('claims.created_at', 'claims.severity')} {where}",
+        (severity,) if severity else ()
+    )
+
+def _migrate_sla(cursor: sqlite3.Cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sla_policy (
+        severity TEXT PRIMARY KEY,
+        hours INTEGER NOT NULL CHECK (hours > 0)
+    ) WITHOUT ROWID
+    """)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO sla_policy (severity, hours) VALUES (?, ?)", DEFAULT_SLA_HOURS.items()
+    )
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(claims)")}
+    if "due_at" not in columns:
+        cursor.execute("ALTER TABLE claims ADD COLUMN due_at TIMESTAMP")
+    # The app's own writes set due_at in the same statement (so RETURNING sees it);
+    # the triggers cover every other writer
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS claims_sla_ai AFTER INSERT ON claims WHEN new.due_at IS NULL BEGIN
+        UPDATE claims SET due_at = {due_at_sql('new.created_at', 'new.severity')} WHERE id = new.id;
+    END
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS claims_sla_au AFTER UPDATE OF created_at, severity ON claims
+    WHEN (old.created_at IS NOT new.created_at OR old.severity IS NOT new.severity)
+      AND new.due_at IS old.due_at
+    BEGIN
+        UPDATE claims SET due_at = {due_at_sql('new.created_at', 'new.severity')} WHERE id = new.id;
+    END
+    """)
+    # Only unresolved claims can breach: the index stays the size of the open queue, not the history
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_claims_open_due ON claims(due_at) WHERE status != 'Resolved'"
+    )
+
+def _migrate_change_tracking(cursor: sqlite3.Cursor):
+    # A counter every claim or SLA policy write bumps, from any connection: the cache
+    # validator. max(updated_at) cannot be one, since imported rows may carry any time.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS data_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        deletes INTEGER NOT NULL,
+        sla_version INTEGER NOT NULL
+    )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO data_version (id, version, deletes, sla_version) VALUES (1, 0, 0, 0)")
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(claims)")}
+    if "change_seq" not in columns:
+        cursor.execute("ALTER TABLE claims ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0")
+    # Each claim carries the version of its last change, so readers can fetch what
+    # changed since a version they hold (`WHERE change_seq > ?`)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_claims_change_seq ON claims(change_seq)")
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_version_ai AFTER INSERT ON claims BEGIN
+        UPDATE data_version SET version = version + 1 WHERE id = 1;
+        UPDATE claims SET change_seq = (SELECT version FROM data_version WHERE id = 1) WHERE id = new.id;
+    END
+    """)
+    # The guard skips the trigger's own change_seq update (and the insert trigger's)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_version_au AFTER UPDATE ON claims
+    WHEN new.change_seq IS old.change_seq
+    BEGIN
+        UPDATE data_version SET version = version + 1 WHERE id = 1;
+        UPDATE claims SET change_seq = (SELECT version FROM data_version WHERE id = 1) WHERE id = new.id;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS claims_version_ad AFTER DELETE ON claims BEGIN
+        UPDATE data_version SET version = version + 1, deletes = deletes + 1 WHERE id = 1;
+    END
+    """)
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS sla_policy_version_{event[0].lower()} AFTER {event} ON sla_policy BEGIN
+            UPDATE data_version SET version = version + 1, sla_version = sla_version + 1 WHERE id = 1;
+        END
+        """)
+
+def _migrate_derivative_flags(cursor: sqlite3.Cursor):
+    # Whether each blob's web/thumb derivatives are rendered, so pages choose image URLs
+    # without a stat() per row. Derivatives already on disk take one directory walk.
+    from . import derivatives  # it imports this module
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(blobs)")}
+    if "derivatives" not in columns:
+        cursor.execute("ALTER TABLE blobs ADD COLUMN derivatives INTEGER NOT NULL DEFAULT 0")
+    cursor.execute(
+        "UPDATE blobs SET derivatives = 1 WHERE path IN (SELECT value FROM json_each(?))",
+        (json.dumps(derivatives.rendered_on_disk()),)
+    )
+    # Dashboard pages and ETags key on the change counter: a rendered thumbnail must move it
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS blobs_derivatives_ai AFTER INSERT ON blobs WHEN new.derivatives != 0 BEGIN
+        UPDATE data_version SET version = version + 1 WHERE id = 1;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS blobs_derivatives_au AFTER UPDATE OF derivatives ON blobs
+    WHEN new.derivatives IS NOT old.derivatives
+    BEGIN
+        UPDATE data_version SET version = version + 1 WHERE id = 1;
+    END
+    """)
+
+# Set-based equivalents of the AFTER INSERT triggers for claims with low < id <= high.
+# Migrations backfill existing claims with them; bulk imports index new ones.
+FTS_BACKFILL = Backfill("claims_fts", """
+    INSERT INTO claims_fts(rowid, description, resolved_note)
+    SELECT id, description, resolved_note FROM claims WHERE id > ? AND id <= ?
+""")
+ROLLUP_BACKFILL = Backfill("claims_daily_rollup", """
+    INSERT INTO claims_daily_rollup (day, type, severity, status, count)
+    SELECT date(created_at), type, severity, status, count(*) FROM claims WHERE id > ? AND id <= ?
+    GROUP BY date(created_at), type, severity, status
+    ON CONFLICT (day, type, severity, status) DO UPDATE SET count = count + excluded.count
+""")
+BLOBS_BACKFILL = Backfill("blobs", """
+    INSERT INTO blobs (path, refcount)
+    SELECT photo_path, count(*) FROM claims WHERE id > ? AND id <= ? AND photo_path IS NOT NULL
+    GROUP BY photo_path
+    ON CONFLICT (path) DO UPDATE SET refcount = refcount + excluded.refcount
+""")
+DUE_AT_BACKFILL = Backfill("claims_due_at", f"""
+    UPDATE claims SET due_at = {due_at_sql('claims.created_at', 'claims.severity')}
+    WHERE id > ? AND id <= ? AND due_at IS NULL
+""")
+# One version bump for the whole range, which then becomes the range's change_seq.
+# Bulk inserts can write NEXT_CHANGE_SEQ_SQL themselves and skip most of that update.
+NEXT_CHANGE_SEQ_SQL = "(SELECT version + 1 FROM data_version WHERE id = 1)"
+VERSION_BACKFILL = Backfill("data_version", """
+    UPDATE data_version SET version = version + 1
+    WHERE id = 1 AND EXISTS (SELECT 1 FROM claims WHERE id > ? AND id <= ?)
+""")
+CHANGE_SEQ_BACKFILL = Backfill("claims_change_seq", """
+    UPDATE claims SET change_seq = (SELECT version FROM data_version WHERE id = 1)
+    WHERE id > ? AND id <= ? AND change_seq IS NOT (SELECT version FROM data_version WHERE id = 1)
+""")
+
+# The claim list filters by equality on status/severity/type and pages in
+# (created_at, id) order: with created_at second (id is the implicit rowid after it)
+# a filtered page is a walk of LIMIT rows instead of sorting every match. The
+# single-column indexes are replaced under the same names. Open-claim (SLA) filters
+# walk the partial index, which stays the size of the open queue.
+# `python -m claims.cli explain-queries` shows the plan of every filter combination.
+QUERY_INDEXES = [
+    ("idx_claims_status", "claims(status, created_at)"),
+    ("idx_claims_severity", "claims(severity, created_at)"),
+    ("idx_claims_type", "claims(type, created_at)"),
+    ("idx_claims_open_created", "claims(created_at) WHERE status != 'Resolved'"),
+]
+
+def _migrate_query_indexes(cursor: sqlite3.Cursor):
+    # Index builds are single statements; they cannot be batched like a Backfill
+    for name, definition in QUERY_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        cursor.execute(f"CREATE INDEX {name} ON {definition}")
+
+# Per-row AFTER INSERT triggers that index_new_claims() replaces for bulk loads.
+# A migration adding another insert trigger must extend both.
+BULK_INSERT_TRIGGERS = ("claims_fts_ai", "claims_rollup_ai", "claims_blobs_ai", "claims_sla_ai", "claims_version_ai")
+INSERT_BACKFILLS = (FTS_BACKFILL, ROLLUP_BACKFILL, BLOBS_BACKFILL, DUE_AT_BACKFILL, VERSION_BACKFILL, CHANGE_SEQ_BACKFILL)
+MAX_ROWID = 2 ** 63 - 1
+
+def index_new_claims(cursor, after_id: int):
+    # Set-based equivalent of the insert triggers for every claim with id > after_id
+    for backfill in INSERT_BACKFILLS:
+        cursor.execute(backfill.sql, (after_id, MAX_ROWID))
+
+# Applied in order by init_db; version 1 is the base schema. Schema steps must stay
+# quick (DDL only): anything touching every claim belongs in a Backfill.
+MIGRATIONS = [
+    Migration(1, "base"),
+    Migration(2, "fts", _migrate_fts, [FTS_BACKFILL]),
+    Migration(3, "rollup", _migrate_rollup, [ROLLUP_BACKFILL]),
+    Migration(4, "blobs", _migrate_blobs, [BLOBS_BACKFILL], files=_adopt_legacy_uploads),
+    Migration(5, "updated_at_index", _migrate_updated_at_index),
+    Migration(6, "sla", _migrate_sla, [DUE_AT_BACKFILL]),
+    Migration(7, "query_indexes", _migrate_query_indexes),
+    Migration(8, "change_tracking", _migrate_change_tracking),
+    Migration(9, "derivative_flags", _migrate_derivative_flags),
+]
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+def create_base_schema(cursor):
+    # Version 1: the claims table and its single-column indexes
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS claims (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -29,7 +432,7 @@ def init_db():
         photo_path TEXT
     )
     """)
-    
+
     # Indexes
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_claims_created_at ON claims(created_at)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status)")
@@ -37,19 +440,151 @@ def init_db():
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_claims_type ON claims(type)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_claims_resolved_at ON claims(resolved_at)")
 
-    # Migration Guard
-    cursor.execute("PRAGMA user_version")
-    version = cursor.fetchone()[0]
-    if version == 0:
-        cursor.execute("PRAGMA user_version = 1")
-    elif version > 1:
-        import logging
-        logging.getLogger("claims_tracker").warning(f"DB version {version} is higher than expected (1).")
-    
-    conn.commit()
-    conn.close()
+def init_db(batch_size: int = BACKFILL_BATCH_SIZE, progress=None) -> List[dict]:
+    # Creates or migrates the database; returns a report per applied version (see claims.migrations)
+    db_path = get_db_path()
+    # Autocommit: the migrator runs each schema step and backfill batch in its own transaction
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    profile = get_durability_profile()
+    # Several workers may start at once; the loser of a schema step waits for the winner
+    cursor.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+    cursor.execute(f"PRAGMA synchronous = {profile['synchronous']}")
 
-def get_connection():
-    conn = sqlite3.connect(get_db_path())
+    # journal_mode is persistent in the DB file, so it is set once here
+    journal_mode = profile["journal_mode"]
+    mode = cursor.execute(f"PRAGMA journal_mode = {journal_mode}").fetchone()[0]
+    if mode.lower() != journal_mode.lower():
+        logger.warning(f"Could not switch journal_mode to {journal_mode} (using {mode}).")
+
+    try:
+        create_base_schema(cursor)
+
+        # Migrations
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            logger.warning(f"DB version {version} is higher than expected ({SCHEMA_VERSION}).")
+            return []
+        return apply_migrations(conn, MIGRATIONS, batch_size, progress=progress)
+    finally:
+        conn.close()
+
+def _configure(conn: sqlite3.Connection):
     conn.row_factory = sqlite3.Row
+    profile = get_durability_profile()
+    conn.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+    conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+    conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+def connect(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path or get_db_path(), check_same_thread=False, factory=metrics.connection_factory())
+    _configure(conn)
     return conn
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to `size`, configured once, and reused.
+    Callers block for up to `timeout` seconds when every connection is in use.
+    """
+
+    def __init__(self, db_path: Path, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _is_healthy(self, conn: sqlite3.Connection, last_used: float) -> bool:
+        if time.monotonic() - last_used < HEALTHCHECK_INTERVAL:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise PoolTimeoutError("Connection pool is closed")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeoutError(f"No database connection available after {self.timeout}s")
+        try:
+            while True:
+                try:
+                    conn, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return connect(self.db_path)
+                if self._is_healthy(conn, last_used):
+                    return conn
+                logger.warning("Discarding unhealthy pooled DB connection")
+                _close_quietly(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        try:
+            if self._closed:
+                _close_quietly(conn)
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put((conn, time.monotonic()))
+        except sqlite3.Error:
+            _close_quietly(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            _close_quietly(conn)
+
+def _close_quietly(conn: sqlite3.Connection):
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(get_db_path())
+    return _pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+@contextmanager
+def get_connection():
+    # Commits on success, rolls back on error, always returns the connection to the pool
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
@@ -0,0 +1,235 @@
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from . import storage
+from .db import get_connection
+from .writer import get_writer, run_write
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; pages fall back to the original upload
+    Image = None
+    ImageOps = None
+
+# Derivative name -> longest edge in pixels, largest first (each is resized from the previous)
+SIZES = {"web": 1280, "thumb": 160}
+JPEG_QUALITY = 82
+
+# Image decoding is CPU-bound, so it runs in worker processes rather than DB threads
+DERIVATIVE_WORKERS = int(os.getenv("CLAIMS_DERIVATIVE_WORKERS", "2"))
+
+logger = logging.getLogger("claims_tracker")
+
+_pool = None
+_pool_lock = threading.Lock()
+_ensured_dirs = set()
+# Photos being rendered in the background, so a photo uploaded twice is rendered once
+_pending = set()
+_pending_lock = threading.Lock()
+
+def available() -> bool:
+    return Image is not None
+
+def get_derivatives_dir() -> Path:
+    path = storage.get_data_dir() / "derivatives"
+    if path not in _ensured_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(path)
+    return path
+
+def derivative_name(photo_path: str, size: str) -> str:
+    # Mirrors the blob path (same shard dirs), plus the size
+    return f"{photo_path}.{size}.jpg"
+
+def get_derivative_path(photo_path: str, size: str) -> Path:
+    return get_derivatives_dir() / derivative_name(photo_path, size)
+
+def has_derivatives(photo_path: str) -> bool:
+    return all(get_derivative_path(photo_path, size).exists() for size in SIZES)
+
+def photo_url(photo_path: str, size: str, rendered: bool) -> str:
+    # `rendered`: the blob is in rendered() (the original is served until then)
+    if rendered:
+        return f"/derivatives/{derivative_name(photo_path, size)}"
+    return f"/uploads/{photo_path}"
+
+def rendered(photo_paths: Iterable[str], conn: Optional[sqlite3.Connection] = None) -> Set[str]:
+    # Which of these photos have their derivatives recorded in blobs: one query per page, no stat() per row
+    paths = sorted(set(photo_paths))
+    if not paths:
+        return set()
+    if conn is None:
+        with get_connection() as conn:
+            return rendered(paths, conn)
+    rows = conn.execute(
+        "SELECT path FROM blobs WHERE derivatives = 1 AND path IN (SELECT value FROM json_each(?))",
+        (json.dumps(paths),)
+    )
+    return {row[0] for row in rows}
+
+def mark_rendered(conn: sqlite3.Connection, photo_paths: List[str]) -> int:
+    # Runs on the writer. A fresh upload may finish rendering before its claim row (and
+    # blobs row) exists: the row is created at refcount 0 and the claim's insert adds to it.
+    return conn.execute("""
+        INSERT INTO blobs (path, refcount, derivatives) SELECT value, 0, 1 FROM json_each(?)
+        WHERE true  -- an upsert from a SELECT needs a WHERE to parse
+        ON CONFLICT (path) DO UPDATE SET derivatives = 1 WHERE derivatives = 0
+    """, (json.dumps(photo_paths),)).rowcount
+
+def rendered_on_disk() -> List[str]:
+    # Photo paths with every size present under derivatives/ (one directory walk)
+    root = get_derivatives_dir()
+    sizes: Dict[str, Set[str]] = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            # "<photo_path>.<size>.jpg"
+            parts = (Path(dirpath) / name).relative_to(root).as_posix().rsplit(".", 2)
+            if len(parts) == 3 and parts[2] == "jpg" and parts[1] in SIZES:
+                sizes.setdefault(parts[0], set()).add(parts[1])
+    return [path for path, found in sizes.items() if len(found) == len(SIZES)]
+
+def render_derivatives(source: str, dest_dir: str, photo_path: str) -> List[str]:
+    # Runs in a worker process: only plain arguments in, file names out
+    largest = max(SIZES.values())
+    with Image.open(source) as im:
+        # JPEG draft mode decodes at a reduced scale directly, skipping most of the IDCT work
+        im.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(im).convert("RGB")
+
+    written = []
+    for size, edge in SIZES.items():
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        name = derivative_name(photo_path, size)
+        target = os.path.join(dest_dir, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        image.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=size != "thumb")
+        os.replace(tmp, target)
+        written.append(name)
+    return written
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a process that runs the writer/DB threads is unsafe
+                _pool = ProcessPoolExecutor(
+                    max_workers=DERIVATIVE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    # A worker died (e.g. OOM on a huge image); the next render starts a fresh pool.
+    # No wait: this runs on the pool's own management thread.
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+def _render_args(photo_path: str) -> Tuple[str, str, str]:
+    return str(storage.get_upload_path(photo_path)), str(get_derivatives_dir()), photo_path
+
+def _record(photo_path: str):
+    # Queued on the writer without waiting: this may run on the pool's management thread
+    def recorded(future: Future):
+        if future.exception() is not None:
+            logger.warning(f"Recording derivatives of {photo_path} failed: {future.exception()}")
+    get_writer().submit(lambda conn: mark_rendered(conn, [photo_path])).add_done_callback(recorded)
+
+def _rendered(photo_path: str, pool: ProcessPoolExecutor, future: Future):
+    with _pending_lock:
+        _pending.discard(photo_path)
+    try:
+        future.result()
+    except BrokenProcessPool as e:
+        logger.error(f"Derivative worker pool broke on {photo_path}: {e}")
+        _discard_pool(pool)
+        return
+    except Exception as e:
+        # Not an image Pillow understands (or corrupt): keep serving the original
+        logger.warning(f"Derivatives failed for {photo_path}: {e}")
+        return
+    _record(photo_path)
+
+def schedule(photo_path: str):
+    """Render a photo's derivatives in the background; returns at once.
+
+    Pages keep linking the original until the render is recorded in blobs, which
+    moves the change counter, so cached pages and ETags pick the derivative up.
+    """
+    if not available():
+        return
+    with _pending_lock:
+        if photo_path in _pending:
+            return
+        _pending.add(photo_path)
+    # Blobs are content-addressed, so derivatives already on disk are always current
+    if has_derivatives(photo_path):
+        # Fresh mtimes keep them out of GC's grace window until a claim references the photo
+        for size in SIZES:
+            try:
+                os.utime(get_derivative_path(photo_path, size))
+            except OSError:
+                pass
+        with _pending_lock:
+            _pending.discard(photo_path)
+        _record(photo_path)
+        return
+    pool = get_pool()
+    try:
+        future = pool.submit(render_derivatives, *_render_args(photo_path))
+    except BrokenProcessPool as e:
+        with _pending_lock:
+            _pending.discard(photo_path)
+        logger.error(f"Derivative worker pool broke on {photo_path}: {e}")
+        _discard_pool(pool)
+        return
+    future.add_done_callback(functools.partial(_rendered, photo_path, pool))
+
+def backfill(force: bool = False, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    if not available():
+        raise RuntimeError("Pillow is not installed")
+
+    with get_connection() as conn:
+        rows = conn.execute("SELECT DISTINCT photo_path FROM claims WHERE photo_path IS NOT NULL").fetchall()
+    pending = [
+        row["photo_path"] for row in rows
+        if storage.get_upload_path(row["photo_path"]).exists()
+        and (force or not has_derivatives(row["photo_path"]))
+    ]
+    result = {"generated": 0, "failed": 0, "skipped": len(rows) - len(pending)}
+
+    pool = get_pool()
+    futures = [(p, pool.submit(render_derivatives, *_render_args(p))) for p in pending]
+    for done, (photo_path, future) in enumerate(futures, start=1):
+        try:
+            future.result()
+            result["generated"] += 1
+        except Exception as e:
+            logger.warning(f"Derivatives failed for {photo_path}: {e}")
+            result["failed"] += 1
+        if progress:
+            progress(done, len(futures))
+    # Also records derivatives rendered earlier but never recorded (e.g. lost to a crash)
+    present = [row["photo_path"] for row in rows if has_derivatives(row["photo_path"])]
+    if present:
+        run_write(lambda conn: mark_rendered(conn, present))
+    return result
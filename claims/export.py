@@ -1,51 +1,91 @@
 from datetime import datetime
-from typing import List
-from .models import Claim, Status, Severity, ClaimType
+from typing import Iterable, Iterator, List
+from .models import Claim, ClaimCounts, Status, Severity, ClaimType
+from . import repo
 
-def generate_digest(claims: List[Claim], date_from: datetime, date_to: datetime) -> str:
-    now = datetime.now()
-    
-    # Counts
-    total = len(claims)
-    by_status = {s: 0 for s in Status}
-    by_severity = {s: 0 for s in Severity}
-    by_type = {t: 0 for t in ClaimType}
-    
-    for c in claims:
-        by_status[c.status] += 1
-        by_severity[c.severity] += 1
-        by_type[c.type] += 1
-        
+# Approximate bytes buffered before a chunk is sent to the client
+CHUNK_SIZE = 64 * 1024
+
+def _summary_lines(
+    counts: ClaimCounts,
+    date_from: datetime,
+    date_to: datetime,
+    now: datetime
+) -> List[str]:
     lines = []
     lines.append(f"# Micro-Claims Weekly Digest")
     lines.append(f"Generated: {now.date().isoformat()}")
     lines.append(f"Range: {date_from.date()} to {date_to.date()}")
     lines.append("")
-    
+
     lines.append("## Summary")
-    lines.append(f"- Total Claims: {total}")
+    lines.append(f"- Total Claims: {counts.total}")
     lines.append("- By Status:")
     for s in Status:
-        lines.append(f"  - {s.value}: {by_status[s]}")
+        lines.append(f"  - {s.value}: {counts.by_status[s]}")
     lines.append("- By Severity:")
     for s in Severity:
-        lines.append(f"  - {s.value}: {by_severity[s]}")
+        lines.append(f"  - {s.value}: {counts.by_severity[s]}")
     lines.append("- By Type:")
     for t in ClaimType:
-        lines.append(f"  - {t.value}: {by_type[t]}")
+        lines.append(f"  - {t.value}: {counts.by_type[t]}")
     lines.append("")
-    
+
     lines.append("## Claims List")
     lines.append("| ID | Date | Type | Severity | Status | Description | Outcome |")
     lines.append("|---|---|---|---|---|---|---|")
-    
+    return lines
+
+def _claim_line(c: Claim) -> str:
+    created_str = c.created_at.isoformat(timespec='minutes')
+    desc = c.description.replace("\n", " ").replace("|", " ")
+    outcome = c.resolution_outcome.value if c.resolution_outcome else ""
+    if c.resolved_note:
+        outcome += f" ({c.resolved_note})"
+
+    return f"| {c.id} | {created_str} | {c.type.value} | {c.severity.value} | {c.status.value} | {desc} | {outcome} |"
+
+def write_digest(
+    claims: Iterable[Claim],
+    counts: ClaimCounts,
+    date_from: datetime,
+    date_to: datetime,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    # Yields the digest in chunks; "".join() of the output is the full document
+    now = datetime.now()
+    buffer = ["\n".join(_summary_lines(counts, date_from, date_to, now))]
+    size = len(buffer[0])
+
     for c in claims:
-        created_str = c.created_at.isoformat(timespec='minutes')
-        desc = c.description.replace("\n", " ").replace("|", " ")
-        outcome = c.resolution_outcome.value if c.resolution_outcome else ""
-        if c.resolved_note:
-            outcome += f" ({c.resolved_note})"
-            
-        lines.append(f"| {c.id} | {created_str} | {c.type.value} | {c.severity.value} | {c.status.value} | {desc} | {outcome} |")
-        
-    return "\n".join(lines)
+        line = "\n" + _claim_line(c)
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield "".join(buffer)
+
+def generate_digest(claims: List[Claim], date_from: datetime, date_to: datetime) -> str:
+    # Counts
+    counts = ClaimCounts(total=len(claims))
+    for c in claims:
+        counts.by_status[c.status] += 1
+        counts.by_severity[c.severity] += 1
+        counts.by_type[c.type] += 1
+
+    return "".join(write_digest(claims, counts, date_from, date_to))
+
+def stream_digest(date_from: datetime, date_to: datetime, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    # Counts and the newest id come from one short read snapshot. Rows then stream in
+    # keyset batches that each borrow a connection briefly, so a slow download ties up
+    # no pooled connection and keeps no read transaction open; claims captured after
+    # the counts are left out, but a row changed meanwhile is listed as it is now.
+    with repo.read_snapshot() as conn:
+        counts = repo.claim_counts(date_from, date_to, conn=conn)
+        max_id = repo.max_claim_id(conn)
+    claims = repo.iter_claims(date_from=date_from, date_to=date_to, max_id=max_id)
+    yield from write_digest(claims, counts, date_from, date_to, chunk_size)
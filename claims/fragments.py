@@ -0,0 +1,83 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+# Rendered dashboard HTML kept per process, in MiB (a quarter for rows, the rest for pages); 0 disables
+FRAGMENT_CACHE_MB = float(os.getenv("CLAIMS_FRAGMENT_CACHE_MB", "32"))
+# Bypass switch: "off" renders every dashboard request from scratch
+FRAGMENT_CACHE_ENABLED = os.getenv("CLAIMS_FRAGMENT_CACHE", "on").lower() not in ("off", "0", "false")
+# Rough per-entry cost of the key, the OrderedDict slot and the str header
+ENTRY_OVERHEAD = 200
+
+class FragmentCache:
+    """Bounded LRU of rendered HTML strings, capped by total size rather than count.
+
+    Keys must carry everything the markup depends on (data version, filters, the
+    claim's updated_at, ...): entries are never invalidated, a change simply
+    produces a new key and the stale entry ages out. Sizes are counted in
+    characters, close to bytes for this mostly-ASCII markup.
+    """
+
+    def __init__(self, max_bytes: int, enabled: bool = FRAGMENT_CACHE_ENABLED):
+        self.max_bytes = max_bytes
+        self.enabled = enabled and max_bytes > 0
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key: Hashable, html: str):
+        size = len(html) + ENTRY_OVERHEAD
+        # One oversized page must not flush everything else
+        if not self.enabled or size > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= len(previous) + ENTRY_OVERHEAD
+            self._entries[key] = html
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted) + ENTRY_OVERHEAD
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+_budget = int(FRAGMENT_CACHE_MB * 1024 * 1024)
+# One <tr> per claim version, reused across pages, filters and data versions
+row_cache = FragmentCache(_budget // 4)
+# Whole dashboard pages, one per filter set and data version
+page_cache = FragmentCache(_budget - _budget // 4)
@@ -0,0 +1,51 @@
+import hashlib
+import os
+from pathlib import Path
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+# Pages are per-user when Basic Auth is on, and must be revalidated on every view
+PAGE_CACHE_CONTROL = "private, no-cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def directory_version(directory) -> str:
+    # Hash of the template sources, so a deploy with changed markup invalidates old ETags
+    digest = hashlib.sha1()
+    for path in sorted(Path(directory).rglob("*")):
+        if path.is_file():
+            digest.update(path.relative_to(directory).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("\x1f".join(str(p) for p in parts).encode())
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    # Pages only carry an ETag (no Last-Modified), so If-None-Match is the only validator;
+    # weak comparison for GET (RFC 9110 13.1.2)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _strip_weak(etag) in {_strip_weak(t) for t in if_none_match.split(",")}
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": PAGE_CACHE_CONTROL}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for content-addressed names: a URL's bytes never change, so clients cache them forever."""
+
+    def file_response(self, full_path: os.PathLike, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
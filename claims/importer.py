@@ -0,0 +1,198 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from . import db
+from .models import ClaimImport, ImportReport, ImportRowError, Status
+from .writer import WRITE_TIMEOUT, get_writer
+
+# Rows per writer transaction: big enough to amortize the commit, small enough that
+# interactive captures queued behind an import wait well under a second
+IMPORT_BATCH_SIZE = 20_000
+MAX_REPORTED_ERRORS = 100
+FORMATS = ("csv", "jsonl")
+
+INSERT_SQL = f"""
+    INSERT OR IGNORE INTO claims (
+        claim_uuid, created_at, updated_at, resolved_at, type, severity, status,
+        description, resolved_note, resolution_outcome, due_at, change_seq
+    ) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, {db.due_at_sql('?2', '?6')}, {db.NEXT_CHANGE_SEQ_SQL})
+"""
+
+class ImportFormatError(ValueError):
+    pass
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson", ".json")) or (content_type or "").endswith(("ndjson", "jsonl")):
+        return "jsonl"
+    if name.endswith(".csv") or (content_type or "") in ("text/csv", "application/csv"):
+        return "csv"
+    raise ImportFormatError(f"Cannot tell the format of {filename or 'input'}; pass csv or jsonl")
+
+def _text(stream: BinaryIO) -> io.TextIOWrapper:
+    # utf-8-sig drops the BOM spreadsheet exports like to add
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+def iter_csv(stream: BinaryIO) -> Iterator[Tuple[int, dict]]:
+    # csv.reader + zip is noticeably cheaper per row than DictReader
+    reader = csv.reader(_text(stream))
+    header = next(reader, [])
+    for row in reader:
+        # Empty cells mean "not set", not an empty string
+        yield reader.line_num, {k: v for k, v in zip(header, row) if k and v}
+
+def iter_jsonl(stream: BinaryIO) -> Iterator[Tuple[int, dict]]:
+    for line_num, line in enumerate(_text(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            row = e
+        yield line_num, row
+
+def iter_rows(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, dict]]:
+    if fmt == "csv":
+        return iter_csv(stream)
+    if fmt == "jsonl":
+        return iter_jsonl(stream)
+    raise ImportFormatError(f"Unsupported format {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    # Stored timestamps are naive local time; convert offset-aware input so ordering holds
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def _db_time(value: Optional[datetime]) -> Optional[str]:
+    # Same text the sqlite3 datetime adapter writes, without the per-value adapter call
+    return value.isoformat(" ") if value is not None else None
+
+def _not_future(field: str, value: Optional[datetime], now: datetime) -> Optional[datetime]:
+    # A claim dated after the import started is a broken export (or clock), not history
+    if value is not None and value > now:
+        raise ValueError(f"{field}: {value.isoformat(' ')} is in the future")
+    return value
+
+def _row_params(claim: ClaimImport, now: datetime) -> tuple:
+    created = _not_future("created_at", _naive(claim.created_at), now) or now
+    resolved = _not_future("resolved_at", _naive(claim.resolved_at), now)
+    if claim.status == Status.RESOLVED:
+        resolved = resolved or _naive(claim.updated_at) or created
+        outcome = claim.resolution_outcome.value if claim.resolution_outcome else None
+    else:
+        # Same rule as update_claim_status: only resolved claims keep resolution fields
+        resolved, outcome = None, None
+    updated = _not_future("updated_at", _naive(claim.updated_at), now) or resolved or created
+    return (
+        claim.claim_uuid,
+        _db_time(created),
+        _db_time(updated),
+        _db_time(resolved),
+        claim.type.value,
+        claim.severity.value,
+        claim.status.value,
+        claim.description,
+        claim.resolved_note,
+        outcome,
+    )
+
+def insert_batch(conn, batch: List[tuple], sql: str = INSERT_SQL) -> int:
+    # Writer job. Per-row insert triggers cost several times the insert itself (the FTS
+    # one most), so they are dropped for the batch and replaced by set-based statements
+    # over the new id range. DDL is transactional: other connections never see the
+    # schema without them, and a failed batch rolls back to the triggers in place.
+    # `sql` may insert other claim columns (benchmark datasets add photo_path); the
+    # claim_uuid must come first.
+    placeholders = ", ".join("?" for _ in db.BULK_INSERT_TRIGGERS)
+    triggers = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+        db.BULK_INSERT_TRIGGERS
+    ).fetchall()
+    for name, _ in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+
+    # INSERT OR IGNORE still uses up an AUTOINCREMENT id per ignored row, so uuids that
+    # are already stored (or repeat within the batch) are dropped before the insert
+    stored = {uuid for (uuid,) in conn.execute(
+        "SELECT claim_uuid FROM claims WHERE claim_uuid IN (SELECT value FROM json_each(?))",
+        (json.dumps([row[0] for row in batch]),)
+    ).fetchall()}
+    fresh = []
+    for row in batch:
+        if row[0] not in stored:
+            stored.add(row[0])
+            fresh.append(row)
+
+    # AUTOINCREMENT ids only grow, so everything above the current max is this batch
+    last_id = conn.execute("SELECT coalesce(max(id), 0) FROM claims").fetchone()[0]
+    inserted = conn.executemany(sql, fresh).rowcount if fresh else 0
+    db.index_new_claims(conn.cursor(), last_id)
+
+    for _, trigger_sql in triggers:
+        conn.execute(trigger_sql)
+    return inserted
+
+def import_claims(
+    rows: Iterable[Tuple[int, dict]],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[Callable[[ImportReport], None]] = None
+) -> ImportReport:
+    report = ImportReport()
+    started = time.perf_counter()
+    now = datetime.now()
+    writer = get_writer()
+    batch = []
+    # (future, size) of the batch the writer is applying while the next one is parsed
+    in_flight = []
+
+    def collect():
+        future, size = in_flight.pop(0)
+        inserted = future.result(timeout=WRITE_TIMEOUT)
+        report.inserted += inserted
+        report.duplicates += size - inserted
+        if progress:
+            progress(_finish(report, started))
+
+    def flush():
+        rows = list(batch)
+        batch.clear()
+        in_flight.append((writer.submit(lambda conn: insert_batch(conn, rows)), len(rows)))
+        # Double buffering: at most two batches queued, so memory stays bounded
+        if len(in_flight) > 1:
+            collect()
+
+    for line, row in rows:
+        report.received += 1
+        try:
+            if not isinstance(row, dict):
+                raise ValueError(str(row) if isinstance(row, Exception) else "expected a JSON object")
+            batch.append(_row_params(ClaimImport.model_validate(row), now))
+        except (ValidationError, ValueError) as e:
+            report.invalid += 1
+            if len(report.errors) < MAX_REPORTED_ERRORS:
+                message = "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                ) if isinstance(e, ValidationError) else str(e)
+                report.errors.append(ImportRowError(line=line, error=message))
+            continue
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    while in_flight:
+        collect()
+    return _finish(report, started)
+
+def _finish(report: ImportReport, started: float) -> ImportReport:
+    report.seconds = round(time.perf_counter() - started, 3)
+    report.rows_per_second = round(report.received / report.seconds, 1) if report.seconds else 0.0
+    return report
+
+def import_file(stream: BinaryIO, fmt: str, **kwargs) -> ImportReport:
+    return import_claims(iter_rows(stream, fmt), **kwargs)
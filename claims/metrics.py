@@ -0,0 +1,294 @@
+import bisect
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from . import slow_queries
+
+# "off" skips the middleware and opens plain connections (no per-statement timing)
+METRICS_ENABLED = os.getenv("CLAIMS_METRICS", "on").lower() not in ("off", "0", "false")
+# Seconds; the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+SLOW_QUERY_SECONDS = slow_queries.SLOW_QUERY_MS / 1000
+# Route label for SQL run outside any request (startup migrations, CLI, bulk jobs)
+BACKGROUND = "background"
+
+_registry: List["_Metric"] = []
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def lines(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, labels)} {value:g}" for labels, value in items]
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram, rendered as _bucket/_sum/_count series."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        lines = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total:g}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+REQUESTS = Counter("claims_http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"))
+REQUEST_SECONDS = Histogram("claims_http_request_duration_seconds", "Time until the response was fully sent.", ("method", "route"))
+REQUEST_SQL_SECONDS = Histogram("claims_http_request_sql_seconds", "SQLite time spent per request.", ("method", "route"))
+SQL_STATEMENTS = Counter("claims_sql_statements_total", "SQL statements executed, by the route that ran them.", ("route",))
+SQL_SECONDS = Counter("claims_sql_seconds_total", "Time spent executing SQL and fetching rows.", ("route",))
+UPLOADS = Counter("claims_uploads_total", "Uploaded files by kind and outcome.", ("kind", "outcome"))
+UPLOAD_BYTES = Counter("claims_upload_bytes_total", "Bytes received in uploaded files.", ("kind",))
+
+def render() -> str:
+    out = []
+    for metric in _registry:
+        out.append(f"# HELP {metric.name} {metric.help}")
+        out.append(f"# TYPE {metric.name} {metric.kind}")
+        out.extend(metric.lines())
+    return "\n".join(out) + "\n"
+
+class RequestStats:
+    __slots__ = ("route", "sql_statements", "sql_seconds")
+
+    def __init__(self, route: Optional[str] = None):
+        self.route = route
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("claims_request_stats", default=None)
+
+def record_sql(seconds: float, statements: int = 1):
+    # Charged to the request whose context runs the statement (aio and the writer carry it over)
+    stats = _current.get()
+    if stats is None:
+        if statements:
+            SQL_STATEMENTS.inc(BACKGROUND, amount=statements)
+        SQL_SECONDS.inc(BACKGROUND, amount=seconds)
+        return
+    stats.sql_statements += statements
+    stats.sql_seconds += seconds
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Times execute* and fetch* calls; a SELECT's rows are produced during both.
+
+    A statement whose execute and fetches add up to more than the slow-query
+    threshold is handed to claims.slow_queries once (executemany/executescript
+    are not).
+    """
+
+    _sql = None
+    _params = None
+    _elapsed = 0.0
+    _reported = True
+
+    def _charge(self, seconds: float, statements: int = 0):
+        record_sql(seconds, statements)
+        self._elapsed += seconds
+        if not self._reported and SLOW_QUERY_SECONDS and self._elapsed >= SLOW_QUERY_SECONDS:
+            self._reported = True
+            stats = _current.get()
+            slow_queries.record(self.connection, self._sql, self._params, self._elapsed, stats and stats.route)
+
+    def _start(self, sql, parameters, watch: bool = True):
+        self._sql = sql
+        self._params = parameters
+        self._elapsed = 0.0
+        self._reported = not watch
+
+    def execute(self, sql, parameters=()):
+        self._start(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._charge(time.perf_counter() - start, 1)
+
+    def executemany(self, sql, seq_of_parameters):
+        # Bulk inserts are slow by design; timed, but kept out of the slow-query log
+        self._start(sql, None, watch=False)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._charge(time.perf_counter() - start, 1)
+
+    def executescript(self, sql_script):
+        self._start(sql_script, None, watch=False)
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._charge(time.perf_counter() - start, 1)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._charge(time.perf_counter() - start)
+
+    def fetchmany(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(*args, **kwargs)
+        finally:
+            self._charge(time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._charge(time.perf_counter() - start)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection factory whose statements, commits and rollbacks are timed."""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        # With synchronous=FULL this is where the fsync happens
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            record_sql(time.perf_counter() - start)
+
+    def rollback(self):
+        start = time.perf_counter()
+        try:
+            super().rollback()
+        finally:
+            record_sql(time.perf_counter() - start)
+
+def connection_factory():
+    return InstrumentedConnection if METRICS_ENABLED else sqlite3.Connection
+
+def route_label(scope) -> str:
+    # The route's path template, so /claims/1 and /claims/2 share one series. Call it
+    # before the request is routed: mounts rewrite the scope's root_path
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "") or "unmatched"
+    return "unmatched"
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    plural = "" if stats.sql_statements == 1 else "s"
+    return (
+        f'sql;dur={stats.sql_seconds * 1000:.2f};desc="{stats.sql_statements} statement{plural}", '
+        f"app;dur={elapsed * 1000:.2f}"
+    )
+
+class MetricsMiddleware:
+    """Per-request latency, SQL statement counts and time, and a Server-Timing header.
+
+    The header is written when the response starts, so for streamed responses
+    (the export) it covers the work done before the first byte only; the
+    histograms cover the whole response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = route_label(scope)
+        stats = RequestStats(route)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            method = scope["method"]
+            REQUESTS.inc(method, route, str(status))
+            REQUEST_SECONDS.observe(elapsed, method, route)
+            REQUEST_SQL_SECONDS.observe(stats.sql_seconds, method, route)
+            SQL_STATEMENTS.inc(route, amount=stats.sql_statements)
+            SQL_SECONDS.inc(route, amount=stats.sql_seconds)
@@ -0,0 +1,191 @@
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+# Claims per backfill transaction: each batch holds the write lock for milliseconds,
+# so other connections (a second worker, the CLI, a backup) are never blocked for long
+BACKFILL_BATCH_SIZE = int(os.getenv("CLAIMS_BACKFILL_BATCH_SIZE", "5000"))
+# Sleep between batches: a writer's busy handler polls, and without a gap it keeps
+# waking up while the next batch already holds the lock
+BACKFILL_PAUSE_MS = float(os.getenv("CLAIMS_BACKFILL_PAUSE_MS", "20"))
+
+logger = logging.getLogger("claims_tracker")
+
+STATE_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_backfills (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    last_id INTEGER NOT NULL,
+    high_id INTEGER NOT NULL,
+    changes INTEGER NOT NULL DEFAULT 0,
+    finished_at TEXT
+) WITHOUT ROWID
+"""
+
+class Backfill:
+    """Data part of a migration, applied to existing claims in id order.
+
+    `sql` takes (low, high) and must only touch claims with low < id <= high.
+    Each batch commits together with its progress row in schema_backfills, so an
+    interrupted run resumes after the last committed batch and no batch is applied
+    twice. Claims inserted after the schema step are left to its triggers; edits to
+    claims the backfill has not reached yet are not, which is why init_db finishes
+    every backfill before the app serves.
+    """
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+
+class Migration:
+    """One schema version: DDL applied in a single transaction, then its backfills.
+
+    `files` runs before `schema` for steps that move files on disk; dry runs skip it.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        name: str,
+        schema: Optional[Callable[[sqlite3.Cursor], None]] = None,
+        backfills: Sequence[Backfill] = (),
+        files: Optional[Callable[[sqlite3.Cursor], None]] = None
+    ):
+        self.version = version
+        self.name = name
+        self.schema = schema
+        self.backfills = tuple(backfills)
+        self.files = files
+
+def _user_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def pending_backfills(conn: sqlite3.Connection) -> List[str]:
+    conn.execute(STATE_TABLE)
+    return [name for (name,) in conn.execute("SELECT name FROM schema_backfills WHERE finished_at IS NULL")]
+
+def _apply_schema(conn: sqlite3.Connection, migration: Migration, dry_run: bool) -> bool:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock: another process may have migrated meanwhile
+        if _user_version(conn) >= migration.version:
+            conn.execute("COMMIT")
+            return False
+        cursor = conn.cursor()
+        if migration.files and not dry_run:
+            migration.files(cursor)
+        if migration.schema:
+            migration.schema(cursor)
+        high_id = conn.execute("SELECT coalesce(max(id), 0) FROM claims").fetchone()[0]
+        for backfill in migration.backfills:
+            conn.execute(
+                "INSERT OR REPLACE INTO schema_backfills (name, version, last_id, high_id) VALUES (?, ?, 0, ?)",
+                (backfill.name, migration.version, high_id)
+            )
+        conn.execute(f"PRAGMA user_version = {migration.version}")
+        conn.execute("COMMIT")
+        return True
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def _run_backfill(
+    conn: sqlite3.Connection,
+    backfill: Backfill,
+    batch_size: int,
+    pause: float,
+    progress: Optional[Callable[[str, int, int], None]] = None
+) -> dict:
+    stats = {"name": backfill.name, "batches": 0, "changes": 0, "seconds": 0.0, "max_batch_seconds": 0.0}
+    while True:
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            state = conn.execute(
+                "SELECT last_id, high_id FROM schema_backfills WHERE name = ? AND finished_at IS NULL",
+                (backfill.name,)
+            ).fetchone()
+            if state is None:
+                conn.execute("COMMIT")
+                return stats
+            last_id, high_id = state
+            # Ids can have gaps: the batch ends at the batch_size-th remaining claim
+            row = conn.execute(
+                "SELECT id FROM claims WHERE id > ? AND id <= ? ORDER BY id LIMIT 1 OFFSET ?",
+                (last_id, high_id, batch_size - 1)
+            ).fetchone()
+            upper = row[0] if row else high_id
+            changes = max(conn.execute(backfill.sql, (last_id, upper)).rowcount, 0)
+            done = upper >= high_id
+            conn.execute("""
+                UPDATE schema_backfills
+                SET last_id = ?, changes = changes + ?, finished_at = CASE WHEN ? THEN datetime('now') END
+                WHERE name = ?
+            """, (upper, changes, done, backfill.name))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        elapsed = time.perf_counter() - started
+        stats["batches"] += 1
+        stats["changes"] += changes
+        stats["seconds"] += elapsed
+        stats["max_batch_seconds"] = max(stats["max_batch_seconds"], elapsed)
+        if progress:
+            progress(backfill.name, upper, high_id)
+        if done:
+            return stats
+        if pause:
+            time.sleep(pause)
+
+def apply_migrations(
+    conn: sqlite3.Connection,
+    migrations: Sequence[Migration],
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    dry_run: bool = False,
+    progress: Optional[Callable[[str, int, int], None]] = None
+) -> List[dict]:
+    # `conn` must be in autocommit mode (isolation_level=None): every schema step and
+    # every backfill batch is its own BEGIN IMMEDIATE ... COMMIT. Versions are applied
+    # in order, each one's backfills finishing before the next version's schema step.
+    conn.execute(STATE_TABLE)
+    reports = []
+    for migration in migrations:
+        started = time.perf_counter()
+        applied = _apply_schema(conn, migration, dry_run)
+        report = {
+            "version": migration.version,
+            "name": migration.name,
+            "schema_seconds": time.perf_counter() - started,
+            "backfills": [],
+        }
+        for backfill in migration.backfills:
+            # A dry run works on a private copy: nobody else to let in
+            stats = _run_backfill(conn, backfill, batch_size, 0 if dry_run else BACKFILL_PAUSE_MS / 1000, progress)
+            if stats["batches"]:
+                report["backfills"].append(stats)
+        if applied:
+            logger.info(f"DB migrated to version {migration.version}")
+        if applied or report["backfills"]:
+            reports.append(report)
+    return reports
+
+def dry_run(db_path: Path, migrations: Sequence[Migration], batch_size: int = BACKFILL_BATCH_SIZE) -> List[dict]:
+    # Apply pending steps to a copy (next to the database, so it lands on the same disk)
+    # and report their timings; the database itself is only read
+    with tempfile.TemporaryDirectory(dir=Path(db_path).parent, prefix=".migrate-dry-run-") as tmp:
+        copy = sqlite3.connect(Path(tmp) / "claims.db", isolation_level=None)
+        try:
+            source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                source.backup(copy)
+            finally:
+                source.close()
+            return apply_migrations(copy, migrations, batch_size, dry_run=True)
+        finally:
+            copy.close()
@@ -1,7 +1,7 @@
 from enum import Enum
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 
 class ClaimType(str, Enum):
     DAMAGE = "Damage"
@@ -20,6 +20,10 @@ class Status(str, Enum):
     IN_REVIEW = "In Review"
     RESOLVED = "Resolved"
 
+class SlaState(str, Enum):
+    BREACHED = "breached"
+    AT_RISK = "at_risk"
+
 class ResolutionOutcome(str, Enum):
     VALID = "Valid"
     INVALID = "Invalid"
@@ -33,6 +37,15 @@ class ClaimBase(BaseModel):
 class ClaimCreate(ClaimBase):
     pass
 
+class ClaimImport(ClaimCreate):
+    # Historical fields a backfill may carry; defaults match a fresh capture
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+    status: Status = Status.OPEN
+    resolved_note: Optional[str] = None
+    resolution_outcome: Optional[ResolutionOutcome] = None
+
 class ClaimUpdate(BaseModel):
     description: Optional[str] = None
     severity: Optional[Severity] = None
@@ -42,6 +55,9 @@ class ClaimStatusUpdate(BaseModel):
     resolved_note: Optional[str] = None
     resolution_outcome: Optional[ResolutionOutcome] = None
 
+class ClaimBatchStatusUpdate(ClaimStatusUpdate):
+    claim_ids: List[int]
+
 class Claim(ClaimBase):
     id: int
     created_at: datetime
@@ -51,6 +67,75 @@ class Claim(ClaimBase):
     resolved_note: Optional[str] = None
     resolution_outcome: Optional[ResolutionOutcome] = None
     photo_path: Optional[str] = None
+    # created_at + the severity's SLA hours
+    due_at: Optional[datetime] = None
+    # data_version of the claim's last write (set by triggers); orders cache refreshes, not in the API
+    change_seq: int = Field(0, exclude=True)
 
     class Config:
         from_attributes = True
+
+class ClaimPage(BaseModel):
+    claims: List[Claim]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    # Highlighted search excerpts keyed by claim id (only when searching)
+    snippets: Dict[int, str] = {}
+
+class SearchHit(BaseModel):
+    claim: Claim
+    snippet: str
+    rank: float
+
+class BatchStatusResult(BaseModel):
+    claim_id: int
+    updated: bool
+    error: Optional[str] = None
+    claim: Optional[Claim] = None
+
+class ClaimCounts(BaseModel):
+    total: int = 0
+    by_status: Dict[Status, int] = Field(default_factory=lambda: {s: 0 for s in Status})
+    by_severity: Dict[Severity, int] = Field(default_factory=lambda: {s: 0 for s in Severity})
+    by_type: Dict[ClaimType, int] = Field(default_factory=lambda: {t: 0 for t in ClaimType})
+
+class SlaSummary(BaseModel):
+    policy_hours: Dict[Severity, int]
+    at_risk_fraction: float
+    breached: Dict[Severity, int] = Field(default_factory=lambda: {s: 0 for s in Severity})
+    at_risk: Dict[Severity, int] = Field(default_factory=lambda: {s: 0 for s in Severity})
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportReport(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+    # First errors only; `invalid` has the full count
+    errors: List[ImportRowError] = []
+
+class ResolutionTimes(BaseModel):
+    count: int = 0
+    mean_hours: Optional[float] = None
+    # Hours from capture to resolution, keyed by percentile ("p50", "p90", ...)
+    hours: Dict[str, Optional[float]] = {}
+
+class ClaimTrends(BaseModel):
+    start: date
+    end: date
+    window: int
+    days: List[date]
+    created: List[int]
+    created_by_type: Dict[ClaimType, List[int]]
+    resolved: List[int]
+    # Trailing `window`-day mean of `created`
+    created_rolling: List[float]
+    # Share of the claims created in the trailing window that are resolved now (None: no claims)
+    resolution_rate: List[Optional[float]]
+    resolution_times: Dict[Severity, ResolutionTimes]
+    outcomes: Dict[ResolutionOutcome, int]
@@ -0,0 +1,88 @@
+import itertools
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+from . import repo
+from .models import ClaimType, Severity, SlaState, Status
+
+# One representative value per filter: plans depend on which filters are set, not their values
+AUDIT_FILTERS = {
+    "status": (None, Status.OPEN),
+    "severity": (None, Severity.HIGH),
+    "claim_type": (None, ClaimType.DAMAGE),
+    "dates": (False, True),
+    "search": (None, "rare", "common"),
+    "sla": (None, SlaState.BREACHED, SlaState.AT_RISK),
+    "page": ("first", "after", "before"),
+}
+AUDIT_SEARCH = "pallet"
+AUDIT_RANGE = (datetime(2000, 1, 1), datetime(2000, 2, 1))
+AUDIT_CURSOR = repo.encode_cursor("2000-01-15 12:00:00", 1)
+
+def describe(filters: dict) -> str:
+    # e.g. "status+severity+search(common), after"
+    parts = []
+    for name in ("status", "severity", "claim_type", "dates", "search", "sla"):
+        value = filters.get(name)
+        if not value:
+            continue
+        label = "type" if name == "claim_type" else name
+        if name == "search":
+            label = f"search({value})"
+        elif name == "sla":
+            label = f"sla({value.value})"
+        parts.append(label)
+    return f"{'+'.join(parts) or 'unfiltered'}, {filters.get('page', 'first')}"
+
+def combinations() -> Iterator[dict]:
+    names = list(AUDIT_FILTERS)
+    for values in itertools.product(*AUDIT_FILTERS.values()):
+        yield dict(zip(names, values))
+
+def page_query_for(filters: dict, search: str = AUDIT_SEARCH, date_range=AUDIT_RANGE, cursor: str = AUDIT_CURSOR) -> Tuple[str, list]:
+    # The exact list_claims_page() statement for one combination; "common" searches
+    # take the path list_claims_page() picks above FTS_SORT_THRESHOLD matches
+    page = filters.get("page", "first")
+    return repo.page_query(
+        status=filters.get("status"),
+        severity=filters.get("severity"),
+        claim_type=filters.get("claim_type"),
+        search=search if filters.get("search") else None,
+        date_from=date_range[0] if filters.get("dates") else None,
+        date_to=date_range[1] if filters.get("dates") else None,
+        after=cursor if page == "after" else None,
+        before=cursor if page == "before" else None,
+        sla=filters.get("sla"),
+        common_search=filters.get("search") == "common"
+    )
+
+def explain(conn: sqlite3.Connection, sql: str, params: list) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+def classify(plan: List[str]) -> Dict[str, object]:
+    claims_steps = [step for step in plan if step.startswith(("SCAN claims", "SEARCH claims"))]
+    index = None
+    for step in claims_steps:
+        if "USING INTEGER PRIMARY KEY" in step:
+            # Driven by a list of ids (the FTS matches of a selective search)
+            index = "rowid"
+            break
+        if " USING " in step and "INDEX" in step:
+            index = step.split(" INDEX ", 1)[1].split(" ")[0]
+            break
+    return {
+        "index": index,
+        # Every row visited: no index bounds the walk
+        "full_scan": any(step == "SCAN claims" for step in claims_steps),
+        # Every matching row fetched and sorted before the first one is returned
+        "sorts": any(step == "USE TEMP B-TREE FOR ORDER BY" for step in plan),
+    }
+
+def audit(conn: sqlite3.Connection) -> List[dict]:
+    # One entry per filter combination the claim list can produce
+    results = []
+    for filters in combinations():
+        sql, params = page_query_for(filters)
+        plan = explain(conn, sql, params)
+        results.append({"filters": describe(filters), "plan": plan, **classify(plan)})
+    return results
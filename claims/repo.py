@@ -1,147 +1,667 @@
+import base64
+import binascii
+import json
+import os
+import re
 import sqlite3
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from . import db, slow_queries
 from .db import get_connection
-from .models import Claim, ClaimCreate, ClaimUpdate, ClaimStatusUpdate, Status, ResolutionOutcome
+from .writer import run_write
+from .cache import claim_cache
+from .models import BatchStatusResult, Claim, ClaimCounts, ClaimCreate, ClaimPage, ClaimType, ClaimUpdate, ClaimStatusUpdate, SearchHit, Severity, SlaState, SlaSummary, Status, ResolutionOutcome
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Upper bound on ids per batch status change (one writer transaction)
+MAX_BATCH_SIZE = 1000
+
+# Rows pulled per fetchmany() when streaming large result sets
+STREAM_BATCH_SIZE = 500
+
+# Markers wrapped around matched terms in search snippets; callers render them
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+SNIPPET_TOKENS = 12
+# Above this many matches, paging walks the created_at index and probes the match
+# set (early exit) instead of fetching and sorting every matching row
+FTS_SORT_THRESHOLD = 2000
+
+# An open claim is "at risk" once less than this share of its SLA is left
+SLA_AT_RISK_FRACTION = float(os.getenv("CLAIMS_SLA_AT_RISK", "0.25"))
+
+# Rows written by this app skip pydantic validation on read; "off" validates every row
+TRUSTED_HYDRATION = os.getenv("CLAIMS_TRUSTED_HYDRATION", "on").lower() not in ("off", "0", "false")
+
+_CLAIM_TYPES = {m.value: m for m in ClaimType}
+_SEVERITIES = {m.value: m for m in Severity}
+_STATUSES = {m.value: m for m in Status}
+_OUTCOMES = {m.value: m for m in ResolutionOutcome}
 
 class DuplicateClaimError(Exception):
+    def __init__(self, message: str, existing: Optional[Claim] = None):
+        super().__init__(message)
+        self.existing = existing
+
+class InvalidCursorError(ValueError):
     pass
 
-def create_claim(claim: ClaimCreate, photo_path: Optional[str] = None) -> int:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    now = datetime.now()
-    
-    try:
-        cursor.execute("""
-            INSERT INTO claims (
-                claim_uuid, created_at, updated_at, type, severity, status, description, photo_path
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            claim.claim_uuid,
-            now,
-            now,
-            claim.type.value,
-            claim.severity.value,
-            Status.OPEN.value,
-            claim.description,
-            photo_path
-        ))
-        conn.commit()
-        return cursor.lastrowid
-    except sqlite3.IntegrityError:
-        conn.close()
-        # Check if it exists to confirm it's a duplicate UUID
-        existing = get_claim_by_uuid(claim.claim_uuid)
-        if existing:
-            raise DuplicateClaimError(f"Claim with UUID {claim.claim_uuid} already exists")
-        raise
-    finally:
-        conn.close()
-
-def get_claim(claim_id: int) -> Optional[Claim]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM claims WHERE id = ?", (claim_id,))
-    row = cursor.fetchone()
-    conn.close()
+_CLAIM_FIELDS = frozenset(Claim.model_fields)
+
+def _trusted_claim(row) -> Claim:
+    # Enum members by dict lookup and timestamps via fromisoformat (the text our writers
+    # store). Keys are built in model field order so dumps match a validated Claim.
+    # A new Claim field must be added here too.
+    outcome = row["resolution_outcome"]
+    resolved_at = row["resolved_at"]
+    due_at = row["due_at"]
+    values = {
+        "claim_uuid": row["claim_uuid"],
+        "type": _CLAIM_TYPES[row["type"]],
+        "severity": _SEVERITIES[row["severity"]],
+        "description": row["description"],
+        "id": row["id"],
+        "created_at": datetime.fromisoformat(row["created_at"]),
+        "updated_at": datetime.fromisoformat(row["updated_at"]),
+        "resolved_at": datetime.fromisoformat(resolved_at) if resolved_at is not None else None,
+        "status": _STATUSES[row["status"]],
+        "resolved_note": row["resolved_note"],
+        "resolution_outcome": _OUTCOMES[outcome] if outcome is not None else None,
+        "photo_path": row["photo_path"],
+        "due_at": datetime.fromisoformat(due_at) if due_at is not None else None,
+        "change_seq": row["change_seq"],
+    }
+    # What model_construct does, minus its per-field Python loop (slower than validating)
+    claim = Claim.__new__(Claim)
+    object.__setattr__(claim, "__dict__", values)
+    object.__setattr__(claim, "__pydantic_fields_set__", set(_CLAIM_FIELDS))
+    object.__setattr__(claim, "__pydantic_extra__", None)
+    object.__setattr__(claim, "__pydantic_private__", None)
+    return claim
+
+def claim_from_row(row) -> Claim:
+    # Rows from our own DB skip validation; anything unexpected (e.g. a hand-edited
+    # row) falls back to the validating constructor
+    if TRUSTED_HYDRATION:
+        try:
+            return _trusted_claim(row)
+        except (IndexError, KeyError, TypeError, ValueError):
+            pass
+    return Claim(**dict(row))
+
+def _returned_claims(conn: sqlite3.Connection, rows) -> List[Claim]:
+    # Rows from INSERT/UPDATE ... RETURNING *. RETURNING shows change_seq as it was before
+    # the version triggers ran, so read back the values this transaction will commit.
+    claims = [claim_from_row(row) for row in rows]
+    if claims:
+        seqs = dict(conn.execute(
+            "SELECT id, change_seq FROM claims WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps([claim.id for claim in claims]),)
+        ).fetchall())
+        for claim in claims:
+            claim.change_seq = seqs[claim.id]
+    return claims
+
+def _returned_claim(cursor: sqlite3.Cursor) -> Optional[Claim]:
+    # fetchall so the statement is finished before commit
+    claims = _returned_claims(cursor.connection, cursor.fetchall())
+    return claims[0] if claims else None
+
+def _fetch_claim(conn: sqlite3.Connection, claim_id: int) -> Optional[Claim]:
+    row = conn.execute("SELECT * FROM claims WHERE id = ?", (claim_id,)).fetchone()
     if row:
-        return Claim(**dict(row))
+        return claim_from_row(row)
     return None
 
-def get_claim_by_uuid(claim_uuid: str) -> Optional[Claim]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM claims WHERE claim_uuid = ?", (claim_uuid,))
-    row = cursor.fetchone()
-    conn.close()
+def _fetch_claim_by_uuid(conn: sqlite3.Connection, claim_uuid: str) -> Optional[Claim]:
+    row = conn.execute("SELECT * FROM claims WHERE claim_uuid = ?", (claim_uuid,)).fetchone()
     if row:
-        return Claim(**dict(row))
+        return claim_from_row(row)
     return None
 
-def list_claims(
+def create_claim(claim: ClaimCreate, photo_path: Optional[str] = None) -> int:
+    now = datetime.now()
+
+    def write(conn: sqlite3.Connection) -> int:
+        try:
+            cursor = conn.execute(f"""
+                INSERT INTO claims (
+                    claim_uuid, created_at, updated_at, type, severity, status, description, photo_path, due_at
+                ) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, {db.due_at_sql('?2', '?5')})
+                RETURNING *
+            """, (
+                claim.claim_uuid,
+                now,
+                now,
+                claim.type.value,
+                claim.severity.value,
+                Status.OPEN.value,
+                claim.description,
+                photo_path
+            ))
+            return _returned_claim(cursor)
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            # Check if it exists to confirm it's a duplicate UUID
+            existing = _fetch_claim_by_uuid(conn, claim.claim_uuid)
+            if existing:
+                claim_cache.put(existing)
+                raise DuplicateClaimError(f"Claim with UUID {claim.claim_uuid} already exists", existing)
+            raise
+
+    created = run_write(write)
+    claim_cache.put(created)
+    return created.id
+
+def get_claim(claim_id: int, use_cache: bool = True) -> Optional[Claim]:
+    claim = claim_cache.get(claim_id) if use_cache else None
+    if claim is None:
+        with get_connection() as conn:
+            claim = _fetch_claim(conn, claim_id)
+        if claim:
+            claim_cache.put(claim)
+    return claim
+
+def get_claim_by_uuid(claim_uuid: str, use_cache: bool = True) -> Optional[Claim]:
+    claim = claim_cache.get_by_uuid(claim_uuid) if use_cache else None
+    if claim is None:
+        with get_connection() as conn:
+            claim = _fetch_claim_by_uuid(conn, claim_uuid)
+        if claim:
+            claim_cache.put(claim)
+    return claim
+
+def _write_returning(query: str, params, tag: Optional[str] = None) -> Optional[Claim]:
+    # Apply an UPDATE ... RETURNING * and refresh the cache with the committed row
+    def write(conn: sqlite3.Connection) -> Optional[Claim]:
+        return _returned_claim(conn.execute(f"{query} RETURNING *", params))
+
+    with slow_queries.tagged(tag):
+        claim = run_write(write)
+    if claim:
+        claim_cache.put(claim)
+    return claim
+
+def fts_query(search: str) -> Optional[str]:
+    # Every word becomes a quoted prefix term, ANDed together: "pall crush" -> "pall"* "crush"*
+    words = re.findall(r"\w+", search)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def _filter_clauses(
     status: Optional[Status] = None,
     severity: Optional[str] = None,
     claim_type: Optional[str] = None,
     search: Optional[str] = None,
     date_from: Optional[datetime] = None,
-    date_to: Optional[datetime] = None
-) -> List[Claim]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    query = "SELECT * FROM claims WHERE 1=1"
+    date_to: Optional[datetime] = None,
+    common_search: bool = False,
+    sla: Optional[SlaState] = None
+) -> Tuple[str, list]:
+    query = "1=1"
     params = []
-    
+    match = fts_query(search) if search else None
+    # Unary + takes a term out of index selection. A selective search drives the query
+    # by rowid from its FTS matches, and an SLA filter walks idx_claims_open_created
+    # (open claims only): neither should lose to an ordered walk of a composite index.
+    driven_by_search = bool(match) and not common_search
+    plain = "+" if driven_by_search else ""
+    equality = "+" if driven_by_search or sla else ""
+
     if status:
-        query += " AND status = ?"
+        query += f" AND {equality}status = ?"
         params.append(status.value)
     if severity:
-        query += " AND severity = ?"
+        query += f" AND {equality}severity = ?"
         val = severity.value if hasattr(severity, "value") else severity
         params.append(val)
     if claim_type:
-        query += " AND type = ?"
+        query += f" AND {equality}type = ?"
         val = claim_type.value if hasattr(claim_type, "value") else claim_type
         params.append(val)
     if search:
-        query += " AND (description LIKE ? OR resolved_note LIKE ?)"
-        search_term = f"%{search}%"
-        params.extend([search_term, search_term])
+        if match:
+            # Unary + keeps the planner from driving the query by rowid
+            column = "+id" if common_search else "id"
+            query += f" AND {column} IN (SELECT rowid FROM claims_fts WHERE claims_fts MATCH ?)"
+            params.append(match)
+        else:
+            # Punctuation-only input has no tokens to match; keep the substring semantics
+            query += " AND (description LIKE ? OR resolved_note LIKE ?)"
+            search_term = f"%{search}%"
+            params.extend([search_term, search_term])
     if date_from:
-        query += " AND created_at >= ?"
+        query += f" AND {plain}created_at >= ?"
         params.append(date_from)
     if date_to:
-        query += " AND created_at <= ?"
+        query += f" AND {plain}created_at <= ?"
         params.append(date_to)
-        
-    query += " ORDER BY created_at DESC, id DESC"
-    
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    
-    return [Claim(**dict(row)) for row in rows]
+    if sla:
+        clause, sla_params = _sla_clause(sla, datetime.now())
+        query += f" AND {clause}"
+        params.extend(sla_params)
+
+    return query, params
+
+def _sla_clause(sla: SlaState, now: datetime) -> Tuple[str, list]:
+    # The status term is written as in idx_claims_open_due's WHERE so the planner can
+    # use that partial index: its size follows the open queue, not the claim history
+    if sla == SlaState.BREACHED:
+        return "status != 'Resolved' AND due_at < ?", [now]
+    # Not due yet, but less than SLA_AT_RISK_FRACTION of the claim's SLA window left.
+    # No window is longer than the longest policy: that bounds the due_at range scanned.
+    return (
+        "status != 'Resolved' AND due_at >= ? "
+        "AND due_at < datetime(?, '+' || ((SELECT max(hours) FROM sla_policy) * ?) || ' hours') "
+        "AND julianday(due_at) - julianday(?) < ? * (julianday(due_at) - julianday(created_at))",
+        [now, now, SLA_AT_RISK_FRACTION, now, SLA_AT_RISK_FRACTION]
+    )
+
+def sla_state(claim: Claim, now: Optional[datetime] = None) -> Optional[SlaState]:
+    # Same rules as the SQL filter, for claims already loaded
+    if claim.due_at is None or claim.status == Status.RESOLVED:
+        return None
+    now = now or datetime.now()
+    if claim.due_at < now:
+        return SlaState.BREACHED
+    if claim.due_at - now < SLA_AT_RISK_FRACTION * (claim.due_at - claim.created_at):
+        return SlaState.AT_RISK
+    return None
+
+def list_claims(
+    status: Optional[Status] = None,
+    severity: Optional[str] = None,
+    claim_type: Optional[str] = None,
+    search: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sla: Optional[SlaState] = None
+) -> List[Claim]:
+    where, params = _filter_clauses(status, severity, claim_type, search, date_from, date_to, sla=sla)
+    query = f"SELECT * FROM claims WHERE {where} ORDER BY created_at DESC, id DESC"
+    tag = slow_queries.filter_tag(
+        "list_claims", status=status, severity=severity, type=claim_type, search=search,
+        dates=date_from or date_to, sla=sla
+    )
+
+    with slow_queries.tagged(tag), get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    return [claim_from_row(row) for row in rows]
+
+@contextmanager
+def read_snapshot() -> Iterator[sqlite3.Connection]:
+    # A pooled connection inside one read transaction: every query sees the same data
+    with get_connection() as conn:
+        conn.execute("BEGIN")
+        yield conn
+
+def iter_claims(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    max_id: Optional[int] = None,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[Claim]:
+    # Same rows and order as list_claims(), in keyset batches. Each batch borrows a pooled
+    # connection for its own query only, so a slow consumer holds neither a connection nor
+    # a read transaction between batches. `max_id` leaves out claims captured later on.
+    after = []
+    while True:
+        # Past the first batch the keyset is the upper bound: with date_to still in the
+        # query SQLite ranges the index on it and skips every row already returned
+        where, params = _filter_clauses(date_from=date_from, date_to=None if after else date_to)
+        if max_id is not None:
+            where += " AND id <= ?"
+            params.append(max_id)
+        if after:
+            where += " AND (created_at, id) < (?, ?)"
+            params += after
+        with get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM claims WHERE {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                params + [batch_size]
+            ).fetchall()
+        for row in rows:
+            yield claim_from_row(row)
+        if len(rows) < batch_size:
+            break
+        after = [rows[-1]["created_at"], rows[-1]["id"]]
+
+def max_claim_id(conn: Optional[sqlite3.Connection] = None) -> int:
+    if conn is None:
+        with get_connection() as conn:
+            return max_claim_id(conn)
+    return conn.execute("SELECT coalesce(max(id), 0) FROM claims").fetchone()[0]
+
+def _add_count(counts: ClaimCounts, status: str, severity: str, claim_type: str, n: int):
+    counts.total += n
+    counts.by_status[Status(status)] += n
+    counts.by_severity[Severity(severity)] += n
+    counts.by_type[ClaimType(claim_type)] += n
+
+def _full_days(date_from: Optional[datetime], date_to: Optional[datetime]) -> Tuple[Optional[date], Optional[date]]:
+    # First and last calendar days lying entirely inside [date_from, date_to] (None = unbounded)
+    first = None
+    last = None
+    if date_from is not None:
+        first = date_from.date() if date_from.time() == time.min else date_from.date() + timedelta(days=1)
+    if date_to is not None:
+        last = date_to.date() if date_to.time() == time.max else date_to.date() - timedelta(days=1)
+    return first, last
+
+def claim_counts(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    conn: Optional[sqlite3.Connection] = None
+) -> ClaimCounts:
+    # Summary numbers without loading rows. Pass `conn` to read inside an existing snapshot.
+    if conn is None:
+        with get_connection() as conn:
+            return claim_counts(date_from, date_to, conn)
+
+    counts = ClaimCounts()
+    first, last = _full_days(date_from, date_to)
+
+    if first is not None and last is not None and first > last:
+        # Less than one whole day: count the rows directly
+        edges = [(date_from, date_to, False)]
+    else:
+        # Whole days come from the daily rollup (O(days)); only the partial
+        # days at either end of the range touch the claims table
+        where = "1=1"
+        params = []
+        if first is not None:
+            where += " AND day >= ?"
+            params.append(first.isoformat())
+        if last is not None:
+            where += " AND day <= ?"
+            params.append(last.isoformat())
+        rows = conn.execute(f"""
+            SELECT status, severity, type, sum(count) FROM claims_daily_rollup
+            WHERE {where}
+            GROUP BY status, severity, type
+        """, params).fetchall()
+        for status, severity, claim_type, n in rows:
+            _add_count(counts, status, severity, claim_type, n)
+
+        edges = []
+        if date_from is not None and first is not None and date_from < datetime.combine(first, time.min):
+            edges.append((date_from, datetime.combine(first, time.min), True))
+        if date_to is not None and last is not None and date_to > datetime.combine(last, time.max):
+            edges.append((datetime.combine(last + timedelta(days=1), time.min), date_to, False))
+
+    for start, end, end_exclusive in edges:
+        where = "1=1"
+        params = []
+        if start is not None:
+            where += " AND created_at >= ?"
+            params.append(start)
+        if end is not None:
+            where += " AND created_at < ?" if end_exclusive else " AND created_at <= ?"
+            params.append(end)
+        rows = conn.execute(f"""
+            SELECT status, severity, type, count(*) FROM claims
+            WHERE {where}
+            GROUP BY status, severity, type
+        """, params).fetchall()
+        for status, severity, claim_type, n in rows:
+            _add_count(counts, status, severity, claim_type, n)
+
+    return counts
+
+def rebuild_rollup() -> int:
+    # Backfill/repair the daily rollup from the claims table; returns the rollup row count
+    def write(conn: sqlite3.Connection) -> int:
+        db.rebuild_rollup(conn)
+        return conn.execute("SELECT count(*) FROM claims_daily_rollup").fetchone()[0]
+
+    return run_write(write)
+
+def data_version(conn: Optional[sqlite3.Connection] = None) -> Tuple[int, int]:
+    # (version, sla_version): counters bumped by triggers on every claim and SLA policy
+    # write (version) and on policy writes only (sla_version), whichever process makes
+    # them. Reading them also drops cached claims dated under an older policy.
+    if conn is None:
+        with get_connection() as conn:
+            return data_version(conn)
+
+    version, sla_version = conn.execute("SELECT version, sla_version FROM data_version WHERE id = 1").fetchone()
+    claim_cache.sync_policy(sla_version)
+    return version, sla_version
+
+def get_sla_policy(conn: Optional[sqlite3.Connection] = None) -> Dict[Severity, int]:
+    if conn is None:
+        with get_connection() as conn:
+            return get_sla_policy(conn)
+    rows = conn.execute("SELECT severity, hours FROM sla_policy").fetchall()
+    return {_SEVERITIES[severity]: hours for severity, hours in rows if severity in _SEVERITIES}
+
+def set_sla_hours(severity: Severity, hours: int) -> int:
+    # Changes the policy and re-dates every claim of that severity; returns how many
+    if hours <= 0:
+        raise ValueError("SLA hours must be positive")
+
+    def write(conn: sqlite3.Connection) -> int:
+        conn.execute("""
+            INSERT INTO sla_policy (severity, hours) VALUES (?, ?)
+            ON CONFLICT (severity) DO UPDATE SET hours = excluded.hours
+        """, (severity.value, hours))
+        cursor = conn.cursor()
+        db.rebuild_due_dates(cursor, severity.value)
+        return cursor.rowcount
+
+    changed = run_write(write)
+    # The sla_policy triggers moved sla_version: cached claims still carry the old due_at
+    data_version()
+    return changed
+
+def sla_summary(now: Optional[datetime] = None) -> SlaSummary:
+    # Breached / at-risk counts per severity, read from the open-claims index only
+    now = now or datetime.now()
+    with get_connection() as conn:
+        summary = SlaSummary(policy_hours=get_sla_policy(conn), at_risk_fraction=SLA_AT_RISK_FRACTION)
+        for state, counts in ((SlaState.BREACHED, summary.breached), (SlaState.AT_RISK, summary.at_risk)):
+            clause, params = _sla_clause(state, now)
+            # Unary + so the planner doesn't walk idx_claims_severity (all claims) to skip the sort
+            rows = conn.execute(f"SELECT severity, count(*) FROM claims WHERE {clause} GROUP BY +severity", params)
+            for severity, n in rows:
+                counts[Severity(severity)] = n
+    return summary
+
+def encode_cursor(created_at: str, claim_id: int) -> str:
+    # created_at is the raw stored value, so cursor comparisons match the column exactly
+    raw = f"{created_at}|{claim_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, claim_id = base64.urlsafe_b64decode(padded).decode().rsplit("|", 1)
+        return created_at, int(claim_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(f"Invalid page cursor: {cursor!r}")
+
+def page_query(
+    status: Optional[Status] = None,
+    severity: Optional[str] = None,
+    claim_type: Optional[str] = None,
+    search: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    sla: Optional[SlaState] = None,
+    common_search: bool = False
+) -> Tuple[str, list]:
+    # The SQL list_claims_page() runs; also what the query-plan audit explains
+    where, params = _filter_clauses(status, severity, claim_type, search, date_from, date_to, common_search, sla)
+
+    if before:
+        where += " AND (created_at, id) > (?, ?)"
+        params.extend(decode_cursor(before))
+        order = "ASC"
+    else:
+        if after:
+            where += " AND (created_at, id) < (?, ?)"
+            params.extend(decode_cursor(after))
+        order = "DESC"
+
+    params.append(limit + 1)
+    return f"SELECT * FROM claims WHERE {where} ORDER BY created_at {order}, id {order} LIMIT ?", params
+
+def list_claims_page(
+    status: Optional[Status] = None,
+    severity: Optional[str] = None,
+    claim_type: Optional[str] = None,
+    search: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    sla: Optional[SlaState] = None
+) -> ClaimPage:
+    # Keyset pagination on (created_at, id): `after` walks to older claims,
+    # `before` back to newer ones. Cost depends on page size, not table size.
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    with get_connection() as conn:
+        common_search = bool(search) and _match_count(conn, search) > FTS_SORT_THRESHOLD
+    query, params = page_query(
+        status, severity, claim_type, search, date_from, date_to, limit, after, before, sla, common_search
+    )
+    tag = slow_queries.filter_tag(
+        "list_claims_page", status=status, severity=severity, type=claim_type,
+        search=search, common_search=common_search, dates=date_from or date_to, sla=sla, after=after, before=before
+    )
+
+    with slow_queries.tagged(tag), get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if before:
+            rows.reverse()
+
+        snippets = {}
+        if search and rows:
+            snippets = _snippets(conn, search, [row["id"] for row in rows])
+
+    next_cursor = None
+    prev_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if (has_more and not before) or before:
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        if (has_more and before) or after:
+            prev_cursor = encode_cursor(first["created_at"], first["id"])
+
+    return ClaimPage(
+        claims=[claim_from_row(row) for row in rows],
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        snippets=snippets
+    )
+
+def _match_count(conn: sqlite3.Connection, search: str) -> int:
+    match = fts_query(search)
+    if not match:
+        return 0
+    # Only whether it exceeds FTS_SORT_THRESHOLD matters: stop counting just past it
+    return conn.execute(
+        "SELECT count(*) FROM (SELECT 1 FROM claims_fts WHERE claims_fts MATCH ? LIMIT ?)",
+        (match, FTS_SORT_THRESHOLD + 1)
+    ).fetchone()[0]
+
+def _snippets(conn: sqlite3.Connection, search: str, claim_ids: List[int]) -> Dict[int, str]:
+    match = fts_query(search)
+    if not match:
+        return {}
+    # A rowid range lets FTS5 seek its doclists once; `rowid IN (...)` re-runs the
+    # match per id. Rows in the range but not on the page are dropped below.
+    rows = conn.execute("""
+        SELECT rowid, snippet(claims_fts, -1, ?, ?, '…', ?) AS snippet
+        FROM claims_fts
+        WHERE claims_fts MATCH ? AND rowid BETWEEN ? AND ?
+    """, (SNIPPET_START, SNIPPET_END, SNIPPET_TOKENS, match, min(claim_ids), max(claim_ids))).fetchall()
+    wanted = set(claim_ids)
+    return {row["rowid"]: row["snippet"] for row in rows if row["rowid"] in wanted}
+
+def search_claims(
+    search: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    status: Optional[Status] = None,
+    severity: Optional[str] = None,
+    claim_type: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sla: Optional[SlaState] = None
+) -> List[SearchHit]:
+    # Best matches first (bm25), with a highlighted excerpt from the best-matching column.
+    # The other filters are the dashboard's, applied as on list_claims_page(). Ranking
+    # needs every match anyway, so CROSS JOIN keeps the FTS side driving: with a filter
+    # SQLite would otherwise walk a claims index and run the MATCH once per row (~50x slower).
+    match = fts_query(search)
+    if not match:
+        return []
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    where, params = _filter_clauses(status, severity, claim_type, None, date_from, date_to, sla=sla)
+
+    with get_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT claims.*,
+                   snippet(claims_fts, -1, ?, ?, '…', ?) AS snippet,
+                   bm25(claims_fts) AS rank
+            FROM claims_fts
+            CROSS JOIN claims ON claims.id = claims_fts.rowid
+            WHERE claims_fts MATCH ? AND {where}
+            ORDER BY rank, claims.id DESC
+            LIMIT ?
+        """, (SNIPPET_START, SNIPPET_END, SNIPPET_TOKENS, match, *params, limit)).fetchall()
+
+    hits = []
+    for row in rows:
+        data = dict(row)
+        snippet = data.pop("snippet")
+        rank = data.pop("rank")
+        hits.append(SearchHit(claim=claim_from_row(data), snippet=snippet, rank=rank))
+    return hits
 
 def update_claim(claim_id: int, update: ClaimUpdate) -> Optional[Claim]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
     updates = []
     params = []
-    
+
     if update.description is not None:
         updates.append("description = ?")
         params.append(update.description)
     if update.severity is not None:
         updates.append("severity = ?")
         params.append(update.severity.value)
-        
+        # In the same statement, so RETURNING (and the cache) sees the new deadline
+        updates.append(f"due_at = {db.due_at_sql('claims.created_at', '?')}")
+        params.append(update.severity.value)
+
     if not updates:
-        conn.close()
         return get_claim(claim_id)
-        
+
     updates.append("updated_at = ?")
     params.append(datetime.now())
-    
+
     params.append(claim_id)
-    
+
     query = f"UPDATE claims SET {', '.join(updates)} WHERE id = ?"
-    cursor.execute(query, params)
-    conn.commit()
-    conn.close()
-    
-    return get_claim(claim_id)
+    tag = slow_queries.filter_tag("update_claim", description=update.description is not None, severity=update.severity)
+    return _write_returning(query, params, tag)
 
-def update_claim_status(claim_id: int, update: ClaimStatusUpdate) -> Optional[Claim]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
+def _status_assignments(update: ClaimStatusUpdate) -> Tuple[List[str], list]:
     now = datetime.now()
     updates = ["status = ?", "updated_at = ?"]
     params = [update.status.value, now]
-    
+
     # Handle resolved_at logic
     if update.status == Status.RESOLVED:
         updates.append("resolved_at = ?")
@@ -153,31 +673,54 @@ def update_claim_status(claim_id: int, update: ClaimStatusUpdate) -> Optional[Cl
         # If moving out of resolved, clear resolved_at
         updates.append("resolved_at = NULL")
         updates.append("resolution_outcome = NULL")
-        
+
     if update.resolved_note is not None:
         updates.append("resolved_note = ?")
         params.append(update.resolved_note)
-        
+
+    return updates, params
+
+def update_claim_status(claim_id: int, update: ClaimStatusUpdate) -> Optional[Claim]:
+    updates, params = _status_assignments(update)
     params.append(claim_id)
-    
+
     query = f"UPDATE claims SET {', '.join(updates)} WHERE id = ?"
-    cursor.execute(query, params)
-    conn.commit()
-    conn.close()
-    
-    return get_claim(claim_id)
+    return _write_returning(query, params, "update_claim_status")
+
+def update_claims_status(claim_ids: List[int], update: ClaimStatusUpdate) -> List[BatchStatusResult]:
+    # Same rules as update_claim_status, applied to every id in one statement/transaction
+    claim_ids = list(dict.fromkeys(claim_ids))
+    if len(claim_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} claims per batch")
+    if not claim_ids:
+        return []
+
+    updates, params = _status_assignments(update)
+    params.append(json.dumps(claim_ids))
+    query = f"""
+        UPDATE claims SET {', '.join(updates)}
+        WHERE id IN (SELECT value FROM json_each(?))
+        RETURNING *
+    """
+
+    def write(conn: sqlite3.Connection) -> List[Claim]:
+        return _returned_claims(conn, conn.execute(query, params).fetchall())
+
+    with slow_queries.tagged("update_claims_status"):
+        updated = {claim.id: claim for claim in run_write(write)}
+    results = []
+    for claim_id in claim_ids:
+        claim = updated.get(claim_id)
+        if claim:
+            claim_cache.put(claim)
+            results.append(BatchStatusResult(claim_id=claim_id, updated=True, claim=claim))
+        else:
+            results.append(BatchStatusResult(claim_id=claim_id, updated=False, error="Claim not found"))
+    return results
 
 def update_claim_photo(claim_id: int, photo_path: str) -> Optional[Claim]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        UPDATE claims 
-        SET photo_path = ?, updated_at = ? 
+    return _write_returning("""
+        UPDATE claims
+        SET photo_path = ?, updated_at = ?
         WHERE id = ?
     """, (photo_path, datetime.now(), claim_id))
-    
-    conn.commit()
-    conn.close()
-    
-    return get_claim(claim_id)
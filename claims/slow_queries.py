@@ -0,0 +1,148 @@
+import contextvars
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from . import storage
+from .models import ClaimType, ResolutionOutcome, Severity, SlaState, Status
+
+# Statements slower than this (execute plus fetches) are logged with their plan; 0 disables
+SLOW_QUERY_MS = float(os.getenv("CLAIMS_SLOW_QUERY_MS", "100"))
+LOG_NAME = "slow_queries.jsonl"
+
+logger = logging.getLogger("claims_tracker")
+
+# Parameter values safe to log as-is: enum values and timestamps. Everything else
+# (descriptions, notes, search terms, uuids) is logged as its type and length.
+_SAFE_VALUES = frozenset(m.value for enum in (ClaimType, Severity, Status, SlaState, ResolutionOutcome) for m in enum)
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+_WHITESPACE = re.compile(r"\s+")
+# Statements EXPLAIN QUERY PLAN says something useful about
+_EXPLAINABLE = frozenset({"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"})
+
+_tag: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("claims_query_tag", default=None)
+_write_lock = threading.Lock()
+
+def filter_tag(operation: str, **filters) -> str:
+    # e.g. "list_claims_page(status+search+after)": which filters were set, not their values
+    used = [name for name, value in filters.items() if value]
+    return f"{operation}({'+'.join(used) or 'unfiltered'})"
+
+@contextmanager
+def tagged(tag: str) -> Iterator[None]:
+    # Labels slow statements run inside the block (including writer jobs submitted from it)
+    token = _tag.set(tag)
+    try:
+        yield
+    finally:
+        _tag.reset(token)
+
+def redact(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    if isinstance(value, str):
+        if value in _SAFE_VALUES or _TIMESTAMP.match(value):
+            return value
+        return f"<str {len(value)}>"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes {len(value)}>"
+    return f"<{type(value).__name__}>"
+
+def redact_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: redact(value) for name, value in params.items()}
+    return [redact(value) for value in params]
+
+def normalize_sql(sql: str) -> str:
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def log_path() -> Path:
+    return storage.get_data_dir() / LOG_NAME
+
+def _explain(conn: sqlite3.Connection, sql: str, params) -> List[str]:
+    # A plain cursor, so the EXPLAIN itself is neither timed nor logged
+    words = sql.split(None, 1)
+    if params is None or not words or words[0].upper() not in _EXPLAINABLE:
+        return []
+    try:
+        return [row[3] for row in sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    except sqlite3.Error as e:
+        return [f"(EXPLAIN failed: {e})"]
+
+def record(conn: sqlite3.Connection, sql: str, params, seconds: float, route: Optional[str] = None):
+    entry = {
+        "at": datetime.now().isoformat(" ", timespec="seconds"),
+        "ms": round(seconds * 1000, 2),
+        "route": route,
+        "tag": _tag.get(),
+        "sql": normalize_sql(sql),
+        "params": redact_params(params),
+        "plan": _explain(conn, sql, params),
+    }
+    logger.warning(
+        f"Slow query {entry['ms']:.0f} ms [{entry['tag'] or route or '-'}]: {entry['sql'][:300]} "
+        f"params={entry['params']} plan={' | '.join(entry['plan'])}",
+        extra={"slow_query_ms": entry["ms"], "route": route, "tag": entry["tag"]}
+    )
+    line = json.dumps(entry) + "\n"
+    try:
+        # One append per line; small O_APPEND writes from several workers do not interleave
+        with _write_lock, open(log_path(), "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        logger.error(f"Could not write slow query log: {e}")
+
+def read_log(since: Optional[datetime] = None) -> Iterator[dict]:
+    path = log_path()
+    if not path.exists():
+        return
+    cutoff = since.isoformat(" ", timespec="seconds") if since else None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            if cutoff is None or entry.get("at", "") >= cutoff:
+                yield entry
+
+def summarize(entries, top: int = 10) -> List[dict]:
+    # Worst query shapes (same tag and SQL text) first, by total time spent over the threshold
+    shapes: Dict[tuple, dict] = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "durations": []})
+    for entry in entries:
+        shape = shapes[(entry.get("tag"), entry["sql"])]
+        shape["count"] += 1
+        shape["total_ms"] += entry["ms"]
+        shape["max_ms"] = max(shape["max_ms"], entry["ms"])
+        shape["durations"].append(entry["ms"])
+        shape["last_at"] = entry["at"]
+        shape["routes"] = sorted(set(shape.get("routes", [])) | {entry.get("route") or "-"})
+        if entry.get("plan"):
+            shape["plan"] = entry["plan"]
+    ranked = []
+    for (tag, sql), shape in shapes.items():
+        durations = sorted(shape.pop("durations"))
+        ranked.append({
+            "tag": tag,
+            "sql": sql,
+            "p50_ms": durations[len(durations) // 2],
+            # A table walked row by row (virtual tables such as FTS have their own index)
+            "full_scan": any(
+                step.startswith("SCAN ") and " USING " not in step and "VIRTUAL TABLE" not in step
+                for step in shape.get("plan", [])
+            ),
+            **shape,
+        })
+    ranked.sort(key=lambda s: s["total_ms"], reverse=True)
+    return ranked[:top]
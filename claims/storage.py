@@ -1,7 +1,23 @@
+import asyncio
+import hashlib
 import os
+import secrets
 import shutil
 from pathlib import Path
+from typing import Optional
+import aiofiles
+import aiofiles.os
 from fastapi import UploadFile
+from . import metrics
+
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+class UploadTooLargeError(Exception):
+    pass
+
+# Directories already created this process; avoids two mkdir syscalls per lookup
+_ensured_dirs = set()
 
 def get_data_dir() -> Path:
     # Check for env override first (for cloud persistence)
@@ -17,40 +33,111 @@ def get_data_dir() -> Path:
         base_dir = Path.home()
         data_dir = base_dir / ".claims_tracker"
     
-    data_dir.mkdir(parents=True, exist_ok=True)
-    
-    uploads_dir = data_dir / "uploads"
-    uploads_dir.mkdir(parents=True, exist_ok=True)
-    
+    if data_dir not in _ensured_dirs:
+        data_dir.mkdir(parents=True, exist_ok=True)
+
+        uploads_dir = data_dir / "uploads"
+        uploads_dir.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(data_dir)
+
     return data_dir
 
-def save_upload(file: UploadFile, claim_uuid: str) -> str:
-    data_dir = get_data_dir()
-    uploads_dir = data_dir / "uploads"
-    
-    # Get extension
-    filename = file.filename or "unknown"
-    ext = os.path.splitext(filename)[1]
-    if not ext:
-        ext = ".jpg" # Default fallback
-        
-    # Save as claim_uuid + ext
-    saved_filename = f"{claim_uuid}{ext}"
-    file_path = uploads_dir / saved_filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    return str(saved_filename)
+def _fsync_dir(path: Path):
+    # Persist the rename itself; directories can't be opened for fsync on Windows
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
-def get_upload_path(filename: str) -> Path:
-    return get_data_dir() / "uploads" / filename
+def blob_path(digest: str, ext: str) -> str:
+    # Content-addressed name, sharded two levels deep so no directory grows huge
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}"
+
+def _upload_ext(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "unknown")[1]
+    return ext if ext else ".jpg" # Default fallback
+
+def _claim_blob(tmp_path: Path, target: Path) -> bool:
+    # Move a finished temp file into the store; False if identical content was already there
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        try:
+            # Fresh mtime keeps the blob out of GC's grace window until a claim references it
+            os.utime(target)
+            os.remove(tmp_path)
+            return False
+        except FileNotFoundError:
+            pass # Collected in between; store our copy instead
+    os.replace(tmp_path, target)
+    _fsync_dir(target.parent)
+    return True
+
+async def save_upload(
+    file: UploadFile,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> str:
+    uploads_dir = get_data_dir() / "uploads"
+    ext = _upload_ext(file.filename)
 
-def delete_upload(filename: str):
+    # Stream into a temp file, hashing as we go, so a partial write is never visible
+    tmp_path = uploads_dir / f".upload.{secrets.token_hex(8)}.tmp"
+    digest = hashlib.sha256()
+    size = 0
     try:
-        path = get_upload_path(filename)
-        if path.exists():
-            os.remove(path)
-    except OSError:
-        pass # Non-fatal
+        async with aiofiles.open(tmp_path, "wb") as buffer:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                await buffer.write(chunk)
+            await buffer.flush()
+            await asyncio.to_thread(os.fsync, buffer.fileno())
+        saved_filename = blob_path(digest.hexdigest(), ext)
+        await asyncio.to_thread(_claim_blob, tmp_path, uploads_dir / saved_filename)
+    except BaseException:
+        metrics.UPLOADS.inc("photo", "failed")
+        try:
+            await aiofiles.os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        metrics.UPLOAD_BYTES.inc("photo", amount=size)
 
+    metrics.UPLOADS.inc("photo", "stored")
+    return saved_filename
+
+def hash_file(path: Path, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def adopt_upload(filename: str) -> Optional[str]:
+    # Link a legacy flat upload into the blob store; the old name is left for GC
+    source = get_upload_path(filename)
+    if not source.is_file():
+        return None
+    saved_filename = blob_path(hash_file(source), _upload_ext(filename))
+    target = get_upload_path(saved_filename)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = source.with_name(f".adopt.{secrets.token_hex(8)}.tmp")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, target)
+    return saved_filename
+
+def get_upload_path(filename: str) -> Path:
+    return get_data_dir() / "uploads" / filename
@@ -0,0 +1,129 @@
+import contextvars
+import os
+import queue
+import sqlite3
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Callable, Optional, TypeVar
+from .db import connect
+
+T = TypeVar("T")
+
+# How long a caller waits for its write to be applied before giving up
+WRITE_TIMEOUT = float(os.getenv("CLAIMS_DB_WRITE_TIMEOUT", "30"))
+
+logger = logging.getLogger("claims_tracker")
+
+class WriteQueue:
+    """Serializes all writes through one dedicated thread and connection.
+
+    Each job is a callable taking the writer's connection. It runs inside its
+    own `BEGIN IMMEDIATE` transaction, which is committed when the callable
+    returns and rolled back if it raises; the result or exception is handed
+    back to the submitting thread through a Future.
+    """
+
+    def __init__(self):
+        self._jobs: Optional[queue.Queue] = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                # A fresh queue per thread: a writer that failed or was closed only drains its own
+                self._jobs = queue.Queue()
+                self._thread = threading.Thread(target=self._run, args=(self._jobs,), name="claims-db-writer", daemon=True)
+                self._thread.start()
+            # The job runs in the submitter's contextvars, so its SQL is charged to that request
+            self._jobs.put((fn, future, contextvars.copy_context()))
+        return future
+
+    def run(self, fn: Callable[[sqlite3.Connection], T], timeout: Optional[float] = WRITE_TIMEOUT) -> T:
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Nested write submitted from the writer thread")
+        return self.submit(fn).result(timeout=timeout)
+
+    def _run(self, jobs: queue.Queue):
+        conn = None
+        try:
+            conn = connect()
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+                fn, future, ctx = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = ctx.run(self._apply, conn, fn)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            logger.exception("DB writer thread crashed")
+            self._fail(jobs, e)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _fail(self, jobs: queue.Queue, error: Exception):
+        # Waiting jobs get the error now instead of a WRITE_TIMEOUT later; the next
+        # submit starts a new thread, which tries to connect again
+        with self._lock:
+            if self._jobs is jobs:
+                self._jobs = None
+                self._thread = None
+        while True:
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None and job[1].set_running_or_notify_cancel():
+                job[1].set_exception(error)
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, fn: Callable[[sqlite3.Connection], T]) -> T:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = fn(conn)
+            if conn.in_transaction:
+                conn.commit()
+            return result
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def close(self):
+        with self._lock:
+            thread, jobs = self._thread, self._jobs
+            self._thread = self._jobs = None
+            if jobs is not None:
+                jobs.put(None)
+        if thread is not None:
+            thread.join()
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> WriteQueue:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = WriteQueue()
+    return _writer
+
+def close_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+def run_write(fn: Callable[[sqlite3.Connection], T]) -> T:
+    return get_writer().run(fn)
@@ -1,14 +1,18 @@
-from fastapi import FastAPI, Request, Form, File, UploadFile, HTTPException, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse, PlainTextResponse
+from fastapi import FastAPI, Request, Response, Form, File, UploadFile, HTTPException, Depends
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Optional
+from markupsafe import Markup, escape
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlencode
 
-from claims.db import init_db
-from claims.models import ClaimType, Severity, Status, ClaimCreate, ClaimUpdate, ClaimStatusUpdate, ResolutionOutcome
-from claims import repo, storage, export
+from claims.db import init_db, close_pool
+from claims.writer import close_writer
+from claims.cache import claim_cache
+from claims.models import ClaimType, Severity, Status, ClaimCounts, ClaimCreate, ClaimPage, ClaimUpdate, ClaimStatusUpdate, ClaimBatchStatusUpdate, BatchStatusResult, ClaimTrends, ImportReport, ResolutionOutcome, SearchHit, SlaState, SlaSummary
+from claims import aio, analytics, applog, derivatives, fragments, httpcache, importer, metrics, repo, storage, export
 import logging
 import os
 import secrets
@@ -21,10 +25,8 @@ logger.setLevel(logging.INFO)
 logger.propagate = False
 
 if not logger.handlers:
-    handler = logging.FileHandler(storage.get_data_dir() / "app.log")
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # JSON lines, written by a background thread (CLAIMS_LOG / CLAIMS_LOG_FORMAT)
+    applog.configure(logger, storage.get_data_dir() / "app.log")
 
 # Basic Auth Logic
 security = HTTPBasic()
@@ -58,32 +60,40 @@ else:
     logger.info("Basic Auth disabled")
 
 app = FastAPI(title="Micro-Claims Tracker", dependencies=app_dependencies)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
-app.mount("/uploads", StaticFiles(directory=storage.get_data_dir() / "uploads"), name="uploads")
+# Photo and derivative names are content hashes, so they can be cached forever
+app.mount("/uploads", httpcache.ImmutableStaticFiles(directory=storage.get_data_dir() / "uploads"), name="uploads")
+app.mount("/derivatives", httpcache.ImmutableStaticFiles(directory=derivatives.get_derivatives_dir()), name="derivatives")
 
 # Templates
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["sla_state"] = repo.sla_state
+TEMPLATE_VERSION = httpcache.directory_version("templates")
+# Compiled once and held, so dashboard renders skip the loader's lookup and mtime checks;
+# like TEMPLATE_VERSION, template edits need a restart
+INDEX_TEMPLATE = templates.get_template("index.html")
+CLAIM_ROW_TEMPLATE = templates.get_template("claim_row.html")
 
 @app.on_event("startup")
 def startup_event():
     init_db()
 
-@app.get("/", response_class=HTMLResponse)
-async def index(
-    request: Request,
-    status: Optional[Status] = None,
-    severity: Optional[Severity] = None,
-    type: Optional[ClaimType] = None,
-    search: Optional[str] = None,
-    range_preset: Optional[str] = None,
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None
-):
+@app.on_event("shutdown")
+def shutdown_event():
+    aio.shutdown_executor()
+    derivatives.shutdown_pool()
+    close_writer()
+    close_pool()
+    applog.shutdown()
+
+def _resolve_range(range_preset: Optional[str], date_from: Optional[str], date_to: Optional[str]):
     d_from = None
     d_to = None
-    
+
     if range_preset == "week":
         today = datetime.now()
         start_of_week = today - timedelta(days=today.weekday())
@@ -93,39 +103,230 @@ async def index(
             d_from = datetime.fromisoformat(date_from)
         except ValueError:
             pass
-            
+
     if date_to:
         try:
             d_to = datetime.fromisoformat(date_to).replace(hour=23, minute=59, second=59)
         except ValueError:
             pass
-        
-    claims = repo.list_claims(
-        status=status,
-        severity=severity,
-        claim_type=type,
-        search=search,
-        date_from=d_from,
-        date_to=d_to
+
+    return d_from, d_to
+
+def _page_url(request: Request, **cursor) -> str:
+    # Keep the active filters, swap the page cursor
+    params = {k: v for k, v in request.query_params.items() if k not in ("after", "before") and v}
+    params.update(cursor)
+    return f"{request.url.path}?{urlencode(params)}"
+
+def highlight_snippet(snippet: str) -> Markup:
+    # Escape the stored text, then turn the FTS match markers into <mark> tags
+    html = str(escape(snippet))
+    return Markup(html.replace(repo.SNIPPET_START, "<mark>").replace(repo.SNIPPET_END, "</mark>"))
+
+async def _list_validator(request: Request, range_preset: Optional[str], sla_badges: bool = False) -> Tuple[str, int]:
+    # The change counter moves on every claim and SLA policy write; the query string
+    # covers the filters. ETag only: no timestamp column moves on every change, so a
+    # Last-Modified could answer If-Modified-Since with stale 304s. Also returns the SLA
+    # policy version
+    version, sla_version = await aio.data_version()
+    etag = httpcache.make_etag(
+        TEMPLATE_VERSION,
+        version,
+        sorted(request.query_params.multi_items()),
+        date.today() if range_preset == "week" else "",  # "This week" moves with the calendar
+        # Claims become at risk / breached as time passes, without any write
+        datetime.now().strftime("%Y-%m-%d %H:%M") if sla_badges or request.query_params.get("sla") else ""
     )
-    
-    return templates.TemplateResponse("index.html", {
+    return etag, sla_version
+
+async def _rendered_photos(claims: Iterable) -> Set[str]:
+    paths = {claim.photo_path for claim in claims if claim.photo_path}
+    return await aio.rendered_photos(paths) if paths else set()
+
+def _claim_rows(claims, snippets, now: datetime, sla_version: int, rendered: Set[str]) -> List[Markup]:
+    # A row's markup changes with the claim version, its due date and SLA badge (and the
+    # policy behind them), its thumbnail (the derivative is rendered after the upload)
+    # and the search snippet
+    rows = []
+    for claim in claims:
+        sla = repo.sla_state(claim, now)
+        thumb_url = derivatives.photo_url(claim.photo_path, "thumb", claim.photo_path in rendered) if claim.photo_path else None
+        snippet = snippets.get(claim.id)
+        key = (claim.id, claim.updated_at, claim.due_at, sla_version, sla, thumb_url, snippet)
+        html = fragments.row_cache.get(key)
+        if html is None:
+            html = CLAIM_ROW_TEMPLATE.render(claim=claim, sla=sla, thumb_url=thumb_url, snippet=snippet, sla_states=SlaState)
+            fragments.row_cache.put(key, html)
+        rows.append(Markup(html))
+    return rows
+
+async def _load_page(status, severity, type, search, range_preset, date_from, date_to, limit, after, before, sla=None):
+    d_from, d_to = _resolve_range(range_preset, date_from, date_to)
+    try:
+        page = await aio.list_claims_page(
+            status=status,
+            severity=severity,
+            claim_type=type,
+            search=search,
+            date_from=d_from,
+            date_to=d_to,
+            limit=limit,
+            after=after,
+            before=before,
+            sla=sla
+        )
+    except repo.InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid page cursor")
+    page.snippets = {claim_id: highlight_snippet(s) for claim_id, s in page.snippets.items()}
+    return page
+
+@app.get("/", response_class=HTMLResponse)
+async def index(
+    request: Request,
+    status: Optional[Status] = None,
+    severity: Optional[Severity] = None,
+    type: Optional[ClaimType] = None,
+    search: Optional[str] = None,
+    range_preset: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort: Optional[str] = None,
+    sla: Optional[SlaState] = None,
+    limit: int = repo.DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    before: Optional[str] = None
+):
+    etag, sla_version = await _list_validator(request, range_preset, sla_badges=True)
+    if httpcache.is_not_modified(request, etag):
+        return httpcache.not_modified(etag)
+
+    headers = httpcache.cache_headers(etag)
+    # The validator covers the filters, the change counter and the SLA minute. It is read
+    # before the queries, so a concurrent write can only make the entry newer than its key
+    page_key = etag
+    html = fragments.page_cache.get(page_key)
+    if html is not None:
+        return HTMLResponse(html, headers=headers)
+
+    if search and sort == "relevance":
+        # Ranked search: best matches only, no paging
+        d_from, d_to = _resolve_range(range_preset, date_from, date_to)
+        hits = await aio.search_claims(search, limit, status, severity, type, d_from, d_to, sla)
+        page = ClaimPage(claims=[hit.claim for hit in hits])
+        page.snippets = {hit.claim.id: highlight_snippet(hit.snippet) for hit in hits}
+    else:
+        page = await _load_page(status, severity, type, search, range_preset, date_from, date_to, limit, after, before, sla)
+
+    # Stats panel covers the selected date range (all claims when unset)
+    stats = await aio.claim_counts(*_resolve_range(range_preset, date_from, date_to))
+    rendered = await _rendered_photos(page.claims)
+
+    html = INDEX_TEMPLATE.render({
         "request": request,
-        "claims": claims,
+        "rows": _claim_rows(page.claims, page.snippets, datetime.now(), sla_version, rendered),
+        "stats": stats,
+        "next_url": _page_url(request, after=page.next_cursor) if page.next_cursor else None,
+        "prev_url": _page_url(request, before=page.prev_cursor) if page.prev_cursor else None,
         "statuses": Status,
         "severities": Severity,
         "types": ClaimType,
+        "outcomes": ResolutionOutcome,
+        "sla_states": SlaState,
         "filters": {
             "status": status,
             "severity": severity,
             "type": type,
             "search": search,
+            "sort": sort,
+            "sla": sla,
             "range_preset": range_preset,
             "date_from": date_from,
             "date_to": date_to
         },
         "data_dir": storage.get_data_dir()
     })
+    fragments.page_cache.put(page_key, html)
+    return HTMLResponse(html, headers=headers)
+
+@app.get("/api/claims", response_model=ClaimPage)
+async def list_claims_json(
+    request: Request,
+    response: Response,
+    status: Optional[Status] = None,
+    severity: Optional[Severity] = None,
+    type: Optional[ClaimType] = None,
+    search: Optional[str] = None,
+    range_preset: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sla: Optional[SlaState] = None,
+    limit: int = repo.DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    before: Optional[str] = None
+):
+    etag, _ = await _list_validator(request, range_preset)
+    if httpcache.is_not_modified(request, etag):
+        return httpcache.not_modified(etag)
+    response.headers.update(httpcache.cache_headers(etag))
+    return await _load_page(status, severity, type, search, range_preset, date_from, date_to, limit, after, before, sla)
+
+@app.get("/api/stats", response_model=ClaimCounts)
+async def stats_json(
+    request: Request,
+    response: Response,
+    range_preset: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+):
+    etag, _ = await _list_validator(request, range_preset)
+    if httpcache.is_not_modified(request, etag):
+        return httpcache.not_modified(etag)
+    response.headers.update(httpcache.cache_headers(etag))
+    return await aio.claim_counts(*_resolve_range(range_preset, date_from, date_to))
+
+@app.get("/api/sla", response_model=SlaSummary)
+async def sla_json():
+    return await aio.sla_summary()
+
+@app.get("/api/analytics", response_model=ClaimTrends)
+async def analytics_json(days: int = analytics.DEFAULT_DAYS, window: int = analytics.DEFAULT_WINDOW):
+    # Daily volume by type, rolling resolution rate and resolution-time percentiles
+    # for the last `days` days; recomputed only after a claim write
+    if not analytics.available():
+        raise HTTPException(status_code=503, detail="Analytics require numpy")
+    return await aio.claim_trends(days, window)
+
+@app.get("/api/cache")
+async def cache_stats():
+    return claim_cache.stats()
+
+@app.get("/api/cache/fragments")
+async def fragment_cache_stats():
+    return {"pages": fragments.page_cache.stats(), "rows": fragments.row_cache.stats()}
+
+@app.get("/metrics")
+async def metrics_text():
+    # Prometheus text format; counters are per process (one series set per uvicorn worker)
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/search", response_model=List[SearchHit])
+async def search_json(q: str, limit: int = repo.DEFAULT_PAGE_SIZE):
+    hits = await aio.search_claims(q, limit)
+    for hit in hits:
+        hit.snippet = highlight_snippet(hit.snippet)
+    return hits
+
+async def _save_photo(photo: UploadFile, claim_uuid: str) -> str:
+    # Enforce 5MB limit while streaming; nothing is buffered whole in memory
+    try:
+        photo_path = await aio.save_upload(photo)
+    except storage.UploadTooLargeError:
+        logger.warning(f"Upload too large for claim {claim_uuid}")
+        raise HTTPException(status_code=413, detail="File too large (max 5MB)")
+    # Thumbnail + web size, rendered on the process pool after the response; pages
+    # show the original until then. Off the loop: schedule() stats files and may start the pool.
+    await aio.run_blocking(derivatives.schedule, photo_path)
+    return photo_path
 
 @app.get("/claims/new", response_class=HTMLResponse)
 async def new_claim(request: Request):
@@ -144,14 +345,6 @@ async def create_claim(
     description: str = Form(...),
     photo: Optional[UploadFile] = File(None)
 ):
-    if photo and photo.filename:
-        # Enforce 5MB limit
-        content = await photo.read()
-        if len(content) > 5 * 1024 * 1024:
-            logger.warning(f"Upload too large for claim {claim_uuid}")
-            raise HTTPException(status_code=413, detail="File too large (max 5MB)")
-        await photo.seek(0)
-
     try:
         claim_data = ClaimCreate(
             claim_uuid=claim_uuid,
@@ -162,34 +355,64 @@ async def create_claim(
         
         photo_path = None
         if photo and photo.filename:
-            photo_path = storage.save_upload(photo, claim_uuid)
+            photo_path = await _save_photo(photo, claim_uuid)
             
-        claim_id = repo.create_claim(claim_data, photo_path)
-        logger.info(f"Claim created: {claim_id} (UUID: {claim_uuid})")
+        claim_id = await aio.create_claim(claim_data, photo_path)
+        logger.info(f"Claim created: {claim_id} (UUID: {claim_uuid})", extra={"claim_id": claim_id, "claim_uuid": claim_uuid})
         return RedirectResponse(url=f"/claims/{claim_id}", status_code=303)
         
-    except repo.DuplicateClaimError:
-        logger.warning(f"Duplicate claim attempt: {claim_uuid}")
-        # Safe "already captured" behavior
-        existing = repo.get_claim_by_uuid(claim_uuid)
-        if existing:
-            return RedirectResponse(url=f"/claims/{existing.id}", status_code=303)
-        raise HTTPException(status_code=500, detail="Duplicate error but claim not found")
+    except repo.DuplicateClaimError as e:
+        logger.warning(f"Duplicate claim attempt: {claim_uuid}", extra={"claim_uuid": claim_uuid})
+        # Safe "already captured" behavior; the writer already loaded the existing claim
+        return RedirectResponse(url=f"/claims/{e.existing.id}", status_code=303)
+
+@app.post("/api/claims/import", response_model=ImportReport)
+async def import_claims(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None)
+):
+    # The multipart body is already spooled to a temp file; parse and insert it off the event loop
+    metrics.UPLOADS.inc("import", "received")
+    metrics.UPLOAD_BYTES.inc("import", amount=file.size or 0)
+    try:
+        fmt = format or importer.detect_format(file.filename, file.content_type)
+        report = await aio.run_blocking(importer.import_file, file.file, fmt)
+    except importer.ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(
+        f"Bulk import {file.filename}: {report.inserted} inserted, {report.duplicates} duplicates, "
+        f"{report.invalid} invalid ({report.rows_per_second:.0f} rows/s)"
+    )
+    return report
 
 @app.get("/claims/{claim_id}", response_class=HTMLResponse)
 async def claim_detail(request: Request, claim_id: int):
-    claim = repo.get_claim(claim_id)
+    # Read first: it drops cached claims dated under an older SLA policy, even one
+    # changed from another process (`claims.cli sla --set`)
+    await aio.data_version()
+    claim = await aio.get_claim(claim_id)
     if not claim:
         raise HTTPException(status_code=404, detail="Claim not found")
-        
+
+    # updated_at moves on every write, due_at with the SLA policy; the photo URL changes
+    # when a derivative appears. No Last-Modified: due_at changes leave updated_at alone
+    photo = ""
+    if claim.photo_path:
+        photo = derivatives.photo_url(claim.photo_path, "web", bool(await _rendered_photos([claim])))
+    due = claim.due_at.isoformat() if claim.due_at else ""
+    etag = httpcache.make_etag(TEMPLATE_VERSION, claim.id, claim.updated_at.isoformat(), due, photo)
+    if httpcache.is_not_modified(request, etag):
+        return httpcache.not_modified(etag)
+
     return templates.TemplateResponse("claim_detail.html", {
         "request": request,
         "claim": claim,
+        "photo_url": photo,
         "severities": Severity,
         "statuses": Status,
         "outcomes": ResolutionOutcome,
         "data_dir": storage.get_data_dir()
-    })
+    }, headers=httpcache.cache_headers(etag))
 
 @app.post("/claims/{claim_id}/update")
 async def update_claim(
@@ -198,27 +421,21 @@ async def update_claim(
     severity: Optional[Severity] = Form(None),
     photo: Optional[UploadFile] = File(None)
 ):
+    # Photo is written first so an oversized upload rejects the whole update
+    claim = None
+    new_photo_path = None
     if photo and photo.filename:
-        # Enforce 5MB limit
-        content = await photo.read()
-        if len(content) > 5 * 1024 * 1024:
-            raise HTTPException(status_code=413, detail="File too large (max 5MB)")
-        await photo.seek(0)
+        claim = await aio.get_claim(claim_id)
+        if claim:
+            new_photo_path = await _save_photo(photo, claim.claim_uuid)
 
     if description is not None or severity is not None:
-        repo.update_claim(claim_id, ClaimUpdate(description=description, severity=severity))
+        await aio.update_claim(claim_id, ClaimUpdate(description=description, severity=severity))
         
-    if photo and photo.filename:
-        claim = repo.get_claim(claim_id)
-        if claim:
-            new_photo_path = storage.save_upload(photo, claim.claim_uuid)
-            
-            # Delete old photo if it exists and is different (e.g. different extension)
-            if claim.photo_path and claim.photo_path != new_photo_path:
-                storage.delete_upload(claim.photo_path)
-                
-            repo.update_claim_photo(claim_id, new_photo_path)
-            logger.info(f"Claim {claim_id} photo updated")
+    # The old photo stays in the blob store (other claims may share it) until `gc-blobs`
+    if new_photo_path and new_photo_path != claim.photo_path:
+        await aio.update_claim_photo(claim_id, new_photo_path)
+        logger.info(f"Claim {claim_id} photo updated")
             
     return RedirectResponse(url=f"/claims/{claim_id}", status_code=303)
 
@@ -229,14 +446,45 @@ async def update_status(
     resolved_note: Optional[str] = Form(None),
     resolution_outcome: Optional[ResolutionOutcome] = Form(None)
 ):
-    repo.update_claim_status(claim_id, ClaimStatusUpdate(
+    await aio.update_claim_status(claim_id, ClaimStatusUpdate(
         status=status,
         resolved_note=resolved_note,
         resolution_outcome=resolution_outcome
     ))
-    logger.info(f"Claim {claim_id} status updated to {status.value}")
+    logger.info(f"Claim {claim_id} status updated to {status.value}", extra={"claim_id": claim_id, "status": status.value})
     return RedirectResponse(url=f"/claims/{claim_id}", status_code=303)
 
+async def _batch_status(claim_ids: List[int], update: ClaimStatusUpdate) -> List[BatchStatusResult]:
+    try:
+        results = await aio.update_claims_status(claim_ids, update)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    updated = sum(1 for r in results if r.updated)
+    logger.info(f"Batch status update to {update.status.value}: {updated}/{len(results)} claims")
+    return results
+
+@app.post("/api/claims/status", response_model=List[BatchStatusResult])
+async def batch_status_json(batch: ClaimBatchStatusUpdate):
+    return await _batch_status(batch.claim_ids, batch)
+
+@app.post("/claims/batch-status")
+async def batch_status(
+    claim_ids: List[int] = Form(...),
+    status: Status = Form(...),
+    resolved_note: Optional[str] = Form(None),
+    resolution_outcome: Optional[ResolutionOutcome] = Form(None),
+    next: str = Form("/")
+):
+    await _batch_status(claim_ids, ClaimStatusUpdate(
+        status=status,
+        resolved_note=resolved_note or None,
+        resolution_outcome=resolution_outcome
+    ))
+    # Back to the same filtered dashboard; only local paths, never an open redirect
+    if not next.startswith("/") or next.startswith("//"):
+        next = "/"
+    return RedirectResponse(url=next, status_code=303)
+
 @app.post("/export")
 async def export_claims(
     date_from: str = Form(...),
@@ -245,18 +493,19 @@ async def export_claims(
     try:
         d_from = datetime.fromisoformat(date_from)
         d_to = datetime.fromisoformat(date_to).replace(hour=23, minute=59, second=59)
-        
-        claims = repo.list_claims(date_from=d_from, date_to=d_to)
-        digest = export.generate_digest(claims, d_from, d_to)
-        
-        filename = f"claims_digest_{d_from.date()}_to_{d_to.date()}.md"
-        logger.info(f"Export generated for range {d_from.date()} to {d_to.date()}")
-        
-        return PlainTextResponse(
-            digest,
-            media_type="text/markdown",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-        )
     except ValueError:
         logger.error("Export failed: Invalid date format")
         raise HTTPException(status_code=400, detail="Invalid date format")
+
+    filename = f"claims_digest_{d_from.date()}_to_{d_to.date()}.md"
+    logger.info(
+        f"Export generated for range {d_from.date()} to {d_to.date()}",
+        extra={"date_from": d_from.date().isoformat(), "date_to": d_to.date().isoformat()}
+    )
+
+    # Sync generator: Starlette iterates it in the threadpool, chunk by chunk
+    return StreamingResponse(
+        export.stream_digest(d_from, d_to),
+        media_type="text/markdown",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
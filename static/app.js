@@ -79,3 +79,16 @@ function showCopyModal(text) {
     
     textarea.select();
 }
+
+function updateBatchBar() {
+    const selected = document.querySelectorAll('.claim-select:checked').length;
+    const count = document.getElementById('batchCount');
+    const submit = document.getElementById('batchSubmit');
+    if (count) count.innerText = selected + ' selected';
+    if (submit) submit.disabled = selected === 0;
+}
+
+function toggleSelectAll(box) {
+    document.querySelectorAll('.claim-select').forEach(cb => { cb.checked = box.checked; });
+    updateBatchBar();
+}
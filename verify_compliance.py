@@ -1,9 +1,11 @@
 import urllib.request
 import urllib.parse
 import time
+import json
 import sys
 import os
 import sqlite3
+import uuid
 from datetime import datetime
 
 BASE_URL = "http://127.0.0.1:8000"
@@ -45,6 +47,28 @@ def test_ui_routes():
     except Exception as e:
         log(f"FAIL: UI Routes: {e}")
 
+def create_claim(description, severity="Low", claim_uuid=None):
+    # POST /claims as the form does; returns the new claim's id
+    boundary = '----ComplianceBoundary'
+    fields = {
+        'claim_uuid': claim_uuid or str(uuid.uuid4()),
+        'type': 'Other',
+        'severity': severity,
+        'description': description
+    }
+    data = []
+    for name, value in fields.items():
+        data += [f'--{boundary}', f'Content-Disposition: form-data; name="{name}"', '', value]
+    data += [f'--{boundary}--', '']
+    req = urllib.request.Request(f"{BASE_URL}/claims", data='\r\n'.join(data).encode('utf-8'))
+    req.add_header('Content-Type', f'multipart/form-data; boundary={boundary}')
+    resp = urllib.request.urlopen(req)
+    return int(resp.geturl().split('/')[-1])
+
+def set_status(claim_id, status):
+    data = urllib.parse.urlencode({'status': status}).encode()
+    urllib.request.urlopen(f"{BASE_URL}/claims/{claim_id}/status", data=data)
+
 def test_export_handler():
     log("--- 2. Export Handler Proof ---")
     # Invalid date
@@ -111,6 +135,136 @@ def test_filtering_ordering():
     except Exception as e:
         log(f"FAIL: Filtering: {e}")
 
+def test_relevance_filters():
+    log("--- 3b. Relevance Sort Filters Proof ---")
+    try:
+        # A word no other claim contains, so only these three match
+        word = f"pallet{uuid.uuid4().hex[:8]}"
+        wanted = create_claim(f"Crushed {word} at dock", "High")
+        low = create_claim(f"Torn {word} wrap", "Low")
+        resolved = create_claim(f"Broken {word} slats", "High")
+        set_status(resolved, "Resolved")
+
+        for sort in ("", "relevance"):
+            query = urllib.parse.urlencode({'search': word, 'status': 'Open', 'severity': 'High', 'sort': sort})
+            content = urllib.request.urlopen(f"{BASE_URL}/?{query}").read().decode()
+            shown = [claim_id for claim_id in (wanted, low, resolved) if f'/claims/{claim_id}"' in content]
+            label = sort or "newest"
+            if shown == [wanted]:
+                log(f"PASS: Search sorted by {label} honours status and severity filters")
+            else:
+                log(f"FAIL: Search sorted by {label} shows claims {shown}, expected [{wanted}]")
+    except Exception as e:
+        log(f"FAIL: Relevance filters: {e}")
+
+def conditional_get(path, etag):
+    # Status of a GET sent with If-None-Match, and the ETag it answered with
+    req = urllib.request.Request(f"{BASE_URL}{path}", headers={'If-None-Match': etag})
+    try:
+        resp = urllib.request.urlopen(req)
+        return resp.status, resp.headers.get('ETag')
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get('ETag')
+
+def test_conditional_get():
+    log("--- 3c. Conditional GET Proof ---")
+    try:
+        for path in ("/", "/api/claims", "/api/stats"):
+            etag = urllib.request.urlopen(f"{BASE_URL}{path}").headers.get('ETag')
+            if not etag:
+                log(f"FAIL: {path} sent no ETag")
+                continue
+            status, _ = conditional_get(path, etag)
+            if status == 304:
+                log(f"PASS: {path} answers 304 while the data version is unchanged")
+            else:
+                log(f"FAIL: {path} answered {status} to its own ETag")
+
+            # Any write moves the data version, so the old ETag must no longer match
+            create_claim(f"Conditional GET check {uuid.uuid4().hex[:8]}")
+            status, new_etag = conditional_get(path, etag)
+            if status == 200 and new_etag != etag:
+                log(f"PASS: {path} answers 200 with a new ETag after a write")
+            else:
+                log(f"FAIL: {path} answered {status} ({new_etag}) after a write")
+    except Exception as e:
+        log(f"FAIL: Conditional GET: {e}")
+
+def test_import_report():
+    log("--- 3d. Bulk Import Report Proof ---")
+    try:
+        existing_uuid = str(uuid.uuid4())
+        create_claim("Already captured before the import", claim_uuid=existing_uuid)
+        csv_body = "\r\n".join([
+            "claim_uuid,type,severity,description",
+            f"{uuid.uuid4()},Damage,High,Imported crushed carton",
+            f"{uuid.uuid4()},Damage,Huge,Severity that does not exist",
+            f"{existing_uuid},Other,Low,Same uuid as a stored claim",
+            ""
+        ])
+        boundary = '----ComplianceBoundary'
+        data = '\r\n'.join([
+            f'--{boundary}',
+            'Content-Disposition: form-data; name="file"; filename="claims.csv"',
+            'Content-Type: text/csv',
+            '',
+            csv_body,
+            f'--{boundary}--',
+            ''
+        ]).encode('utf-8')
+        req = urllib.request.Request(f"{BASE_URL}/api/claims/import", data=data)
+        req.add_header('Content-Type', f'multipart/form-data; boundary={boundary}')
+        report = json.loads(urllib.request.urlopen(req).read())
+
+        counts = (report['received'], report['inserted'], report['duplicates'], report['invalid'])
+        if counts == (3, 1, 1, 1):
+            log("PASS: Import report counts 1 inserted, 1 duplicate, 1 invalid")
+        else:
+            log(f"FAIL: Import report counts (received, inserted, duplicates, invalid) = {counts}")
+        # Header is line 1, so the bad severity is on line 3
+        if [e['line'] for e in report['errors']] == [3]:
+            log("PASS: Import report names the invalid row's line")
+        else:
+            log(f"FAIL: Import report errors: {report['errors']}")
+    except Exception as e:
+        log(f"FAIL: Import report: {e}")
+
+def test_batch_status():
+    log("--- 3e. Batch Status Proof ---")
+    try:
+        first = create_claim("Batch status check one")
+        second = create_claim("Batch status check two")
+        # Ids only grow, so one well past the newest claim does not exist
+        missing = second + 1_000_000
+        body = json.dumps({'claim_ids': [first, missing, second], 'status': 'In Review'}).encode()
+        req = urllib.request.Request(f"{BASE_URL}/api/claims/status", data=body)
+        req.add_header('Content-Type', 'application/json')
+        results = json.loads(urllib.request.urlopen(req).read())
+
+        by_id = {r['claim_id']: r for r in results}
+        if [r['claim_id'] for r in results] == [first, missing, second]:
+            log("PASS: Batch status returns one result per id, in request order")
+        else:
+            log(f"FAIL: Batch status results for {[r['claim_id'] for r in results]}")
+        if all(by_id[i]['updated'] and by_id[i]['claim']['status'] == 'In Review' for i in (first, second)):
+            log("PASS: Batch status updates the existing claims")
+        else:
+            log(f"FAIL: Batch status left existing claims: {results}")
+        if not by_id[missing]['updated'] and by_id[missing]['error'] == 'Claim not found':
+            log("PASS: Batch status reports the missing id as not found")
+        else:
+            log(f"FAIL: Batch status result for the missing id: {by_id[missing]}")
+
+        # The dashboard form takes the same path and redirects back
+        data = urllib.parse.urlencode([('claim_ids', first), ('claim_ids', missing), ('status', 'Resolved'), ('next', '/?status=Resolved')]).encode()
+        resp = urllib.request.urlopen(f"{BASE_URL}/claims/batch-status", data=data)
+        if resp.geturl().endswith('/?status=Resolved') and f'/claims/{first}"' in resp.read().decode():
+            log("PASS: Batch status form resolves the claim and skips the missing id")
+        else:
+            log(f"FAIL: Batch status form ended at {resp.geturl()}")
+    except Exception as e:
+        log(f"FAIL: Batch status: {e}")
+
 def get_data_dir():
     if os.name == 'nt':
         base_dir = os.path.join(os.environ['APPDATA'], ".claims_tracker")
@@ -128,13 +282,26 @@ def test_logging_dedupe():
         import main
         import logging
         
+        from claims import applog
+
         logger = logging.getLogger("claims_tracker")
+        # app.log is written either directly (CLAIMS_LOG=direct) or by the queue's writer thread
         handlers = [h for h in logger.handlers if isinstance(h, logging.FileHandler) and "app.log" in h.baseFilename]
-        
-        if len(handlers) == 1:
-            log("PASS: Logger has exactly 1 FileHandler")
+        queued = [h for h in logger.handlers if isinstance(h, applog.BufferedHandler)]
+        if queued and applog.log_path() is not None and applog.log_path().name == "app.log":
+            handlers += queued
+
+        if len(handlers) == 1 and len(logger.handlers) == 1:
+            log("PASS: Logger has exactly 1 app.log handler")
+        else:
+            log(f"FAIL: Logger has {len(logger.handlers)} handlers, {len(handlers)} writing app.log")
+
+        import importlib
+        importlib.reload(main)  # what uvicorn --reload does; must not add a second handler
+        if len(logger.handlers) == 1:
+            log("PASS: Re-import keeps a single handler")
         else:
-            log(f"FAIL: Logger has {len(handlers)} FileHandlers")
+            log(f"FAIL: Re-import left {len(logger.handlers)} handlers")
             
         # Check propagate
         if not logger.propagate:
@@ -204,6 +371,10 @@ if __name__ == "__main__":
     test_ui_routes()
     test_export_handler()
     test_filtering_ordering()
+    test_relevance_filters()
+    test_conditional_get()
+    test_import_report()
+    test_batch_status()
     test_determinism()
     check_pycache()
     test_logging_dedupe()
@@ -0,0 +1,253 @@
+import hashlib
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROWS = int(os.getenv("VERIFY_MIGRATION_ROWS", "200000"))
+BATCH_SIZE = 5000
+# A batch is one short write transaction; anything near the busy timeout means it is not
+MAX_BATCH_SECONDS = 1.0
+
+def log(msg):
+    print(f"[TEST] {msg}")
+
+def create_v1_database(db_path):
+    # A database as the first release left it: base schema only, user_version 1
+    from claims.db import create_base_schema
+
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    conn = sqlite3.connect(db_path)
+    create_base_schema(conn.cursor())
+    conn.execute("PRAGMA user_version = 1")
+
+    def rows():
+        for i in range(ROWS):
+            created = (start + timedelta(minutes=7 * i)).isoformat(" ")
+            resolved = (start + timedelta(minutes=7 * i, hours=rng.randint(1, 200))).isoformat(" ") if i % 3 == 0 else None
+            # Shared photos across batches exercise the refcount merge
+            photo = f"ab/{rng.randint(0, ROWS // 10):06x}.jpg" if i % 4 == 0 else None
+            word = "zephyr" if i % 97 == 0 else "pallet"
+            yield (
+                str(uuid.UUID(int=rng.getrandbits(128))), created, resolved or created, resolved,
+                rng.choice(["Damage", "Shortage", "Wrong Item", "Missing", "Other"]),
+                rng.choice(["Low", "Med", "High"]),
+                "Resolved" if resolved else rng.choice(["Open", "In Review"]),
+                f"{word} claim {i}", "Checked" if resolved else None,
+                "Credit" if resolved else None, photo,
+            )
+
+    conn.executemany("""
+        INSERT INTO claims (
+            claim_uuid, created_at, updated_at, resolved_at, type, severity, status,
+            description, resolved_note, resolution_outcome, photo_path
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows())
+    conn.commit()
+    conn.close()
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def test_dry_run(db_path):
+    log("--- 1. Dry Run Proof ---")
+    from claims import migrations
+    from claims.db import MIGRATIONS
+
+    try:
+        before = file_digest(db_path)
+        reports = migrations.dry_run(db_path, MIGRATIONS, BATCH_SIZE)
+        if file_digest(db_path) == before:
+            log("PASS: Dry run leaves the database file unchanged")
+        else:
+            log("FAIL: Dry run modified the database")
+
+        versions = [r["version"] for r in reports]
+        changes = {b["name"]: b["changes"] for r in reports for b in r["backfills"]}
+        if versions == [m.version for m in MIGRATIONS[1:]] and changes.get("claims_fts") == ROWS and changes.get("claims_due_at") == ROWS:
+            log(f"PASS: Dry run reports versions {versions} with every backfill")
+        else:
+            log(f"FAIL: Dry run report: versions {versions}, changes {changes}")
+        for report in reports:
+            for stats in report["backfills"]:
+                log(f"  v{report['version']} {stats['name']}: {stats['batches']} batches, "
+                    f"{stats['seconds']:.2f}s, longest {stats['max_batch_seconds'] * 1000:.0f} ms")
+        leftovers = [p.name for p in Path(db_path).parent.iterdir() if p.name.startswith(".migrate-dry-run-")]
+        if not leftovers:
+            log("PASS: Dry run copy removed")
+        else:
+            log(f"FAIL: Dry run left {leftovers}")
+    except Exception as e:
+        log(f"FAIL: Dry run: {e}")
+
+class Interrupted(Exception):
+    pass
+
+def test_interrupted_run(db_path):
+    log("--- 2. Interrupt and Resume Proof ---")
+    from claims.db import init_db
+
+    batches = []
+
+    def stop_after_three(name, last_id, high_id):
+        batches.append(last_id)
+        if len(batches) == 3:
+            raise Interrupted()
+
+    try:
+        init_db(batch_size=BATCH_SIZE, progress=stop_after_three)
+        log("FAIL: Migration was not interrupted")
+        return
+    except Interrupted:
+        pass
+
+    conn = sqlite3.connect(db_path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    state = conn.execute("SELECT last_id, finished_at FROM schema_backfills WHERE name = 'claims_fts'").fetchone()
+    indexed = conn.execute("SELECT count(*) FROM claims_fts_docsize").fetchone()[0]
+    conn.close()
+    if version == 2 and state == (batches[-1], None) and indexed == 3 * BATCH_SIZE:
+        log(f"PASS: Interrupted at version 2 with 3 committed batches (last id {state[0]})")
+    else:
+        log(f"FAIL: After interrupt: version {version}, state {state}, {indexed} rows indexed")
+
+def test_resume_with_concurrent_writer(db_path):
+    log("--- 3. Resume With Concurrent Writes Proof ---")
+    from claims.db import init_db, SCHEMA_VERSION
+
+    stop = threading.Event()
+    waits = []
+    errors = []
+
+    def writer():
+        # Another process's connection inserting claims while the backfills run
+        conn = sqlite3.connect(db_path, timeout=5)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                conn.execute("""
+                    INSERT INTO claims (claim_uuid, created_at, updated_at, type, severity, status, description, photo_path)
+                    VALUES (?, datetime('now'), datetime('now'), 'Damage', 'High', 'Open', 'zephyr concurrent', 'ab/000001.jpg')
+                """, (str(uuid.uuid4()),))
+                conn.commit()
+                waits.append(time.perf_counter() - started)
+            except sqlite3.Error as e:
+                errors.append(e)
+            time.sleep(0.01)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        reports = init_db(batch_size=BATCH_SIZE)
+    finally:
+        stop.set()
+        thread.join()
+
+    conn = sqlite3.connect(db_path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    pending = conn.execute("SELECT count(*) FROM schema_backfills WHERE finished_at IS NULL").fetchone()[0]
+    conn.close()
+    if version == SCHEMA_VERSION and not pending:
+        log(f"PASS: Resumed to version {version}, no backfill pending")
+    else:
+        log(f"FAIL: After resume: version {version}, {pending} backfills pending")
+
+    fts = next((b for r in reports for b in r["backfills"] if b["name"] == "claims_fts"), None)
+    if fts and fts["changes"] == ROWS - 3 * BATCH_SIZE:
+        log(f"PASS: claims_fts resumed after the committed batches ({fts['changes']} rows left)")
+    else:
+        log(f"FAIL: claims_fts resume stats: {fts}")
+
+    longest = max(b["max_batch_seconds"] for r in reports for b in r["backfills"])
+    if longest < MAX_BATCH_SECONDS:
+        log(f"PASS: Longest backfill batch {longest * 1000:.0f} ms")
+    else:
+        log(f"FAIL: Longest backfill batch {longest * 1000:.0f} ms")
+
+    if waits and not errors:
+        log(f"PASS: {len(waits)} concurrent inserts during the migration, longest wait {max(waits) * 1000:.0f} ms")
+    else:
+        log(f"FAIL: Concurrent writer: {len(waits)} inserts, errors {errors[:3]}")
+
+def test_derived_data(db_path):
+    log("--- 4. Backfilled Data Proof ---")
+    from claims.db import due_at_sql
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("INSERT INTO claims_fts(claims_fts, rank) VALUES ('integrity-check', 1)")
+        log("PASS: FTS index matches the claims table")
+    except sqlite3.Error as e:
+        log(f"FAIL: FTS integrity-check: {e}")
+
+    matched = conn.execute("SELECT count(*) FROM claims_fts WHERE claims_fts MATCH 'zephyr'").fetchone()[0]
+    expected = conn.execute("SELECT count(*) FROM claims WHERE description LIKE 'zephyr %'").fetchone()[0]
+    if matched == expected > 0:
+        log(f"PASS: FTS search finds all {matched} matching claims")
+    else:
+        log(f"FAIL: FTS search found {matched}, expected {expected}")
+
+    recomputed = """
+        SELECT date(created_at), type, severity, status, count(*) FROM claims
+        GROUP BY date(created_at), type, severity, status
+    """
+    stored = "SELECT day, type, severity, status, count FROM claims_daily_rollup"
+    diff = conn.execute(f"SELECT count(*) FROM ({recomputed} EXCEPT {stored})").fetchone()[0]
+    diff += conn.execute(f"SELECT count(*) FROM ({stored} EXCEPT {recomputed})").fetchone()[0]
+    if diff == 0:
+        log("PASS: Rollup equals a full GROUP BY")
+    else:
+        log(f"FAIL: Rollup differs from GROUP BY in {diff} rows")
+
+    recomputed = "SELECT photo_path, count(*) FROM claims WHERE photo_path IS NOT NULL GROUP BY photo_path"
+    stored = "SELECT path, refcount FROM blobs WHERE refcount > 0"
+    diff = conn.execute(f"SELECT count(*) FROM ({recomputed} EXCEPT {stored})").fetchone()[0]
+    diff += conn.execute(f"SELECT count(*) FROM ({stored} EXCEPT {recomputed})").fetchone()[0]
+    if diff == 0:
+        log("PASS: Blob refcounts equal a full recount")
+    else:
+        log(f"FAIL: Blob refcounts differ in {diff} paths")
+
+    wrong = conn.execute(
+        f"SELECT count(*) FROM claims WHERE due_at IS NOT {due_at_sql('claims.created_at', 'claims.severity')}"
+    ).fetchone()[0]
+    if wrong == 0:
+        log("PASS: Every claim has its SLA due date")
+    else:
+        log(f"FAIL: {wrong} claims with a missing or wrong due_at")
+    conn.close()
+
+def test_rerun_is_noop():
+    log("--- 5. Idempotency Proof ---")
+    from claims.db import init_db
+
+    reports = init_db(batch_size=BATCH_SIZE)
+    if reports == []:
+        log("PASS: Second init_db applies nothing")
+    else:
+        log(f"FAIL: Second init_db applied {reports}")
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory(prefix="claims_migrations_") as tmp:
+        os.environ["CLAIMS_DATA_DIR"] = tmp
+        from claims.db import get_db_path
+
+        db_path = get_db_path()
+        started = time.perf_counter()
+        create_v1_database(db_path)
+        log(f"Generated a version 1 database with {ROWS} claims in {time.perf_counter() - started:.1f}s")
+
+        test_dry_run(db_path)
+        test_interrupted_run(db_path)
+        test_resume_with_concurrent_writer(db_path)
+        test_derived_data(db_path)
+        test_rerun_is_noop()
+    sys.exit(0)